@@ -4,12 +4,16 @@ File:        affordability_analysis.py
 Description: Processes scraped listing data and calculates affordability metrics.
 Author:      Yuseof
 Created:     2025-07-24
-Modified:    2025-07-24
+Modified:    2026-10-19
 """
 
 import numpy as np
 import pandas as pd
 from util import format_price
+from income_distribution import IncomeDistribution
+from uncertainty import pir_uncertainty
+from text_features import description_features
+from config import AFFORDABLE_INCOME_MULTIPLE
 
 
 ###############
@@ -52,15 +56,16 @@ def preprocess_income_data(df_income):
     df_income = df_income[
         [
             "Estimate!!Households!!Median income (dollars)",
-            #'Margin of Error!!Households!!Median income (dollars)',
+            "Margin of Error!!Households!!Median income (dollars)",
             "Zipcode",
         ]
     ]
 
-    # rename median income column
+    # rename median income columns
     df_income = df_income.rename(
         columns={
-            "Estimate!!Households!!Median income (dollars)": "Household_Median_Income"
+            "Estimate!!Households!!Median income (dollars)": "Household_Median_Income",
+            "Margin of Error!!Households!!Median income (dollars)": "Household_Median_Income_MOE",
         }
     )
 
@@ -80,6 +85,12 @@ def preprocess_income_data(df_income):
         float
     )
 
+    # 90% margin of error, "**" / "***" (not computable, top coded) become nan
+    df_income["Household_Median_Income_MOE"] = pd.to_numeric(
+        df_income["Household_Median_Income_MOE"].replace("[,]", "", regex=True),
+        errors="coerce",
+    )
+
     return df_income
 
 
@@ -102,7 +113,9 @@ do not exceed 30% of a household's gross income. This threshold is established b
 def calculate_house_affordabilty(df_analysis):
 
     # gap between affordable price and actual price
-    df_analysis["Affordable_Price"] = df_analysis.Household_Median_Income * 3.0
+    df_analysis["Affordable_Price"] = (
+        df_analysis.Household_Median_Income * AFFORDABLE_INCOME_MULTIPLE
+    )
     df_analysis["Affordability_Gap"] = df_analysis.Affordable_Price - df_analysis.Price
 
     return df_analysis
@@ -147,7 +160,8 @@ def zipcode_aggregates(df, df_income):
 
     # flag zips where lowest house price is > 3x the median income
     df_zip_agg["Unaffordable"] = (
-        df_zip_agg.Min_Price > df_zip_agg.Household_Median_Income * 3
+        df_zip_agg.Min_Price
+        > df_zip_agg.Household_Median_Income * AFFORDABLE_INCOME_MULTIPLE
     )
 
     return df_zip_agg
@@ -161,18 +175,47 @@ def calculate_affordability_metrics(df_housing, df_income):
     print("Preprocessing listing data...")
     df_housing = preprocess_scraped_listings(df_housing)
 
+    # keyword flags and condition score of the card descriptions
+    print("Extracting description features...")
+    df_housing = df_housing.join(description_features(df_housing["Description"]))
+
+    # from the raw table, preprocessing keeps only the median
+    print("Building income distributions...")
+    income_distribution = IncomeDistribution.from_census(df_income)
+
     print("Preprocessing income data...")
     df_income = preprocess_income_data(df_income)
 
     print("Joining income and listing data...")
-    df_analysis = df_housing.merge(df_income, on="Zipcode", how="left")
+    df_analysis = df_housing.merge(
+        df_income[["Zipcode", "Household_Median_Income"]], on="Zipcode", how="left"
+    )
 
     print("Calculating zip level metrics...")
     df_zip_level_analysis = zipcode_aggregates(df_analysis, df_income)
 
+    # small zips (few listings, wide income moe) give noisy PIRs and ranks
+    print("Simulating PIR uncertainty...")
+    df_zip_level_analysis = df_zip_level_analysis.merge(
+        pir_uncertainty(df_analysis, df_zip_level_analysis), on="Zipcode", how="left"
+    )
+
     print("Calculating house level metrics...")
     df_house_level_analysis = calculate_house_affordabilty(df_analysis)
 
+    # share of the zip's households (not just the median one) that could
+    # afford the home, and the zip's median priced home
+    df_house_level_analysis["Pct_Households_Can_Afford"] = (
+        income_distribution.pct_can_afford(
+            df_house_level_analysis.Zipcode, df_house_level_analysis.Price
+        )
+    )
+    df_zip_level_analysis["Pct_Households_Can_Afford_Median"] = (
+        income_distribution.pct_can_afford(
+            df_zip_level_analysis.Zipcode, df_zip_level_analysis.Median_Price
+        )
+    )
+
     # if the house is affordable, set the gap to 0
     df_house_level_analysis.Affordability_Gap = np.where(
         df_house_level_analysis.Affordability_Gap < 0,
@@ -4,28 +4,41 @@ File:        app.py
 Description: Creates a streamlit dashboard using the scraped housing data
 Author:      Yuseof
 Created:     2025-07-24
-Modified:    2025-08-22
+Modified:    2026-10-19
 Usage:       --
 """
 
-import math
-import folium
+import os
+import tempfile
 import numpy as np
-import pandas as pd
-import geopandas as gpd
 import streamlit as st
-from pyairtable import Api
-import branca.colormap as cm
 from datetime import datetime
-import streamlit.components.v1 as components
+from dashboard_summary import (
+    build_summary,
+    compute_kpis,
+    load_summary,
+    rank_zips,
+    save_summary,
+)
 from config import (
     PATH_TO_ZIP_SHAPEFILE,
+    PATH_TO_DASHBOARD_SUMMARY,
+    PATH_TO_DASHBOARD_DATASET,
+    PATH_TO_GRID_CELLS,
     HOUSE_TABLE_NAME,
     ZIP_TABLE_NAME,
     BASE_ID,
     AIRTABLE_ACCESS_TOKEN,
+    DASHBOARD_MMAP,
+    CHART_PRICE_BIN_WIDTH,
+    DATA_TABLE_COLUMNS,
+    DATA_TABLE_PAGE_SIZES,
 )
 
+# NOTE: geopandas, folium, branca, pyairtable and the chart / data table modules are
+# imported inside the functions that need them, so the header and KPIs can be
+# painted before any of them are loaded
+
 st.set_page_config(page_title="🏠 Housing Affordability Explorer")
 
 #####################
@@ -35,114 +48,150 @@ st.set_page_config(page_title="🏠 Housing Affordability Explorer")
 # NOTE: caching prevents lag and flickering in streamlit UI since results are stored rather than
 # code rerunning / resources realoading every time
 
+# NOTE: results that are the same for every viewer use st.cache_resource, which returns
+# the one shared object instead of a copy per session (st.cache_data unpickles a new
+# copy on every hit). They must be treated as read-only
 
-@st.cache_data
-def load_zip_analysis():
+
+@st.cache_resource
+def load_dataset():
+
+    from pyairtable import Api
+    from shared_dataset import SharedDataset
 
     # load data
     api = Api(AIRTABLE_ACCESS_TOKEN)
-    table = api.table(BASE_ID, ZIP_TABLE_NAME)
-    rows = table.all()
-    df = pd.json_normalize(r["fields"] for r in rows)
+    dataset = SharedDataset.from_records(
+        api.table(BASE_ID, HOUSE_TABLE_NAME).all(),
+        api.table(BASE_ID, ZIP_TABLE_NAME).all(),
+    )
 
-    # zip as str for join
-    df["Zipcode"] = df["Zipcode"].astype(str).apply(lambda x: x.strip())
+    # every session reads the same frames, as read-only views of the file
+    return dataset.persist(PATH_TO_DASHBOARD_DATASET) if DASHBOARD_MMAP else dataset
 
-    # round PIR to one decimal
-    df["PIR"] = df["PIR"].apply(lambda x: round(x, 1))
 
-    # include formatted median income field for map viz
-    df["Median_Price_Formatted"] = df["Median_Price"].apply(
-        lambda x: "$" + format(int(x), ",")
-    )
+@st.cache_resource
+def load_zip_shapes(path=PATH_TO_ZIP_SHAPEFILE):
 
-    # include formatted median home proce field for map viz
-    df["Household_Median_Income_Formatted"] = df["Household_Median_Income"].apply(
-        lambda x: "$" + format(int(x), ",")
-    )
+    from dashboard_map import load_zip_shapes
+
+    return load_zip_shapes(path)
+
+
+@st.cache_resource
+def load_geojson_map(data_version, _df_zip_analysis):
+
+    from dashboard_map import build_geojson_map
+
+    return build_geojson_map(_df_zip_analysis, load_zip_shapes())
 
-    return df
+
+def summary_mtime(path=PATH_TO_DASHBOARD_SUMMARY):
+    # keys the cached summary, so that a rewritten file is read again
+    return os.path.getmtime(path) if os.path.exists(path) else None
 
 
 @st.cache_data
-def load_house_listings():
+def load_dashboard_summary(mtime, path=PATH_TO_DASHBOARD_SUMMARY):
+    return load_summary(path)
 
-    # load data
-    api = Api(AIRTABLE_ACCESS_TOKEN)
-    table = api.table(BASE_ID, HOUSE_TABLE_NAME)
-    rows = table.all()
-    df = pd.json_normalize(r["fields"] for r in rows)
 
-    # fields for mapping
-    df["Affordable_Color"] = np.where(df["Affordability_Gap"] < 0, "red", "green")
-    df["Is_Affordable"] = np.where(df["Affordability_Gap"] < 0, False, True)
+@st.cache_resource
+def refresh_dashboard_summary(data_version, _df_house_analysis, _df_zip_analysis):
+
+    # once per data version, for the next cold start
+    try:
+        save_summary(
+            build_summary(_df_house_analysis, _df_zip_analysis, data_version),
+            PATH_TO_DASHBOARD_SUMMARY,
+        )
+    except OSError:
+        pass
+
+
+@st.cache_resource
+def load_grid_cells(path=PATH_TO_GRID_CELLS):
+
+    from columnar import read_stage_frame
+
+    # None until main.py has saved the grid
+    return read_stage_frame(path) if os.path.exists(path) else None
+
+
+@st.cache_resource
+def load_chart_data(data_version, _df_house_analysis, _df_zip_analysis):
+
+    from chart_data import build_chart_data
 
-    return df
+    # keyed on the data version only, so the frames themselves are never hashed
+    # and the chart datasets are built once per pipeline run
+    return build_chart_data(_df_house_analysis, _df_zip_analysis)
+
+
+@st.cache_resource
+def load_sort_index(data_version, column, ascending, _df_house_analysis):
+
+    from data_table import build_sort_index
+
+    # full sort happens once per column / direction and data version
+    return build_sort_index(_df_house_analysis, column, ascending)
 
 
 @st.cache_data
-def load_zip_shapes(path=PATH_TO_ZIP_SHAPEFILE):
+def load_filtered_sort_index(
+    data_version, column, ascending, filter_key, _df_house_analysis, _filter_mask
+):
 
-    # load data
-    gdf = gpd.read_file(path)
+    from data_table import filter_sort_index
 
-    # remove any null geometries
-    gdf = gdf[gdf["geometry"].notnull()].copy()
+    # filter_key identifies the sidebar filters behind _filter_mask, so paging
+    # through the same filter / sort only slices the cached order
+    sort_index = load_sort_index(data_version, column, ascending, _df_house_analysis)
+    return filter_sort_index(sort_index, _filter_mask)
 
-    # format zip col
-    gdf.rename(columns={"GEOID20": "Zipcode"}, inplace=True)
-    gdf["Zipcode"] = gdf["Zipcode"].astype(str)
 
-    return gdf
+def render_kpis(kpis):
 
+    try:
+        # kpi columns
+        col1, col2, col3, col4 = st.columns([1.5, 2, 2, 1])
+        col1.metric("Total Homes", kpis["total_homes"])
+        col2.metric("Median Home Price", f"${kpis['median_price']:,}")
+        col3.metric("Median Affordability Gap", f"${kpis['median_gap']:,}")
+        col4.metric("% Affordable", f"{kpis['pct_affordable']}%")
 
-###########
-# LOAD DATA
-###########
+    except:
+        st.error("No Houses Match This Criteria...")
+
+
+def render_zip_card(title, color, zips):
+
+    insights_html = f"""
+    <div style="
+        padding:15px;
+        background-color:{color};
+        border-radius:10px;
+        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        color: white;
+    ">
+        <h4 style="margin-top:0;">{title}</h4>
+        <ul style="padding-left:20px; margin:0;">
+    """
+
+    for row in zips:
+        insights_html += f"<li><b>{row['Zipcode']}</b> — Price to Income Ratio = {row['PIR']:,.1f}"
+        # 90% interval from the income moe and listing resampling
+        if "PIR_Low" in row:
+            insights_html += f" ({row['PIR_Low']:,.1f}–{row['PIR_High']:,.1f})"
+        insights_html += "</li>"
+
+    insights_html += """
+        </ul>
+    </div>
+    """
+
+    st.markdown(insights_html, unsafe_allow_html=True)
 
-df_zip_analysis = load_zip_analysis()
-df_house_analysis = load_house_listings()
-gdf_zip_shapes = load_zip_shapes()
-
-###############
-# PREPROCESSING
-###############
-
-# merge zip affordability metrics with zip gdf
-gdf_zip_analysis = df_zip_analysis.merge(gdf_zip_shapes, how="left", on="Zipcode")
-
-# select only relevant columns
-gdf_zip_map = gdf_zip_analysis[
-    [
-        "Zipcode",
-        "PIR",
-        "geometry",
-        "Median_Price_Formatted",
-        "Household_Median_Income_Formatted",
-    ]
-].copy()
-
-geojson_map = {
-    "type": "FeatureCollection",
-    "features": [
-        {
-            "type": "Feature",
-            "geometry": geom.__geo_interface__,
-            "properties": {
-                "Zipcode": row.Zipcode,
-                "PIR": row.PIR,
-                "Median_Price_Formatted": row.Median_Price_Formatted,
-                "Household_Median_Income_Formatted": row.Household_Median_Income_Formatted,
-            },
-        }
-        for idx, row in gdf_zip_map.iterrows()
-        for geom in (
-            [row.geometry]
-            if row.geometry.geom_type != "MultiPolygon"
-            else row.geometry.geoms
-        )
-    ],
-}
 
 ##############
 # STREAMLIT UI
@@ -162,7 +211,39 @@ st.markdown(
 st.markdown("<br>", unsafe_allow_html=True)  # Add some vertical space
 st.markdown("<div style='height:3px'></div>", unsafe_allow_html=True)
 
-tab1, tab2, tab3 = st.tabs(["🗺 Map View", "📊 Charts", "📋 Data Table"])
+# NOTE: st.tabs runs every tab on each rerun, so views are picked with a segmented
+# control instead and only the selected one is built
+MAP_VIEW, CHARTS_VIEW, TABLE_VIEW = "🗺 Map View", "📊 Charts", "📋 Data Table"
+view = (
+    st.segmented_control("View", [MAP_VIEW, CHARTS_VIEW, TABLE_VIEW], default=MAP_VIEW)
+    or MAP_VIEW
+)
+
+# paint the kpis from the precomputed summary first, they are replaced with
+# the exact (filtered) values once the listings are loaded
+summary = load_dashboard_summary(summary_mtime())
+if view == MAP_VIEW:
+    kpi_slot = st.empty()
+    if summary is not None:
+        with kpi_slot.container():
+            render_kpis(summary["kpis"])
+
+###########
+# LOAD DATA
+###########
+
+# shared by every session, sessions only hold their filter selections
+dataset = load_dataset()
+df_zip_analysis = dataset.df_zip
+df_house_analysis = dataset.df_house
+
+# latest airtable record timestamp identifies the current pipeline run
+data_version = dataset.data_version
+
+# keep a summary of the current data around for the next cold start, a
+# missing one or one from an earlier pipeline run is rewritten
+if summary is None or summary.get("data_version") != str(data_version):
+    refresh_dashboard_summary(str(data_version), df_house_analysis, df_zip_analysis)
 
 # ------- FILTERS -------
 
@@ -206,114 +287,52 @@ selected_zips = st.sidebar.multiselect("Select Zipcode(s)", zip_options)
 
 # ------- APPLY FILTERS -------
 
-df_houses_filtered = df_house_analysis.copy()
+# filters are kept as one positional mask over the full frame so the data
+# table can reuse its cached sort order instead of re-sorting filtered copies
+filter_mask = np.ones(len(df_house_analysis), dtype=bool)
 
 try:
     # price filter
-    df_houses_filtered = df_houses_filtered[
-        (df_houses_filtered["Price"] >= price_range[0])
-        & (df_houses_filtered["Price"] <= price_range[1])
-    ]
+    filter_mask &= (
+        (df_house_analysis["Price"] >= price_range[0])
+        & (df_house_analysis["Price"] <= price_range[1])
+    ).to_numpy()
 
     # zip filter
     if selected_zips:
-        df_houses_filtered = df_houses_filtered[
-            df_houses_filtered.Zipcode.isin([int(x) for x in selected_zips])
-        ]
+        filter_mask &= df_house_analysis.Zipcode.isin(
+            [int(x) for x in selected_zips]
+        ).to_numpy()
 
     if show_unaffordable == False:
-        df_houses_filtered = df_houses_filtered[
-            df_houses_filtered.Is_Affordable == True
-        ]
+        filter_mask &= (df_house_analysis.Is_Affordable == True).to_numpy()
 
     if show_affordable == False:
-        df_houses_filtered = df_houses_filtered[
-            df_houses_filtered.Is_Affordable == False
-        ]
+        filter_mask &= (df_house_analysis.Is_Affordable == False).to_numpy()
 
 except:
     st.error("No Houses Match This Criteria...")
 
-# --------- MAP ---------
+df_houses_filtered = df_house_analysis[filter_mask]
 
-# create folium map
-map = folium.Map(location=[42.9159281, -78.7487142], zoom_start=11)
+# --------- MAP ---------
 
-# Create a custom colormap (green → yellow → red)
-colormap = cm.LinearColormap(
-    colors=["green", "yellow", "red"],
-    vmin=df_zip_analysis["PIR"].min(),
-    vmax=8,  # NOTE!! This value is somewhat arbitrary, based on what is an "affordable" PIR from research
-    caption="Price to Income Ratio (Affordability Measure)",
-)
+if view == MAP_VIEW:
 
-# add GeoJson layer with per-feature fill
-folium.GeoJson(
-    geojson_map,
-    style_function=lambda feature: {
-        "fillColor": colormap(feature["properties"]["PIR"]),
-        "color": "black",
-        "weight": 0.5,
-        "fillOpacity": 0.7,
-    },
-    tooltip=folium.GeoJsonTooltip(
-        fields=[
-            "Zipcode",
-            "PIR",
-            "Median_Price_Formatted",
-            "Household_Median_Income_Formatted",
-        ],
-        aliases=[
-            "Zipcode",
-            "Price to Income Ratio",
-            "Median House Price",
-            "Median Income",
-        ],
-    ),
-).add_to(map)
-
-# add colormap legend
-colormap.add_to(map)
-
-# Add house pins
-for _, row in df_houses_filtered.iterrows():
-    folium.Marker(
-        location=[row["Lat"], row["Lng"]],
-        tooltip=(
-            f"<b>{row['Address']}</b><br>"
-            f"<div style='line-height:2'></div>"
-            f"<b><i>Price:</i></b> ${int(row['Price']):,}<br>"
-            f"<b><i>Affordable Price:</i></b> ${int(row['Affordable_Price']):,}<br>"
-            f"<b><i>Affordability Gap:</i></b> ${int(row['Affordability_Gap']):,}"
-        ),
-        icon=folium.Icon(color=row["Affordable_Color"], icon="home", prefix="fa"),
-    ).add_to(map)
-
-# show map in streamlit
-with tab1:
+    import streamlit.components.v1 as components
+    from dashboard_map import build_map
 
-    try:
-        # kpi columns
-        col1, col2, col3, col4 = st.columns([1.5, 2, 2, 1])
-        col1.metric("Total Homes", len(df_houses_filtered))
-        col2.metric(
-            "Median Home Price", f"${int(df_houses_filtered['Price'].median()):,}"
-        )
-        col3.metric(
-            "Median Affordability Gap",
-            f"${int(df_houses_filtered['Affordability_Gap'].median()):,}",
-        )
-        col4.metric(
-            "% Affordable",
-            f"{math.trunc((len(df_houses_filtered[df_houses_filtered.Affordability_Gap == 0]) / len(df_houses_filtered)) * 100)}%",
-        )
-
-    except:
-        st.error("No Houses Match This Criteria...")
+    # exact kpis for the current filters
+    with kpi_slot.container():
+        render_kpis(compute_kpis(df_houses_filtered))
 
     # space between header and map
     st.empty()
 
+    # geometries are only loaded (and the geojson built) once the map is needed
+    geojson_map = load_geojson_map(data_version, df_zip_analysis)
+    map = build_map(geojson_map, df_zip_analysis, df_houses_filtered, load_grid_cells())
+
     # render folium map HTML and embed it into a fixed-height iframe so Streamlit reserves that space up-front.
     # this both fixes issue of summary cards being sent to bottom of page, and screen flickering.
     map_html = map.get_root().render()
@@ -324,60 +343,14 @@ with tab1:
 
     # summary cols
     most_aff, least_aff = st.columns(2)
+    most_aff_zips, least_aff_zips = rank_zips(df_zip_analysis)
 
     with most_aff:
-
-        # least affordable neighborhoods (Recc: These neighborhoods Need pricing support)
-        df_most_aff = df_zip_analysis.sort_values("PIR").head(3)[["Zipcode", "PIR"]]
-
-        insights_html = """
-        <div style="
-            padding:15px;
-            background-color:#007506;
-            border-radius:10px;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            color: white;
-        ">
-            <h4 style="margin-top:0;">⬆️ Most Affordable Areas</h4>
-            <ul style="padding-left:20px; margin:0;">
-        """
-
-        for _, row in df_most_aff.iterrows():
-            insights_html += f"<li><b>{row.Zipcode}</b> — Price to Income Ratio = {row.PIR:,.1f}</li>"
-
-        insights_html += """
-            </ul>
-        </div>
-        """
-
-        st.markdown(insights_html, unsafe_allow_html=True)
+        render_zip_card("⬆️ Most Affordable Areas", "#007506", most_aff_zips)
 
     with least_aff:
-
         # least affordable neighborhoods (Recc: These neighborhoods Need pricing support)
-        df_least_aff = df_zip_analysis.sort_values("PIR").tail(3)[["Zipcode", "PIR"]]
-
-        insights_html = """
-        <div style="
-            padding:15px;
-            background-color:#B30000;
-            border-radius:10px;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            color: white;
-        ">
-            <h4 style="margin-top:0;">⬇️ Least Affordable Areas</h4>
-            <ul style="padding-left:20px; margin:0;">
-        """
-
-        for _, row in df_least_aff.iterrows():
-            insights_html += f"<li><b>{row.Zipcode}</b> — Price to Income Ratio = {row.PIR:,.1f}</li>"
-
-        insights_html += """
-            </ul>
-        </div>
-        """
-
-        st.markdown(insights_html, unsafe_allow_html=True)
+        render_zip_card("⬇️ Least Affordable Areas", "#B30000", least_aff_zips)
 
     # padding under summary cards
     st.markdown("</div>", unsafe_allow_html=True)
@@ -387,8 +360,8 @@ with tab1:
     with st.expander("ℹ️ About this dashboard"):
         st.markdown(
             """
-        Affordability is determined using the median household income of each zipcode (sourced from US Census). 
-    
+        Affordability is determined using the median household income of each zipcode (sourced from US Census).
+
         - **Affordable Price** = Zipcode Median Income x 3
         - **Affordability Gap** = House Price - Affordable Price (Value of $0 indicates house is affordable)
         - **Price to Income Ratio (PIR)** = Zipcode Median House Price / Zipcode Median Income
@@ -414,24 +387,83 @@ with tab1:
 
 # --------- CHARTS ---------
 
-with tab2:
-    st.markdown(
-        """
-        <div style='text-align: center; padding: 50px; font-size: 24px; font-weight: bold; color: gray;'>
-            🚧 Charts Coming Soon 🚧
-        </div>
-        """,
-        unsafe_allow_html=True,
+elif view == CHARTS_VIEW:
+
+    from chart_data import filter_chart_data
+
+    # combine precomputed bins for the current filters
+    chart_data = load_chart_data(data_version, df_house_analysis, df_zip_analysis)
+    charts = filter_chart_data(
+        chart_data, price_range, selected_zips, show_affordable, show_unaffordable
+    )
+
+    st.subheader("Price Distribution")
+    st.bar_chart(charts["price_hist"], y="Homes")
+
+    st.subheader("Price per SqFt by Zipcode")
+    st.bar_chart(charts["ppsf_by_zip"], y="Price Per SqFt")
+
+    st.subheader("SqFt vs Price")
+    st.scatter_chart(charts["scatter"], x="SqFt", y="Price", color="Is_Affordable")
+
+    st.subheader("Price to Income Ratio Ranking")
+    st.dataframe(charts["pir_ranking"], hide_index=True, use_container_width=True)
+
+    st.caption(
+        "Charts are pre-aggregated per data refresh. Price filters are applied "
+        f"in ${CHART_PRICE_BIN_WIDTH:,} bins, and the scatter plot is downsampled."
     )
 
 # --------- DATA TABLE ---------
 
-with tab3:
-    st.markdown(
-        """
-        <div style='text-align: center; padding: 50px; font-size: 24px; font-weight: bold; color: gray;'>
-            🚧 Data Table Coming Soon 🚧
-        </div>
-        """,
-        unsafe_allow_html=True,
+else:
+
+    from data_table import page_count, get_page, write_csv, write_parquet
+
+    # column projection and sort controls
+    table_cols = [col for col in DATA_TABLE_COLUMNS if col in df_house_analysis]
+    selected_cols = st.multiselect("Columns", table_cols, default=table_cols)
+    selected_cols = selected_cols or table_cols
+
+    sort_col, sort_dir, size_col = st.columns([2, 1, 1])
+    sort_by = sort_col.selectbox("Sort By", selected_cols)
+    ascending = sort_dir.radio("Order", ["Ascending", "Descending"]) == "Ascending"
+    page_size = size_col.selectbox("Rows Per Page", DATA_TABLE_PAGE_SIZES)
+
+    filter_key = (
+        tuple(price_range),
+        tuple(selected_zips),
+        show_affordable,
+        show_unaffordable,
+    )
+    table_order = load_filtered_sort_index(
+        data_version, sort_by, ascending, filter_key, df_house_analysis, filter_mask
+    )
+
+    # only the current page is sent to the browser
+    n_pages = page_count(table_order, page_size)
+    page = st.number_input("Page", min_value=1, max_value=n_pages, value=1)
+    st.dataframe(
+        get_page(df_house_analysis, table_order, page, page_size, selected_cols),
+        hide_index=True,
+        use_container_width=True,
     )
+    st.caption(f"Page {page} of {n_pages} ({len(table_order):,} homes)")
+
+    # export of the current filter / sort, streamed to disk in chunks
+    export_col, download_col = st.columns([1, 2])
+    export_format = export_col.radio("Export Format", ["CSV", "Parquet"])
+    if export_col.button("Prepare Export"):
+        suffix = ".csv" if export_format == "CSV" else ".parquet"
+        writer = write_csv if export_format == "CSV" else write_parquet
+        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as f:
+            export_path = f.name
+        writer(export_path, df_house_analysis, table_order, selected_cols)
+        with open(export_path, "rb") as f:
+            download_col.download_button(
+                "Download",
+                f,
+                file_name=f"house_listings{suffix}",
+                mime="text/csv" if export_format == "CSV" else None,
+            )
+        os.remove(export_path)
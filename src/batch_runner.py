@@ -0,0 +1,444 @@
+# -*- coding: utf-8 -*-
+"""
+File:        batch_runner.py
+Description: Scrapes and analyzes many metros in one run. Metros are read from
+                a manifest (search url, zip list, income csv, shapefile
+                subset) and fanned out over a process pool. Every metro gets a
+                fresh worker process with cpu / memory limits, its own browser
+                and chrome profile, its own checkpoints and log file, and
+                writes its stage outputs to its own metro=<name> partition
+                (see columnar.read_partitions). A throughput summary per metro
+                is printed and saved as batch_report.json.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       python batch_runner.py [--manifest PATH] [--workers 4]
+                 [--metros buffalo,rochester] [--resume]
+"""
+
+import os
+import json
+import time
+import signal
+import resource
+import argparse
+import traceback
+import contextlib
+import multiprocessing
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from main import scrape, analyze
+from util import address_to_lat_lng
+from checkpoint import Checkpoint
+from columnar import read_stage, stage_path
+from pacing import PROFILES
+from sketches import ZipSketches
+from hedonic import HedonicModel
+from instrumentation import start_run, stage, count, write_report
+from config import (
+    PROJECT_ROOT,
+    MAX_LISTINGS,
+    PATH_TO_INCOME_DATA,
+    PATH_TO_CHECKPOINTS,
+    PATH_TO_RUN_HISTORY,
+    CENSUS_ZIP_SHAPEFILE_PATH,
+    SCRAPER_PACING_PROFILE,
+    SCRAPER_WAIT_BUDGET_S,
+    PATH_TO_METRO_MANIFEST,
+    PATH_TO_METRO_PARTITIONS,
+    PATH_TO_ZIP_SHAPEFILE,
+    PATH_TO_METRO_CHROME_PROFILES,
+    BATCH_MAX_WORKERS,
+    METRO_CPU_LIMIT_S,
+    METRO_MEMORY_LIMIT_MB,
+    ZIP_SKETCHES_FILE,
+    HEDONIC_MODEL_FILE,
+)
+
+# set in every worker process by _init_worker
+_geocode_lock = None
+
+
+class ResourceLimitExceeded(Exception):
+    pass
+
+
+##########
+# MANIFEST
+##########
+
+
+def _resolve(path):
+    # manifest paths are relative to the project root
+    return path if os.path.isabs(path) else os.path.join(PROJECT_ROOT, path)
+
+
+def load_manifest(path=PATH_TO_METRO_MANIFEST):
+    """
+    Reads the metro manifest, a json file of the form
+    {"metros": [{"name": "buffalo", "housing_url": ..., "zips": [...],
+    "income_data": ..., "shapefile": ...}, ...]}. Only name and housing_url
+    are required.
+
+    Returns
+    -------
+    list of dicts
+        metros with defaults filled in and paths resolved
+    """
+
+    with open(path) as f:
+        manifest = json.load(f)
+
+    metros, names = [], set()
+    for metro in manifest["metros"]:
+        name = metro["name"]
+        if not name or "=" in name or os.sep in name or name in names:
+            raise ValueError(f"Invalid or duplicate metro name: {name!r}")
+        names.add(name)
+
+        metros.append(
+            {
+                "name": name,
+                "housing_url": metro["housing_url"],
+                "max_listings": metro.get("max_listings", MAX_LISTINGS),
+                "zips": metro.get("zips"),
+                "income_data": (
+                    _resolve(metro["income_data"])
+                    if "income_data" in metro
+                    else PATH_TO_INCOME_DATA
+                ),
+                "shapefile": metro.get("shapefile") and _resolve(metro["shapefile"]),
+                "pacing": metro.get("pacing"),
+                "cpu_limit_s": metro.get("cpu_limit_s", METRO_CPU_LIMIT_S),
+                "memory_limit_mb": metro.get("memory_limit_mb", METRO_MEMORY_LIMIT_MB),
+            }
+        )
+
+    return metros
+
+
+def metro_partition(name, directory=PATH_TO_METRO_PARTITIONS):
+    return os.path.join(directory, f"metro={name}")
+
+
+def ensure_shapefile(metro):
+    """
+    Builds the metro's zip shapefile subset from the census shapefile if it
+    doesn't exist yet (and the census shapefile is available).
+    """
+
+    if not metro["shapefile"] or os.path.exists(metro["shapefile"]):
+        return
+    census_path = _resolve(CENSUS_ZIP_SHAPEFILE_PATH)
+    if not metro["zips"] or not os.path.exists(census_path):
+        print(f"No shapefile subset for {metro['name']}: {metro['shapefile']}")
+        return
+
+    # geopandas is only needed for new metros
+    from filter_zipcodes import filter_zipcodes
+
+    print(f"Building shapefile subset for {metro['name']}...")
+    with stage("shapefile_subset"):
+        filter_zipcodes(metro["zips"], metro["shapefile"], census_path)
+
+
+########
+# WORKER
+########
+
+
+def _init_worker(geocode_lock):
+    global _geocode_lock
+    _geocode_lock = geocode_lock
+
+
+def _locked_geocode(parsed_address):
+    # nominatim allows one request per second in total, not per metro, so
+    # workers take turns (address_to_lat_lng sleeps 1 s after each request)
+    with _geocode_lock:
+        return address_to_lat_lng(parsed_address)
+
+
+def _on_cpu_limit(signum, frame):
+    raise ResourceLimitExceeded("cpu time limit reached")
+
+
+def _set_soft_limit(kind, value):
+    # only the soft limit, so the worker gets a catchable signal / MemoryError
+    # instead of being killed (which would break the whole pool)
+    _, hard = resource.getrlimit(kind)
+    if hard != resource.RLIM_INFINITY:
+        value = min(value, hard)
+    resource.setrlimit(kind, (value, hard))
+
+
+def run_metro(metro, options):
+    """
+    Scrape and analysis of one metro, run in its own worker process. Output
+    is written to the metro's partition folder, along with its run report and
+    log.
+
+    Parameters
+    ----------
+    metro : dict
+        one entry of load_manifest
+    options : dict
+        headless, pacing, wait_budget_s and resume
+
+    Returns
+    -------
+    dict
+        throughput summary of the metro
+    """
+
+    name = metro["name"]
+    partition_dir = metro_partition(name, options["partition_dir"])
+    os.makedirs(partition_dir, exist_ok=True)
+
+    # the browser processes inherit the cpu limit, each with its own count
+    if metro["cpu_limit_s"]:
+        signal.signal(signal.SIGXCPU, _on_cpu_limit)
+        _set_soft_limit(resource.RLIMIT_CPU, int(metro["cpu_limit_s"]))
+
+    start_run(f"metro:{name}")
+    summary = {"metro": name, "status": "ok", "error": None}
+    start = time.perf_counter()
+
+    with open(os.path.join(partition_dir, "run.log"), "w") as log:
+        with contextlib.redirect_stdout(log):
+            try:
+                checkpoint = Checkpoint(
+                    os.path.join(PATH_TO_CHECKPOINTS, f"metro={name}"),
+                    stage_dir=partition_dir,
+                )
+                if not options["resume"]:
+                    checkpoint.clear()
+
+                if not checkpoint.has_stage("listings"):
+                    df_listings = scrape(
+                        options["headless"],
+                        None,
+                        metro["pacing"] or options["pacing"],
+                        options["wait_budget_s"],
+                        checkpoint,
+                        housing_url=metro["housing_url"],
+                        max_listings=metro["max_listings"],
+                        profile_dir=os.path.join(options["profile_dir"], name),
+                    )
+                    if metro["zips"]:
+                        with stage("metro_zips") as span:
+                            zipcodes = pd.to_numeric(
+                                df_listings["Zipcode"], errors="coerce"
+                            )
+                            in_metro = zipcodes.isin(metro["zips"])
+                            count("listings_outside_metro", int((~in_metro).sum()))
+                            df_listings = df_listings[in_metro]
+                            span["rows"] = len(df_listings)
+                    checkpoint.save_stage("listings", df_listings)
+
+                # the analysis smooths zip metrics over the shapefile's zips
+                ensure_shapefile(metro)
+
+                if not checkpoint.has_stage("house_metrics", "zip_metrics"):
+                    # the browser is closed by now, so the memory limit only
+                    # bounds this process (chrome reserves far more address
+                    # space than it uses)
+                    if metro["memory_limit_mb"]:
+                        _set_soft_limit(
+                            resource.RLIMIT_AS,
+                            int(metro["memory_limit_mb"] * 1024**2),
+                        )
+                    hedonic_path = os.path.join(partition_dir, HEDONIC_MODEL_FILE)
+                    hedonic_model = HedonicModel.load_or_new(hedonic_path)
+                    df_zip_level_analysis, df_house_level_analysis = analyze(
+                        checkpoint.load_stage("listings"),
+                        metro["income_data"],
+                        geocode=_locked_geocode,
+                        shapefile_path=metro["shapefile"] or PATH_TO_ZIP_SHAPEFILE,
+                        hedonic_model=hedonic_model,
+                    )
+                    checkpoint.save_stage("house_metrics", df_house_level_analysis)
+                    checkpoint.save_stage("zip_metrics", df_zip_level_analysis)
+                    # after the checkpoint, see main.main
+                    hedonic_model.save(hedonic_path)
+                    ZipSketches().update_frame(df_house_level_analysis).save(
+                        os.path.join(partition_dir, ZIP_SKETCHES_FILE)
+                    )
+
+                # completed, nothing to resume
+                checkpoint.clear()
+            except Exception as e:
+                summary.update(status="failed", error=f"{type(e).__name__}: {e}")
+                print(traceback.format_exc())
+            finally:
+                report = write_report(
+                    os.path.join(partition_dir, "run_report.json"),
+                    PATH_TO_RUN_HISTORY,
+                )
+
+    for key in ["listings", "house_metrics", "zip_metrics"]:
+        path = stage_path(key, partition_dir)
+        summary[key] = read_stage(path).num_rows if os.path.exists(path) else 0
+
+    summary["pages"] = report["counters"].get("pages_scraped", 0)
+    summary["wall_s"] = round(time.perf_counter() - start, 3)
+    summary["cpu_s"] = report["cpu_s"]
+    summary["listings_per_min"] = round(
+        summary["listings"] / max(summary["wall_s"], 1e-9) * 60, 1
+    )
+    return summary
+
+
+#######
+# BATCH
+#######
+
+
+def run_batch(metros, workers=BATCH_MAX_WORKERS, **options):
+    """
+    Runs every metro on a process pool, at most `workers` at once.
+
+    Parameters
+    ----------
+    metros : list of dicts
+        output of load_manifest
+    workers : int
+    **options
+        headless, pacing, wait_budget_s, resume, partition_dir, profile_dir
+
+    Returns
+    -------
+    dict
+        batch report, with the summary of every metro
+    """
+
+    options = {
+        "headless": True,
+        "pacing": SCRAPER_PACING_PROFILE,
+        "wait_budget_s": SCRAPER_WAIT_BUDGET_S,
+        "resume": False,
+        "partition_dir": PATH_TO_METRO_PARTITIONS,
+        "profile_dir": PATH_TO_METRO_CHROME_PROFILES,
+        **options,
+    }
+
+    # spawned, single use workers: every metro starts from a clean process
+    # (no inherited browser handles, rlimits or instrumentation state)
+    context = multiprocessing.get_context("spawn")
+    geocode_lock = context.Lock()
+
+    summaries = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(geocode_lock,),
+        max_tasks_per_child=1,
+    ) as pool:
+        futures = {
+            pool.submit(run_metro, metro, options): metro["name"] for metro in metros
+        }
+        for future in as_completed(futures):
+            try:
+                summary = future.result()
+            except Exception as e:
+                # the worker died (e.g. killed by the os), its partition log
+                # has the details
+                summary = {"metro": futures[future], "status": "failed"}
+                summary["error"] = f"{type(e).__name__}: {e}"
+            print(f"{summary['metro']}: {summary['status']}")
+            summaries.append(summary)
+
+    wall_s = time.perf_counter() - start
+    summaries.sort(key=lambda summary: summary["metro"])
+    return {
+        "workers": workers,
+        "wall_s": round(wall_s, 3),
+        "metro_wall_s": round(sum(s.get("wall_s", 0.0) for s in summaries), 3),
+        "metros": summaries,
+    }
+
+
+def print_batch_report(report):
+    print(
+        f"{'metro':<20}{'status':<8}{'listings':>10}{'houses':>8}{'zips':>6}"
+        f"{'pages':>7}{'wall (s)':>10}{'listings/min':>14}"
+    )
+    for s in report["metros"]:
+        print(
+            f"{s['metro']:<20}{s['status']:<8}{s.get('listings', 0):>10}"
+            f"{s.get('house_metrics', 0):>8}{s.get('zip_metrics', 0):>6}"
+            f"{s.get('pages', 0):>7}{s.get('wall_s', 0.0):>10.1f}"
+            f"{s.get('listings_per_min', 0.0):>14.1f}"
+            + ("  (previous run)" if s.get("skipped") else "")
+        )
+        if s["error"]:
+            print(f"  {s['error']}")
+
+    speedup = report["metro_wall_s"] / max(report["wall_s"], 1e-9)
+    print(
+        f"total wall time: {report['wall_s']:.1f} s for {len(report['metros'])} "
+        f"metros on {report['workers']} workers ({speedup:.1f}x vs one at a time)"
+    )
+
+
+def main(manifest_path, metro_names=None, workers=BATCH_MAX_WORKERS, **options):
+
+    partition_dir = options.get("partition_dir", PATH_TO_METRO_PARTITIONS)
+    report_path = os.path.join(partition_dir, "batch_report.json")
+
+    metros = load_manifest(manifest_path)
+    if metro_names:
+        metros = [metro for metro in metros if metro["name"] in metro_names]
+    done = []
+    if options.get("resume") and os.path.exists(report_path):
+        # metros that completed in the previous run are not run again, they
+        # are carried over to this run's report as skipped
+        with open(report_path) as f:
+            done = [s for s in json.load(f)["metros"] if s["status"] == "ok"]
+        done_names = {s["metro"] for s in done}
+        metros = [metro for metro in metros if metro["name"] not in done_names]
+
+    print(f"Running {len(metros)} metros on {workers} workers...")
+    report = run_batch(metros, workers, **options)
+    report["metros"] = sorted(
+        [{**s, "skipped": True} for s in done] + report["metros"],
+        key=lambda s: s["metro"],
+    )
+    print_batch_report(report)
+
+    os.makedirs(partition_dir, exist_ok=True)
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--manifest", default=PATH_TO_METRO_MANIFEST)
+    parser.add_argument(
+        "--metros", default=None, help="comma separated subset of manifest metros"
+    )
+    parser.add_argument("--workers", type=int, default=BATCH_MAX_WORKERS)
+    parser.add_argument("--headless", type=bool, default=True)
+    parser.add_argument(
+        "--pacing", choices=list(PROFILES), default=SCRAPER_PACING_PROFILE
+    )
+    parser.add_argument("--wait-budget", type=float, default=SCRAPER_WAIT_BUDGET_S)
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="rerun only the failed metros of the last run, from their checkpoints",
+    )
+    args = parser.parse_args()
+    main(
+        args.manifest,
+        metro_names=args.metros.split(",") if args.metros else None,
+        workers=args.workers,
+        headless=args.headless,
+        pacing=args.pacing,
+        wait_budget_s=args.wait_budget,
+        resume=args.resume,
+    )
@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+"""
+File:        __init__.py
+Description: Offline benchmark scripts. Run as modules from src/, e.g.
+                python -m benchmarks.startup
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       --
+"""
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+File:        comps.py
+Description: Times comparable_listings on synthetic house level results
+                spread over a few metros, from a metro sized run up to 1M
+                listings, and checks a sample of listings against a brute
+                force haversine search over every listing.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       python -m benchmarks.comps [--listings 10000 100000 1000000]
+"""
+
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from comps import comparable_listings, EARTH_RADIUS_KM
+from config import (
+    COMPS_K,
+    COMPS_MAX_BED_DIFF,
+    COMPS_MAX_BATH_DIFF,
+    COMPS_SQFT_TOLERANCE,
+)
+
+# (lat, lng) of the synthetic metros
+METROS = [(42.89, -78.85), (40.71, -74.0), (41.88, -87.63), (34.05, -118.24)]
+
+
+def synthetic_houses(n, seed=0):
+    """
+    House level results with the columns comparable_listings reads, listings
+    scattered around metro centers.
+    """
+
+    rng = np.random.default_rng(seed)
+    centers = np.array(METROS)[rng.integers(len(METROS), size=n)]
+    bedrooms = rng.integers(1, 6, n).astype(float)
+    sqft = np.round(rng.lognormal(7.2, 0.3, n) * (0.6 + 0.15 * bedrooms))
+    price = np.round(sqft * rng.lognormal(5.0, 0.4, n), -3)
+    return pd.DataFrame(
+        {
+            "Address": [f"{i} Synthetic St" for i in range(n)],
+            "Lat": centers[:, 0] + rng.normal(0, 0.15, n),
+            "Lng": centers[:, 1] + rng.normal(0, 0.2, n),
+            "Price": price,
+            "Affordable_Price": rng.lognormal(np.log(190_000), 0.3, n),
+            "Bedrooms": bedrooms,
+            "Bathrooms": np.maximum(bedrooms - rng.integers(0, 2, n), 1),
+            "SqFt": sqft,
+            "Price_Per_SqFt": price / sqft,
+        }
+    )
+
+
+def haversine_km(lat, lng, lats, lngs):
+    lat, lng, lats, lngs = map(np.radians, (lat, lng, lats, lngs))
+    a = (
+        np.sin((lats - lat) / 2) ** 2
+        + np.cos(lat) * np.cos(lats) * np.sin((lngs - lng) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def brute_force(df, i):
+    """
+    Comps count, median comp price and nearest affordable comp distance of
+    listing i, by measuring the distance to every listing.
+    """
+
+    row = df.iloc[i]
+    distance = haversine_km(row.Lat, row.Lng, df.Lat.to_numpy(), df.Lng.to_numpy())
+    similar = (
+        (np.abs(df.Bedrooms - row.Bedrooms) <= COMPS_MAX_BED_DIFF)
+        & (np.abs(df.Bathrooms - row.Bathrooms) <= COMPS_MAX_BATH_DIFF)
+        & (np.abs(df.SqFt / row.SqFt - 1) <= COMPS_SQFT_TOLERANCE)
+    ).to_numpy()
+    similar[i] = False
+    order = np.argsort(distance[similar])
+    comps = df.Price.to_numpy()[similar][order[:COMPS_K]]
+    affordable = similar & (df.Price <= df.Affordable_Price).to_numpy()
+    return len(comps), np.median(comps), distance[affordable].min()
+
+
+def main(listing_counts, n_check, seed):
+
+    print(f"{'listings':>10}{'seconds':>10}{'listings/s':>14}")
+    results = []
+    for n in listing_counts:
+        df = synthetic_houses(n, seed)
+        start = time.perf_counter()
+        df_comps = comparable_listings(df)
+        seconds = time.perf_counter() - start
+        print(f"{n:>10,}{seconds:>10.2f}{n / seconds:>14,.0f}")
+        results.append({"listings": n, "seconds": seconds})
+
+    # the kd-tree search must agree with a brute force one
+    df = synthetic_houses(listing_counts[0], seed)
+    df_comps = comparable_listings(df)
+    matches = 0
+    for i in np.random.default_rng(seed).choice(len(df), n_check, replace=False):
+        count, median, nearest_km = brute_force(df, i)
+        row = df_comps.iloc[i]
+        matches += (
+            row.Comps_Count == count
+            and np.isclose(row.Comps_Median_Price, median)
+            and np.isclose(row.Nearest_Affordable_Km, nearest_km, atol=0.01)
+        )
+    print(f"matches brute force: {matches}/{n_check} listings")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--listings", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--check", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    main(args.listings, args.check, args.seed)
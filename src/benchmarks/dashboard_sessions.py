@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+File:        dashboard_sessions.py
+Description: Load test of the dashboard data layer with many concurrent
+                sessions. Every session is a thread (as streamlit runs each
+                session's script) doing a few reruns with random sidebar
+                filters: KPIs, chart frames and one data table page. Two
+                caching modes are compared, each in a fresh process:
+                  - copy: st.cache_data semantics, every cache hit unpickles
+                    its own copy of the frames, chart data and sort index
+                  - shared: st.cache_resource semantics, every session reads
+                    the same memory mapped SharedDataset
+                Reports resident memory (peak growth over the loaded data,
+                sampled from /proc) and rerun response times.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       python -m benchmarks.dashboard_sessions [--listings 100000]
+                 [--sessions 50] [--reruns 3]
+"""
+
+import time
+import shutil
+import pickle
+import argparse
+import tempfile
+import threading
+import multiprocessing
+import numpy as np
+from shared_dataset import SharedDataset
+from chart_data import build_chart_data, filter_chart_data
+from data_table import build_sort_index, filter_sort_index, get_page
+from dashboard_summary import compute_kpis
+from benchmarks.pipeline import build_inputs
+from config import DATA_TABLE_COLUMNS
+
+MODES = ["copy", "shared"]
+SAMPLE_INTERVAL_S = 0.005
+
+
+def rss_mb():
+    """
+    Resident memory of this process (linux).
+    """
+
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+class PeakSampler:
+    """
+    Samples the resident memory in a background thread, keeping the peak.
+    """
+
+    def __init__(self):
+        self.peak = rss_mb()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(SAMPLE_INTERVAL_S):
+            self.peak = max(self.peak, rss_mb())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def session(cache, n_reruns, seed, latencies):
+    """
+    One viewer: n_reruns script reruns with random filters.
+    """
+
+    rng = np.random.default_rng(seed)
+    for _ in range(n_reruns):
+        start = time.perf_counter()
+        dataset, chart_data, sort_index = cache()
+        df_house = dataset.df_house
+
+        # random sidebar filters
+        price_range = np.sort(rng.choice(df_house["Price"].to_numpy(), 2))
+        zips = dataset.df_zip["Zipcode"].to_numpy()
+        selected_zips = list(rng.choice(zips, min(3, len(zips)), replace=False))
+        mask = (
+            df_house["Price"].between(*price_range)
+            & df_house["Zipcode"].isin([int(z) for z in selected_zips])
+        ).to_numpy()
+
+        compute_kpis(df_house[mask])
+        filter_chart_data(chart_data, price_range, selected_zips, True, True)
+        columns = [col for col in DATA_TABLE_COLUMNS if col in df_house]
+        get_page(df_house, filter_sort_index(sort_index, mask), 1, 25, columns)
+        latencies.append(time.perf_counter() - start)
+
+
+def run_mode(mode, house_records, zip_records, n_sessions, n_reruns, results):
+    """
+    Loads the data as the app would in one mode, then runs every session
+    concurrently (in its own process, so memory is measured from scratch).
+    """
+
+    directory = tempfile.mkdtemp()
+    dataset = SharedDataset.from_records(house_records, zip_records, verbose=False)
+    if mode == "shared":
+        dataset = dataset.persist(directory)
+    chart_data = build_chart_data(dataset.df_house, dataset.df_zip)
+    sort_index = build_sort_index(dataset.df_house, "Price")
+    del house_records, zip_records
+
+    if mode == "copy":
+        # what st.cache_data keeps: the pickled result, unpickled on every hit
+        stored = pickle.dumps((dataset, chart_data, sort_index))
+        del dataset, chart_data, sort_index
+
+        def cache():
+            return pickle.loads(stored)
+
+    else:
+
+        def cache():
+            return dataset, chart_data, sort_index
+
+    latencies = []
+    threads = [
+        threading.Thread(target=session, args=(cache, n_reruns, seed, latencies))
+        for seed in range(n_sessions)
+    ]
+    baseline = rss_mb()
+    start = time.perf_counter()
+    with PeakSampler() as sampler:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    results[mode] = {
+        "baseline_mb": baseline,
+        "peak_growth_mb": sampler.peak - baseline,
+        "p50_ms": np.percentile(latencies, 50) * 1000,
+        "p95_ms": np.percentile(latencies, 95) * 1000,
+        "wall_s": time.perf_counter() - start,
+    }
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def main(n_listings, n_sessions, n_reruns):
+
+    print(f"Generating {n_listings:,} synthetic listings...")
+    inputs = build_inputs(n_listings)
+
+    # forked children share the generated records, each loads its own data
+    context = multiprocessing.get_context("fork")
+    results = context.Manager().dict()
+    for mode in MODES:
+        process = context.Process(
+            target=run_mode,
+            args=(
+                mode,
+                inputs["house_records"],
+                inputs["zip_records"],
+                n_sessions,
+                n_reruns,
+                results,
+            ),
+        )
+        process.start()
+        process.join()
+
+    print(f"{n_sessions} concurrent sessions x {n_reruns} reruns")
+    print(
+        f"{'mode':<8}{'base MB':>9}{'peak +MB':>10}{'per session':>13}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'wall s':>8}"
+    )
+    for mode in MODES:
+        r = results[mode]
+        print(
+            f"{mode:<8}{r['baseline_mb']:>9.0f}{r['peak_growth_mb']:>10.0f}"
+            f"{r['peak_growth_mb'] / n_sessions:>13.1f}"
+            f"{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['wall_s']:>8.1f}"
+        )
+    return dict(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--listings", type=int, default=100_000)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--reruns", type=int, default=3)
+    args = parser.parse_args()
+    main(args.listings, args.sessions, args.reruns)
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+File:        driver_sessions.py
+Description: Compares cold browser sessions (a new throwaway browser per
+                region scrape, as main.py used to do) with a warm session (one
+                DriverManager browser with a persistent profile reused across
+                scrapes). Reports browser startup time and per-page latency.
+                Runs against generated pages served locally by default, or
+                against a live url.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       python -m benchmarks.driver_sessions [--scrapes 5] [--pages 5]
+             python -m benchmarks.driver_sessions --url <redfin url> --pacing stealth
+"""
+
+import time
+import argparse
+import tempfile
+import contextlib
+from scraper import instantiate_driver, scrape_listings
+from driver_manager import DriverManager
+from pacing import Pacer, PROFILES
+from scrape_replay import ReplayServer
+from instrumentation import start_run, get_report
+from benchmarks.scraper_replay import write_synthetic_recording, LISTINGS_PER_PAGE
+
+
+def _summary(mode, startup_s, seconds):
+    report = get_report()
+    pages = report["counters"].get("pages_scraped", 0)
+    page_wait = report["timers"].get("page_wait", 0.0)
+    return {
+        "mode": mode,
+        "startups": len(startup_s),
+        "startup_s": round(sum(startup_s), 2),
+        "pages": pages,
+        "page_latency_s": round(page_wait / pages, 3) if pages else None,
+        "total_s": round(seconds, 2),
+    }
+
+
+def run_cold(url, n_scrapes, max_listings, pacing, headless):
+    """
+    A new browser with a throwaway profile for every scrape.
+    """
+
+    start_run("cold")
+    startup_s = []
+    start = time.perf_counter()
+    for _ in range(n_scrapes):
+        t0 = time.perf_counter()
+        driver = instantiate_driver(headless)
+        startup_s.append(time.perf_counter() - t0)
+        scrape_listings(driver, url, max_listings, pacer=Pacer(pacing))
+    return _summary("cold", startup_s, time.perf_counter() - start)
+
+
+def run_warm(url, n_scrapes, max_listings, pacing, headless, profile_dir):
+    """
+    One managed browser with a persistent profile reused for every scrape.
+    """
+
+    start_run("warm")
+    start = time.perf_counter()
+    with DriverManager(headless, profile_dir=profile_dir) as manager:
+        for _ in range(n_scrapes):
+            manager.scrape(url, max_listings, pacer=Pacer(pacing))
+        startup_s = manager.stats["startup_s"]
+    return _summary("warm", startup_s, time.perf_counter() - start)
+
+
+def main(url, n_scrapes, n_pages, pacing, headless):
+
+    max_listings = n_pages * LISTINGS_PER_PAGE
+    with contextlib.ExitStack() as stack:
+        if url is None:
+            recording_dir = stack.enter_context(tempfile.TemporaryDirectory())
+            write_synthetic_recording(recording_dir, n_pages)
+            url = stack.enter_context(ReplayServer(recording_dir)).url
+        profile_dir = stack.enter_context(tempfile.TemporaryDirectory())
+
+        with contextlib.redirect_stdout(None):
+            results = [
+                run_cold(url, n_scrapes, max_listings, pacing, headless),
+                run_warm(url, n_scrapes, max_listings, pacing, headless, profile_dir),
+            ]
+
+    print(
+        f"{'mode':<8}{'startups':>10}{'startup (s)':>13}{'pages':>8}"
+        f"{'page latency (s)':>18}{'total (s)':>11}"
+    )
+    for r in results:
+        latency = "" if r["page_latency_s"] is None else f"{r['page_latency_s']:.3f}"
+        print(
+            f"{r['mode']:<8}{r['startups']:>10}{r['startup_s']:>13.2f}{r['pages']:>8}"
+            f"{latency:>18}{r['total_s']:>11.2f}"
+        )
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=None, help="live url, default local pages")
+    parser.add_argument("--scrapes", type=int, default=5, help="region scrapes")
+    parser.add_argument("--pages", type=int, default=5, help="pages per scrape")
+    parser.add_argument("--pacing", choices=list(PROFILES), default="replay")
+    parser.add_argument("--show-browser", action="store_true")
+    args = parser.parse_args()
+    main(args.url, args.scrapes, args.pages, args.pacing, not args.show_browser)
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+File:        fake_airtable.py
+Description: Minimal local stand-in for the Airtable REST API, so uploads can
+                be benchmarked without network access or real credentials.
+                Supports the batch upsert (PATCH / PUT) and list (GET)
+                endpoints used by pyairtable, keeping records in memory.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       with FakeAirtableServer() as server:
+                 upload_to_airtable(..., endpoint_url=server.url)
+"""
+
+import json
+import threading
+import itertools
+from urllib.parse import urlparse, parse_qs, unquote
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PAGE_SIZE = 100
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _table(self):
+        # /v0/{base_id}/{table_name}
+        parts = urlparse(self.path).path.strip("/").split("/")
+        return self.server.tables.setdefault(unquote(parts[-1]), {})
+
+    def _upsert(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length))
+        key_fields = request.get("performUpsert", {}).get("fieldsToMergeOn", [])
+
+        table = self._table()
+        created, updated, records = [], [], []
+        with self.server.lock:
+            for record in request["records"]:
+                key = tuple(json.dumps(record["fields"].get(k)) for k in key_fields)
+                if key in table:
+                    record_id = table[key]["id"]
+                    table[key]["fields"].update(record["fields"])
+                    updated.append(record_id)
+                else:
+                    record_id = f"rec{next(self.server.ids):014d}"
+                    table[key] = {
+                        "id": record_id,
+                        "createdTime": "2025-08-24T12:00:00.000Z",
+                        "fields": dict(record["fields"]),
+                    }
+                    created.append(record_id)
+                records.append(table[key])
+
+        self._send(
+            {"createdRecords": created, "updatedRecords": updated, "records": records}
+        )
+
+    do_PATCH = _upsert
+    do_PUT = _upsert
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        offset = int(query.get("offset", ["0"])[0])
+        records = list(self._table().values())
+        page = records[offset : offset + PAGE_SIZE]
+        payload = {"records": page}
+        if offset + PAGE_SIZE < len(records):
+            payload["offset"] = str(offset + PAGE_SIZE)
+        self._send(payload)
+
+
+class FakeAirtableServer:
+    """
+    In-memory Airtable API served from a background thread on localhost.
+    """
+
+    def __init__(self, port=0):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        self.httpd.tables = {}
+        self.httpd.lock = threading.Lock()
+        self.httpd.ids = itertools.count()
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def tables(self):
+        return self.httpd.tables
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+File:        grid_aggregates.py
+Description: Times build_grid on up to 1M synthetic listings and the
+                GridIndex viewport query at every map zoom, over random
+                dashboard sized viewports (1024 x 650 px) around the listings.
+                Also checks that parent cells summed from their children match
+                cells binned straight from the listings.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       python -m benchmarks.grid_aggregates [--listings 1000000]
+"""
+
+import time
+import argparse
+import numpy as np
+from grid_aggregates import build_grid, GridIndex, tile_xy
+from benchmarks.comps import synthetic_houses
+
+VIEWPORT_PX = (1024, 650)
+
+
+def random_viewports(df, zoom, n, rng):
+    """
+    (south, west, north, east) of n viewports at a map zoom, centered on
+    random listings (degrees per pixel as on the equator, an overestimate).
+    """
+
+    centers = df[["Lat", "Lng"]].to_numpy()[rng.integers(len(df), size=n)]
+    degrees_per_px = 360 / (256 * 2**zoom)
+    half_w = VIEWPORT_PX[0] / 2 * degrees_per_px
+    half_h = VIEWPORT_PX[1] / 2 * degrees_per_px
+    return [
+        (lat - half_h, lng - half_w, lat + half_h, lng + half_w) for lat, lng in centers
+    ]
+
+
+def check_hierarchy(df, df_cells):
+    """
+    True if every level's listing counts equal binning the listings directly.
+    """
+
+    for zoom, df_level in df_cells.groupby("Zoom"):
+        x, y = tile_xy(df.Lat.to_numpy(), df.Lng.to_numpy(), zoom)
+        keys, counts = np.unique(x * 2**zoom + y, return_counts=True)
+        if not np.array_equal(keys, df_level.X * 2**zoom + df_level.Y):
+            return False
+        if not np.array_equal(counts, df_level.Listings):
+            return False
+    return True
+
+
+def main(n_listings, n_views, seed):
+
+    rng = np.random.default_rng(seed)
+    df = synthetic_houses(n_listings, seed)
+    df["Household_Median_Income"] = rng.lognormal(np.log(62_000), 0.3, n_listings)
+    df["Affordability_Gap"] = np.minimum(df.Affordable_Price - df.Price, 0)
+
+    start = time.perf_counter()
+    df_cells = build_grid(df)
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = GridIndex(df_cells)
+    index_s = time.perf_counter() - start
+
+    print(f"{n_listings:,} listings -> {len(df_cells):,} cells")
+    print(f"build grid:  {build_s:8.3f} s, index {index_s * 1000:.1f} ms")
+    print(f"hierarchy matches direct binning: {check_hierarchy(df, df_cells)}")
+    print(f"{'map zoom':>9}{'cells/view':>12}{'ms/view':>10}")
+    results = {"build_s": build_s}
+    for zoom in range(6, 17, 2):
+        views = random_viewports(df, zoom, n_views, rng)
+        start = time.perf_counter()
+        cells = [len(index.cells_in_view(*view, zoom)) for view in views]
+        ms = (time.perf_counter() - start) / n_views * 1000
+        print(f"{zoom:>9}{np.mean(cells):>12,.0f}{ms:>10.3f}")
+        results[zoom] = ms
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--listings", type=int, default=1_000_000)
+    parser.add_argument("--views", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    main(args.listings, args.views, args.seed)
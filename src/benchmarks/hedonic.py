@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+File:        hedonic.py
+Description: Times HedonicModel fit and predict on up to 1M synthetic listings
+                drawn from a known model (true slopes, zip effects and a
+                discount for fixer-upper descriptions), and checks the
+                recovered slopes and how much of the description discount
+                the hashed words explain (against the model without text).
+                The same listings are then fed
+                as weekly batches: with no decay the incremental model must
+                equal the one fitted at once, and a weekly update only costs
+                that week's listings.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       python -m benchmarks.hedonic [--listings 1000000] [--zips 5000]
+"""
+
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from hedonic import HedonicModel, FEATURES
+from text_features import description_features
+from benchmarks.text_features import synthetic_descriptions
+
+TRUE_SLOPES = np.array([0.8, 0.02, 0.06])  # log sqft, bedrooms, bathrooms
+FIXER_DISCOUNT = -0.2  # log price of descriptions with a negative condition
+NOISE_SD = 0.25
+
+
+def synthetic_listings(n, n_zips, seed=0):
+    """
+    Listings whose log price follows the hedonic model, zip sizes skewed.
+    """
+
+    rng = np.random.default_rng(seed)
+    zip_effects = rng.normal(5.5, 0.4, n_zips)
+    zips = np.minimum(rng.zipf(1.3, n), n_zips) - 1
+    bedrooms = rng.integers(1, 6, n).astype(float)
+    sqft = np.round(rng.lognormal(7.2, 0.3, n) * (0.6 + 0.15 * bedrooms))
+    bathrooms = np.maximum(bedrooms - rng.integers(0, 2, n), 1)
+    features = np.column_stack([np.log(sqft), bedrooms, bathrooms])
+    descriptions = synthetic_descriptions(n, seed)
+    fixer = description_features(descriptions)["Condition_Score"].to_numpy() < 0
+    log_price = features @ TRUE_SLOPES + zip_effects[zips] + FIXER_DISCOUNT * fixer
+    return pd.DataFrame(
+        {
+            "Price": np.round(np.exp(log_price + rng.normal(0, NOISE_SD, n)), -3),
+            "SqFt": sqft,
+            "Bedrooms": bedrooms,
+            "Bathrooms": bathrooms,
+            "Zipcode": 10_000 + zips,
+            "Description": descriptions,
+            "Fixer": fixer,
+        }
+    )
+
+
+def main(n_listings, n_zips, weeks, seed):
+
+    df = synthetic_listings(n_listings, n_zips, seed)
+
+    start = time.perf_counter()
+    model = HedonicModel().update(df)
+    fit_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    df_pred = model.predict(df)
+    predict_s = time.perf_counter() - start
+
+    # gap of fixer-uppers to the expected price, with and without the text
+    no_text = HedonicModel(n_text=0).update(df)
+
+    def fixer_gap(m):
+        log_ratio = np.log1p(m.predict(df)["Price_vs_Model"])
+        return log_ratio[df.Fixer].mean() - log_ratio[~df.Fixer].mean()
+
+    weekly = HedonicModel()
+    update_s = []
+    for df_week in np.array_split(np.arange(n_listings), weeks):
+        start = time.perf_counter()
+        weekly.update(df.iloc[df_week], decay=1.0)
+        update_s.append(time.perf_counter() - start)
+
+    # zips get their columns in order of first appearance
+    def by_zip(m):
+        return pd.Series(m.coef[m.n_fixed :], m.zipcodes).sort_index()
+
+    # up to summation order (log price units, small text coefficients)
+    matches = np.allclose(
+        weekly.coef[: model.n_fixed], model.coef[: model.n_fixed], atol=1e-6
+    )
+    matches &= np.allclose(by_zip(weekly), by_zip(model), atol=1e-6)
+    slopes = model.coef[: len(FEATURES)]
+    print(f"{n_listings:,} listings, {len(model.zipcodes):,} zips")
+    print(f"fit:     {fit_s:7.2f} s")
+    print(f"predict: {predict_s:7.2f} s")
+    print(f"weekly update ({weeks} weeks of {n_listings // weeks:,}): ", end="")
+    print(f"{np.mean(update_s):.2f} s each")
+    print(f"incremental matches full fit: {matches}")
+    print(f"slopes {np.round(slopes, 3)} (true {TRUE_SLOPES})")
+    print(
+        f"residual sd {np.sqrt(model.sigma2):.3f} (true {NOISE_SD}, "
+        f"{np.sqrt(no_text.sigma2):.3f} without text)"
+    )
+    print(
+        f"fixer-upper price vs model {fixer_gap(model):+.3f} log "
+        f"({fixer_gap(no_text):+.3f} without text, true discount {FIXER_DISCOUNT})"
+    )
+    print(df_pred.Model_Pricing.value_counts(normalize=True).round(3).to_string())
+    return {"fit_s": fit_s, "predict_s": predict_s, "update_s": np.mean(update_s)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--listings", type=int, default=1_000_000)
+    parser.add_argument("--zips", type=int, default=5_000)
+    parser.add_argument("--weeks", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    main(args.listings, args.zips, args.weeks, args.seed)
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+File:        income_distribution.py
+Description: Times IncomeDistribution on a synthetic S1901 table covering
+                every US ZCTA and up to 1M listings: building the bracket CDFs
+                and evaluating Pct_Households_Can_Afford for all listings,
+                against a per row python version on a sample (which it must
+                match).
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       python -m benchmarks.income_distribution [--listings 1000000]
+"""
+
+import time
+import argparse
+import numpy as np
+from income_distribution import IncomeDistribution, BRACKET_EDGES
+from benchmarks.synthetic import generate_income_frame
+from config import AFFORDABLE_INCOME_MULTIPLE, INCOME_PARETO_ALPHA
+
+N_ZCTAS = 33_791  # 2020 census ZCTAs
+
+
+def pct_can_afford_loop(distribution, zipcodes, prices):
+    """
+    Reference version, one listing at a time.
+    """
+
+    lookup = {z: i for i, z in enumerate(distribution.zipcodes)}
+    pct = []
+    for zipcode, price in zip(zipcodes, prices):
+        row = lookup.get(zipcode)
+        if row is None:
+            pct.append(np.nan)
+            continue
+        income = price / AFFORDABLE_INCOME_MULTIPLE
+        if income >= BRACKET_EDGES[-1]:
+            tail = (BRACKET_EDGES[-1] / income) ** INCOME_PARETO_ALPHA
+            below = 1 - distribution.top_share[row] * tail
+        else:
+            k = int(np.searchsorted(BRACKET_EDGES, income, side="right")) - 1
+            lower, upper = distribution.cdf[row, k], distribution.cdf[row, k + 1]
+            fraction = (income - BRACKET_EDGES[k]) / (
+                BRACKET_EDGES[k + 1] - BRACKET_EDGES[k]
+            )
+            below = lower + fraction * (upper - lower)
+        pct.append(round((1 - below) * 100, 1))
+    return np.array(pct)
+
+
+def main(n_listings, n_zips, sample, seed):
+
+    rng = np.random.default_rng(seed)
+    zips = np.sort(rng.choice(np.arange(501, 99_951), n_zips, replace=False))
+    df_income = generate_income_frame(zips, seed)
+    zipcodes = rng.choice(zips, n_listings)
+    prices = np.round(rng.lognormal(12.4, 0.6, n_listings), -3)
+
+    start = time.perf_counter()
+    distribution = IncomeDistribution.from_census(df_income)
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pct = distribution.pct_can_afford(zipcodes, prices)
+    eval_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = pct_can_afford_loop(distribution, zipcodes[:sample], prices[:sample])
+    loop_s = (time.perf_counter() - start) * n_listings / sample
+
+    matches = np.allclose(pct[:sample], expected, atol=0.1, equal_nan=True)
+    print(f"{n_zips:,} zips, {n_listings:,} listings")
+    print(f"build cdfs:      {build_s:8.3f} s")
+    print(f"vectorized:      {eval_s:8.3f} s")
+    print(f"per row python:  {loop_s:8.3f} s (extrapolated from {sample:,} rows)")
+    print(f"speedup:         {loop_s / eval_s:8.0f}x, matches reference: {matches}")
+    return {"build_s": build_s, "eval_s": eval_s, "loop_s": loop_s, "matches": matches}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--listings", type=int, default=1_000_000)
+    parser.add_argument("--zips", type=int, default=N_ZCTAS)
+    parser.add_argument("--sample", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    main(args.listings, args.zips, args.sample, args.seed)
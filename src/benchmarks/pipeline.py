@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+"""
+File:        pipeline.py
+Description: Offline benchmark suite for the pipeline and dashboard data prep,
+                run on synthetic listings / income data at several sizes.
+                Reports wall time, throughput and peak (traced) memory for
+                each step, and compares against a stored baseline.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       python -m benchmarks.pipeline [--sizes 1k,100k,1m] [--skip upload]
+                 [--save-baseline] [--tolerance 0.2]
+"""
+
+import os
+import gc
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+import contextlib
+import numpy as np
+import pandas as pd
+from util import upload_to_airtable
+from scraper import process_listing_data
+from affordability_analysis import (
+    calculate_affordability_metrics,
+    preprocess_scraped_listings,
+    preprocess_income_data,
+    zipcode_aggregates,
+)
+from dashboard_data import houses_from_records, zips_from_records
+from chart_data import build_chart_data
+from data_table import build_sort_index
+from benchmarks.fake_airtable import FakeAirtableServer
+from benchmarks.synthetic import (
+    synthetic_zips,
+    generate_listing_dicts,
+    write_income_csv,
+    generate_airtable_records,
+)
+from config import PROJECT_ROOT, HOUSE_TABLE_NAME
+
+PATH_TO_BASELINE = os.path.join(PROJECT_ROOT, "data", "benchmarks", "baseline.json")
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+#########
+# HELPERS
+#########
+
+
+def measure(fn, trace_memory=True):
+    """
+    Runs fn twice: once for wall time, then under tracemalloc for peak memory
+    (tracing slows allocation heavy code, so it isn't timed).
+
+    Returns
+    -------
+    seconds, peak_mb
+    """
+
+    gc.collect()
+    start = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - start
+
+    peak_mb = None
+    if trace_memory:
+        gc.collect()
+        tracemalloc.start()
+        fn()
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1024**2
+        tracemalloc.stop()
+
+    return seconds, peak_mb
+
+
+def build_inputs(n, seed=0):
+    """
+    Synthetic inputs for every benchmark at one size.
+    """
+
+    zips = synthetic_zips(min(max(n // 30, 10), 30_000), seed)
+    listing_data = generate_listing_dicts(n, zips, seed)
+
+    with tempfile.NamedTemporaryFile(suffix=".csv", delete=False) as f:
+        income_path = f.name
+    write_income_csv(income_path, zips, seed)
+    df_income_raw = pd.read_csv(income_path, header=1)
+    os.remove(income_path)
+
+    with contextlib.redirect_stdout(None):
+        df_listings = process_listing_data(listing_data)
+        df_zip, df_house = calculate_affordability_metrics(
+            df_listings.copy(), df_income_raw.copy()
+        )
+        df_analysis = preprocess_scraped_listings(df_listings.copy()).merge(
+            preprocess_income_data(df_income_raw.copy()), on="Zipcode", how="left"
+        )
+
+    # geocoded output as uploaded to / loaded from airtable
+    rng = np.random.default_rng(seed)
+    df_house = df_house.drop(columns=["Parsed_Address"])
+    df_house["Lat"] = 42.9 + rng.normal(0, 0.15, len(df_house))
+    df_house["Lng"] = -78.8 + rng.normal(0, 0.15, len(df_house))
+
+    return {
+        "listing_data": listing_data,
+        "df_income_raw": df_income_raw,
+        "df_listings": df_listings,
+        "df_analysis": df_analysis,
+        "df_income": preprocess_income_data(df_income_raw.copy()),
+        "df_house": df_house,
+        "df_zip": df_zip,
+        "house_records": generate_airtable_records(df_house),
+        "zip_records": generate_airtable_records(df_zip),
+    }
+
+
+############
+# BENCHMARKS
+############
+
+
+def bench_process_listing_data(inputs, server):
+    process_listing_data(inputs["listing_data"])
+
+
+def bench_calculate_affordability_metrics(inputs, server):
+    with contextlib.redirect_stdout(None):
+        calculate_affordability_metrics(
+            inputs["df_listings"].copy(), inputs["df_income_raw"].copy()
+        )
+
+
+def bench_zipcode_aggregates(inputs, server):
+    zipcode_aggregates(inputs["df_analysis"], inputs["df_income"])
+
+
+def bench_upload_to_airtable(inputs, server):
+    upload_to_airtable(
+        "fake-token",
+        "appFakeBase",
+        HOUSE_TABLE_NAME,
+        inputs["df_house"].copy(),
+        endpoint_url=server.url,
+    )
+
+
+def bench_dashboard_prep(inputs, server):
+    df_house = houses_from_records(inputs["house_records"], verbose=False)
+    df_zip = zips_from_records(inputs["zip_records"], verbose=False)
+    build_chart_data(df_house, df_zip)
+    build_sort_index(df_house, "Price")
+
+
+BENCHMARKS = {
+    "process_listing_data": bench_process_listing_data,
+    "calculate_affordability_metrics": bench_calculate_affordability_metrics,
+    "zipcode_aggregates": bench_zipcode_aggregates,
+    "upload_to_airtable": bench_upload_to_airtable,
+    "dashboard_prep": bench_dashboard_prep,
+}
+
+#########
+# RUNNER
+#########
+
+
+def run(sizes, skip=(), trace_memory=True):
+    """
+    Runs every benchmark (except skipped ones) at every size.
+
+    Returns
+    -------
+    dict
+        {"<benchmark>@<size>": {"seconds", "rows_per_s", "peak_mb"}}
+    """
+
+    results = {}
+    with FakeAirtableServer() as server:
+        for size in sizes:
+            n = SIZES[size]
+            print(f"Generating {n:,} synthetic listings...")
+            inputs = build_inputs(n)
+
+            for name, fn in BENCHMARKS.items():
+                if name in skip:
+                    continue
+                seconds, peak_mb = measure(lambda: fn(inputs, server), trace_memory)
+                results[f"{name}@{size}"] = {
+                    "seconds": round(seconds, 4),
+                    "rows_per_s": round(n / seconds, 1),
+                    "peak_mb": None if peak_mb is None else round(peak_mb, 1),
+                }
+                print(
+                    f"  {name:<34}{seconds:>9.3f} s{n / seconds:>14,.0f} rows/s"
+                    + ("" if peak_mb is None else f"{peak_mb:>10,.1f} MB")
+                )
+                server.tables.clear()
+
+    return results
+
+
+def compare_to_baseline(results, baseline, tolerance=0.2):
+    """
+    Prints the time ratio against the baseline for every benchmark present in
+    both, flagging slowdowns beyond the tolerance.
+
+    Returns
+    -------
+    list of str
+        benchmarks that regressed
+    """
+
+    regressions = []
+    print(f"\n{'benchmark':<44}{'baseline (s)':>14}{'now (s)':>10}{'ratio':>8}")
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        ratio = result["seconds"] / baseline[key]["seconds"]
+        flag = "  REGRESSION" if ratio > 1 + tolerance else ""
+        if flag:
+            regressions.append(key)
+        print(
+            f"{key:<44}{baseline[key]['seconds']:>14.3f}{result['seconds']:>10.3f}"
+            f"{ratio:>8.2f}{flag}"
+        )
+
+    return regressions
+
+
+def main(sizes, skip, save_baseline, tolerance, trace_memory):
+
+    results = run(sizes, skip, trace_memory)
+
+    if os.path.exists(PATH_TO_BASELINE):
+        with open(PATH_TO_BASELINE) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, tolerance)
+        print(f"\n{len(regressions)} regression(s) beyond {tolerance:.0%}")
+    else:
+        baseline = {}
+        print("\nNo baseline stored yet, run with --save-baseline to create one.")
+
+    if save_baseline:
+        os.makedirs(os.path.dirname(PATH_TO_BASELINE), exist_ok=True)
+        with open(PATH_TO_BASELINE, "w") as f:
+            json.dump({**baseline, **results}, f, indent=2)
+        print(f"Baseline saved to {PATH_TO_BASELINE}")
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1k,100k", help="any of 1k,10k,100k,1m")
+    parser.add_argument("--skip", default="", help="comma separated benchmarks")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc")
+    args = parser.parse_args()
+    main(
+        sizes=args.sizes.split(","),
+        skip=set(filter(None, args.skip.split(","))),
+        save_baseline=args.save_baseline,
+        tolerance=args.tolerance,
+        trace_memory=not args.no_memory,
+    )
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+File:        refresh_schedule.py
+Description: Simulates weeks of listing churn over synthetic zips (mostly
+                stable, some volatile, some with a PIR near the map's cutoff)
+                on a simulated clock, and compares the current weekly full
+                refresh with the RefreshScheduler's daily plans at the same
+                number of scraped pages. Reports the listing changes not yet
+                picked up by a refresh, averaged over the days.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       python -m benchmarks.refresh_schedule [--zips 60] [--days 56]
+"""
+
+import math
+import argparse
+import numpy as np
+import pandas as pd
+from refresh_scheduler import RefreshScheduler, SimulatedClock
+from config import (
+    REDFIN_LISTINGS_PER_PAGE,
+    REFRESH_PIR_THRESHOLD,
+    REFRESH_PIR_MARGIN,
+)
+
+
+class SyntheticMarket:
+    """
+    Listings of n_zips zips that churn day by day. Every zip has a daily
+    per listing change probability; a change is a price cut or a listing
+    replaced by a new one.
+    """
+
+    def __init__(self, n_zips, volatile_share=0.2, seed=0):
+        self.rng = np.random.default_rng(seed)
+        self.next_id = 0
+        self.zips = {}
+        for i in range(n_zips):
+            income = self.rng.lognormal(np.log(62_000), 0.3)
+            volatile = self.rng.random() < volatile_share
+            self.zips[str(14001 + i)] = {
+                "income": income,
+                "pir": self.rng.uniform(3, 11),
+                "churn": 0.06 if volatile else 0.005,
+                "volatile": volatile,
+                "listings": {},
+                "unseen": 0,
+            }
+            for _ in range(self.rng.integers(10, 120)):
+                self._new_listing(str(14001 + i))
+
+    def _new_listing(self, zipcode):
+        zip_market = self.zips[zipcode]
+        price = zip_market["income"] * zip_market["pir"] * self.rng.lognormal(0, 0.25)
+        address = f"{self.next_id} Market St, Buffalo, NY {zipcode}"
+        zip_market["listings"][address] = round(price, -3)
+        self.next_id += 1
+
+    def near_threshold(self, zipcode):
+        distance = abs(self.zips[zipcode]["pir"] - REFRESH_PIR_THRESHOLD)
+        return distance < REFRESH_PIR_MARGIN
+
+    def step(self):
+        """
+        One day of churn.
+        """
+
+        for zipcode, zip_market in self.zips.items():
+            listings = zip_market["listings"]
+            changed = [a for a in listings if self.rng.random() < zip_market["churn"]]
+            for address in changed:
+                if self.rng.random() < 0.5:
+                    listings[address] = round(listings[address] * 0.97, -3)
+                    zip_market["unseen"] += 1
+                else:
+                    del listings[address]
+                    self._new_listing(zipcode)
+                    zip_market["unseen"] += 2
+
+    def scrape(self, zipcode):
+        """
+        The zip as the pipeline would see it (house level results and PIR),
+        and the number of result pages it took.
+        """
+
+        zip_market = self.zips[zipcode]
+        zip_market["unseen"] = 0
+        df_houses = pd.DataFrame(
+            {
+                "Address": list(zip_market["listings"]),
+                "Price": list(zip_market["listings"].values()),
+            }
+        )
+        df_houses["Affordable_Price"] = zip_market["income"] * 3
+        pir = df_houses["Price"].median() / zip_market["income"]
+        pages = max(1, math.ceil(len(df_houses) / REDFIN_LISTINGS_PER_PAGE))
+        return df_houses, round(pir, 1), pages
+
+
+def simulate(strategy, n_zips, days, seed):
+    """
+    Runs one strategy ("weekly" or "scheduler") over the same market.
+
+    Returns
+    -------
+    dict
+        pages scraped and mean unseen changes per day (all, volatile and near
+        threshold zips)
+    """
+
+    market = SyntheticMarket(n_zips, seed=seed)
+    clock = SimulatedClock()
+    scheduler = RefreshScheduler(state_path=None, clock=clock)
+
+    # both start from a full scrape
+    weekly_pages = 0
+    for zipcode in market.zips:
+        df_houses, pir, pages = market.scrape(zipcode)
+        scheduler.record_refresh(zipcode, df_houses, pir)
+        weekly_pages += pages
+    scheduler.pages_per_day = math.ceil(weekly_pages / 7)
+
+    volatile = [z for z, m in market.zips.items() if m["volatile"]]
+    near = [z for z in market.zips if market.near_threshold(z)]
+    pages_scraped, unseen = 0, {"all": [], "volatile": [], "near_threshold": []}
+    for day in range(1, days + 1):
+        clock.advance(days=1)
+        market.step()
+
+        if strategy == "weekly":
+            to_refresh = list(market.zips) if day % 7 == 0 else []
+        else:
+            to_refresh = [item["zipcode"] for item in scheduler.plan()]
+        for zipcode in to_refresh:
+            df_houses, pir, pages = market.scrape(zipcode)
+            scheduler.record_refresh(zipcode, df_houses, pir)
+            pages_scraped += pages
+
+        for name, zips in [
+            ("all", market.zips),
+            ("volatile", volatile),
+            ("near_threshold", near),
+        ]:
+            unseen[name].append(sum(market.zips[z]["unseen"] for z in zips))
+
+    return {
+        "strategy": strategy,
+        "pages": pages_scraped,
+        **{f"unseen_{name}": float(np.mean(values)) for name, values in unseen.items()},
+    }
+
+
+def main(n_zips, days, seed):
+
+    results = [simulate(s, n_zips, days, seed) for s in ["weekly", "scheduler"]]
+
+    print(
+        f"{'strategy':<12}{'pages':>8}{'unseen (all)':>15}"
+        f"{'volatile':>10}{'near PIR cutoff':>17}"
+    )
+    for r in results:
+        print(
+            f"{r['strategy']:<12}{r['pages']:>8}{r['unseen_all']:>15.1f}"
+            f"{r['unseen_volatile']:>10.1f}{r['unseen_near_threshold']:>17.1f}"
+        )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--zips", type=int, default=60)
+    parser.add_argument("--days", type=int, default=56)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    main(args.zips, args.days, args.seed)
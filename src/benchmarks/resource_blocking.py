@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+File:        resource_blocking.py
+Description: Scrapes the same pages with request blocking off and on, and
+                reports the bytes, requests and load time per page of each,
+                and whether extract_data returned identical listings. Runs
+                against generated pages (with placeholder listing photos)
+                served locally by default, or against a live url.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       python -m benchmarks.resource_blocking [--pages 5]
+             python -m benchmarks.resource_blocking --url <redfin url> --pacing stealth
+"""
+
+import time
+import argparse
+import tempfile
+import contextlib
+from scraper import instantiate_driver, scrape_listings
+from pacing import Pacer, PROFILES
+from scrape_replay import ReplayServer
+from instrumentation import start_run, get_report
+from benchmarks.scraper_replay import write_synthetic_recording, LISTINGS_PER_PAGE
+from config import BLOCKED_URL_PATTERNS
+
+
+def scrape(url, max_listings, pacing, headless, blocked_urls):
+    """
+    One scrape on a fresh browser with the given blocking patterns.
+
+    Returns
+    -------
+    listing_data, dict of per page stats
+    """
+
+    start_run("resource_blocking")
+    driver = instantiate_driver(headless, blocked_urls=blocked_urls)
+    start = time.perf_counter()
+    listing_data = scrape_listings(driver, url, max_listings, pacer=Pacer(pacing))
+    seconds = time.perf_counter() - start
+
+    # load time is the browser's load event (waits for images etc.), per
+    # document loaded
+    report = get_report()
+    counters, timers = report["counters"], report["timers"]
+    pages = max(counters.get("pages_scraped", 0), 1)
+    return listing_data, {
+        "pages": pages,
+        "kb_per_page": counters.get("page_bytes", 0) / 1024 / pages,
+        "requests_per_page": counters.get("page_requests", 0) / pages,
+        "load_s_per_page": (
+            timers.get("page_load", 0.0) / max(counters.get("page_loads", 0), 1)
+        ),
+        "total_s": seconds,
+    }
+
+
+def _normalize(listing_data):
+    return [
+        {k: (None if v != v else v) for k, v in listing.items()}
+        for listing in listing_data
+    ]
+
+
+def main(url, n_pages, runs, pacing, headless):
+
+    max_listings = n_pages * LISTINGS_PER_PAGE
+    results = {"off": [], "on": []}
+    with contextlib.ExitStack() as stack:
+        if url is None:
+            recording_dir = stack.enter_context(tempfile.TemporaryDirectory())
+            write_synthetic_recording(recording_dir, n_pages)
+            url = stack.enter_context(ReplayServer(recording_dir)).url
+
+        # alternate modes so both see the same conditions
+        outputs = {}
+        with contextlib.redirect_stdout(None):
+            for _ in range(runs):
+                for mode, patterns in [("off", []), ("on", BLOCKED_URL_PATTERNS)]:
+                    listing_data, stats = scrape(
+                        url, max_listings, pacing, headless, patterns
+                    )
+                    results[mode].append(stats)
+                    outputs.setdefault(mode, _normalize(listing_data))
+
+    print(
+        f"{'blocking':<10}{'KB/page':>10}{'requests/page':>15}"
+        f"{'load s/page':>13}{'total s':>10}"
+    )
+    summary = {}
+    for mode, runs_stats in results.items():
+        summary[mode] = {
+            key: sum(stats[key] for stats in runs_stats) / len(runs_stats)
+            for key in runs_stats[0]
+        }
+        s = summary[mode]
+        print(
+            f"{mode:<10}{s['kb_per_page']:>10,.1f}{s['requests_per_page']:>15.1f}"
+            f"{s['load_s_per_page']:>13.3f}{s['total_s']:>10.2f}"
+        )
+
+    off, on = summary["off"], summary["on"]
+    print(
+        f"saved per page: {off['kb_per_page'] - on['kb_per_page']:,.1f} KB, "
+        f"{off['load_s_per_page'] - on['load_s_per_page']:.3f} s load time"
+    )
+    identical = outputs["off"] == outputs["on"]
+    print(
+        f"extraction identical: {identical} "
+        f"({len(outputs['off'])} vs {len(outputs['on'])} listings)"
+    )
+
+    return summary, identical
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=None, help="live url, default local pages")
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--pacing", choices=list(PROFILES), default="replay")
+    parser.add_argument("--show-browser", action="store_true")
+    args = parser.parse_args()
+    main(args.url, args.pages, args.runs, args.pacing, not args.show_browser)
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+File:        scraper_replay.py
+Description: Offline scraper benchmark. Replays a recorded scrape (see
+                scrape_replay.py) through scrape_listings / extract_data with
+                the real driver, times it, and checks the extracted listings
+                against the ones from the recorded run. Without a recording,
+                synthetic result pages can be generated instead.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       python -m benchmarks.scraper_replay ../data/recordings/buffalo
+             python -m benchmarks.scraper_replay --synthetic 10 [--runs 3]
+                 [--pacing replay]
+"""
+
+import os
+import json
+import html
+import time
+import argparse
+import tempfile
+import numpy as np
+from scraper import scrape_listings, instantiate_driver
+from pacing import Pacer, PROFILES
+from scrape_replay import (
+    ReplayServer,
+    compare_to_recording,
+    load_manifest,
+    ASSETS_DIR,
+)
+from instrumentation import start_run, get_report
+from benchmarks.synthetic import generate_listing_dicts
+
+LISTINGS_PER_PAGE = 40
+N_PHOTOS = 40
+PHOTO_BYTES = 60_000
+
+CARD_HTML = """
+<div class="HomeCardContainer"><div class="bp-Homecard">
+  <img class="bp-Homecard__Photo" src="/assets/photo_{photo:03d}.jpg">
+  <span class="bp-Homecard__Price--value">{Price}</span>
+  <div class="bp-Homecard__Stats">{stats}</div>
+  <div class="bp-Homecard__Address">{Address}</div>
+  <div class="bp-Homecard__Attribution">{Listed_By}</div>
+  {description}
+</div></div>
+"""
+
+###########
+# SYNTHETIC
+###########
+
+
+def write_synthetic_recording(directory, n_pages, seed=0):
+    """
+    Writes a recording of n_pages result pages with Redfin's home card markup,
+    filled with synthetic listings, in the same layout PageRecorder produces.
+    Every card links one of N_PHOTOS placeholder photos served as assets.
+    """
+
+    os.makedirs(os.path.join(directory, ASSETS_DIR), exist_ok=True)
+    listings = generate_listing_dicts(n_pages * LISTINGS_PER_PAGE, seed=seed)
+
+    rng = np.random.default_rng(seed)
+    for photo in range(N_PHOTOS):
+        photo_path = os.path.join(directory, ASSETS_DIR, f"photo_{photo:03d}.jpg")
+        with open(photo_path, "wb") as f:
+            f.write(rng.bytes(PHOTO_BYTES))
+
+    pages = []
+    for page_num in range(1, n_pages + 1):
+        page_listings = listings[
+            (page_num - 1) * LISTINGS_PER_PAGE : page_num * LISTINGS_PER_PAGE
+        ]
+        cards = []
+        for i, listing in enumerate(page_listings):
+            fields = {k: html.escape(str(v)) for k, v in listing.items()}
+            stats = "".join(f"<div>{s}</div>" for s in fields["Specs"].split("\n"))
+            description = (
+                f'<div class="bp-Homecard__ContentExtension">{fields["Description"]}</div>'
+                if isinstance(listing["Description"], str)
+                else ""
+            )
+            cards.append(
+                CARD_HTML.format(
+                    photo=(page_num * LISTINGS_PER_PAGE + i) % N_PHOTOS,
+                    stats=stats,
+                    description=description,
+                    **fields,
+                )
+            )
+
+        next_button = (
+            '<button class="PageArrow__direction--next">Next</button>'
+            if page_num < n_pages
+            else ""
+        )
+        file_name = f"page_{page_num:03d}.html"
+        with open(os.path.join(directory, file_name), "w", encoding="utf-8") as f:
+            f.write(
+                "<html><head><title>Buffalo, NY Homes for Sale</title></head><body>"
+                + "".join(cards)
+                + next_button
+                + "</body></html>"
+            )
+
+        pages.append(
+            {
+                "page": page_num,
+                "file": file_name,
+                "url": f"synthetic://page/{page_num}",
+                "title": "Buffalo, NY Homes for Sale",
+                "listings_found": len(page_listings),
+                "listings_parsed": len(page_listings),
+                "has_next": page_num < n_pages,
+            }
+        )
+
+    with open(os.path.join(directory, "manifest.json"), "w") as f:
+        json.dump({"recorded": "synthetic", "pages": pages}, f, indent=2)
+    with open(os.path.join(directory, "listings.json"), "w") as f:
+        json.dump(
+            [
+                {k: (None if v != v else v) for k, v in listing.items()}
+                for listing in listings
+            ],
+            f,
+            indent=2,
+        )
+
+    return directory
+
+
+###########
+# BENCHMARK
+###########
+
+
+def replay(directory, pacing="replay", headless=True):
+    """
+    One replay of a recording through scrape_listings.
+
+    Returns
+    -------
+    dict
+        seconds, listings/s, scraper timers and the comparison with the
+        recorded listings
+    """
+
+    manifest = load_manifest(directory)
+    n_recorded = sum(page["listings_parsed"] for page in manifest["pages"])
+
+    start_run("scraper_replay")
+    driver = instantiate_driver(headless)
+    with ReplayServer(directory) as server:
+        pacer = Pacer(pacing)
+        start = time.perf_counter()
+        # scrape_listings quits the driver when done
+        listing_data = scrape_listings(driver, server.url, n_recorded, pacer=pacer)
+        seconds = time.perf_counter() - start
+
+    return {
+        "seconds": round(seconds, 3),
+        "listings_per_s": round(len(listing_data) / seconds, 1),
+        "timers": get_report()["timers"],
+        "pacing": pacer.report(),
+        **compare_to_recording(listing_data, directory),
+    }
+
+
+def main(directory, runs, pacing, headless):
+
+    results = []
+    for run in range(1, runs + 1):
+        result = replay(directory, pacing, headless)
+        results.append(result)
+        print(
+            f"run {run}: {result['seconds']:.2f} s, "
+            f"{result['listings_per_s']:,.1f} listings/s, "
+            f"{result['replayed']} / {result['recorded']} listings, "
+            f"{result['mismatched']} mismatched"
+        )
+        print(
+            f"  waiting {result['pacing']['wait_s']:.2f} s, "
+            f"working {result['pacing']['work_s']:.2f} s"
+        )
+        for name, seconds in result["timers"].items():
+            print(f"  {name}: {seconds:.3f} s")
+
+    seconds = sorted(result["seconds"] for result in results)
+    print(f"median: {seconds[len(seconds) // 2]:.2f} s over {runs} run(s)")
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("recording", nargs="?", help="recording folder")
+    parser.add_argument(
+        "--synthetic",
+        type=int,
+        default=None,
+        metavar="N_PAGES",
+        help="replay N_PAGES of generated pages instead of a recording",
+    )
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument(
+        "--pacing",
+        choices=list(PROFILES),
+        default="replay",
+        help="pacing profile, replay for no waits or e.g. stealth for live pacing",
+    )
+    parser.add_argument("--show-browser", action="store_true")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            write_synthetic_recording(tmp_dir, args.synthetic)
+            main(tmp_dir, args.runs, args.pacing, not args.show_browser)
+    elif args.recording:
+        main(args.recording, args.runs, args.pacing, not args.show_browser)
+    else:
+        parser.error("either a recording folder or --synthetic is required")
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+File:        sketches.py
+Description: Times ZipSketches updates (listings per second) and merges of
+                scrape shards, and measures the error of the sketched zip
+                medians and quantiles against the exact pandas groupby, as
+                normalized rank error (how far the returned value's rank is
+                from the requested one, as a share of the zip's listings).
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       python -m benchmarks.sketches [--listings 1000000] [--zips 1000]
+"""
+
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from sketches import KLLSketch, ZipSketches
+
+QUANTILES = [0.01, 0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99]
+
+
+def synthetic_listings(n_listings, n_zips, seed=0):
+    """
+    Listings with skewed zip sizes (a few zips with thousands of listings,
+    most under SKETCH_K) and lognormal prices.
+    """
+
+    rng = np.random.default_rng(seed)
+    weights = rng.pareto(1.0, n_zips) + 1
+    zipcodes = rng.choice(
+        np.arange(10_001, 10_001 + n_zips), n_listings, p=weights / weights.sum()
+    )
+    prices = np.round(rng.lognormal(12.3, 0.5, n_listings), -3)
+    sqft = np.round(rng.lognormal(7.4, 0.3, n_listings))
+    return pd.DataFrame(
+        {"Zipcode": zipcodes, "Price": prices, "Price_Per_SqFt": prices / sqft}
+    )
+
+
+def rank_error(values, sketched, q):
+    """
+    Distance between q and the range of ranks the sketched value holds in
+    the sorted values.
+    """
+
+    low = np.searchsorted(values, sketched, side="left") / len(values)
+    high = np.searchsorted(values, sketched, side="right") / len(values)
+    return max(low - q, q - high, 0.0)
+
+
+def main(n_listings, n_zips, n_shards, seed):
+
+    df = synthetic_listings(n_listings, n_zips, seed)
+
+    start = time.perf_counter()
+    sketches = ZipSketches().update_frame(df)
+    update_s = time.perf_counter() - start
+
+    # the same listings split into shards, sketched apart and merged
+    shards = [
+        ZipSketches().update_frame(df.iloc[rows])
+        for rows in np.array_split(np.arange(len(df)), n_shards)
+    ]
+    start = time.perf_counter()
+    merged = shards[0]
+    for shard in shards[1:]:
+        merged.merge(shard)
+    merge_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    df_sketched = merged.to_frame().set_index("Zipcode")
+    query_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    df_exact = df.groupby("Zipcode").agg(
+        Listings=("Price", "size"),
+        Min_Price=("Price", "min"),
+        Max_Price=("Price", "max"),
+        Median_Price=("Price", "median"),
+    )
+    groupby_s = time.perf_counter() - start
+
+    # rank error of every zip's sketched quartiles and median
+    errors = []
+    for zipcode, prices in df.groupby("Zipcode")["Price"]:
+        values = np.sort(prices.to_numpy())
+        row = df_sketched.loc[zipcode]
+        for q, column in [
+            (0.25, "Price_Q25"),
+            (0.5, "Median_Price"),
+            (0.75, "Price_Q75"),
+        ]:
+            errors.append((len(values), rank_error(values, row[column], q)))
+    sizes, errors = np.array(errors).T
+    exact_counts = (
+        df_sketched.loc[df_exact.index, ["Listings", "Min_Price", "Max_Price"]]
+        .astype(float)
+        .eq(df_exact[["Listings", "Min_Price", "Max_Price"]].astype(float))
+        .all()
+        .all()
+    )
+
+    # one stream through a single sketch, across the whole distribution
+    prices = df["Price"].to_numpy()
+    sketch = KLLSketch()
+    for price in prices:
+        sketch.update(price)
+    values = np.sort(prices)
+    stream_error = max(
+        rank_error(values, sketched, q)
+        for q, sketched in zip(QUANTILES, sketch.quantiles(QUANTILES))
+    )
+
+    small = sizes <= sketch.k
+    print(f"{n_listings:,} listings, {n_zips:,} zips, {n_shards} shards")
+    print(f"update:          {n_listings / update_s:12,.0f} listings/s")
+    print(f"merge shards:    {merge_s:12.3f} s")
+    print(f"query all zips:  {query_s:12.3f} s (pandas groupby {groupby_s:.3f} s)")
+    print(f"counts, min, max exact: {exact_counts}")
+    print(f"zips <= k listings, max rank error:  {errors[small].max(initial=0):.2%}")
+    print(f"zips >  k listings, max rank error:  {errors[~small].max(initial=0):.2%}")
+    print(f"single sketch of every listing ({sketch.size:,} values kept for")
+    print(f"  {sketch.n:,}), max rank error at {QUANTILES}: {stream_error:.2%}")
+    return {
+        "updates_per_s": n_listings / update_s,
+        "merge_s": merge_s,
+        "max_rank_error": float(errors.max()),
+        "stream_rank_error": stream_error,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--listings", type=int, default=1_000_000)
+    parser.add_argument("--zips", type=int, default=1_000)
+    parser.add_argument("--shards", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    main(args.listings, args.zips, args.shards, args.seed)
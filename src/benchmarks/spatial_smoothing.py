@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+File:        spatial_smoothing.py
+Description: Times the zip adjacency build and the smoothing pass at the
+                scale of every US ZCTA, on a synthetic grid of square zips
+                whose true median prices vary smoothly in space. Each zip gets
+                a skewed, mostly small number of listings, and the error of
+                the raw and smoothed medians against the true ones is compared.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       python -m benchmarks.spatial_smoothing [--zips 33791]
+"""
+
+import time
+import argparse
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+from shapely import box
+from spatial_smoothing import ZipAdjacency, smooth_zip_metrics
+
+LOG_PRICE_SD = 0.5  # spread of listing prices within a zip
+
+
+def synthetic_zips(n_zips, seed=0):
+    """
+    Square zips on a grid, with a smooth true log median price field.
+    """
+
+    rng = np.random.default_rng(seed)
+    side = int(np.ceil(np.sqrt(n_zips)))
+    col, row = np.arange(n_zips) % side, np.arange(n_zips) // side
+    gdf = gpd.GeoDataFrame(
+        {"GEOID20": (10_000 + np.arange(n_zips)).astype(str)},
+        geometry=box(col, row, col + 1, row + 1),
+    )
+    phase = rng.uniform(0, 2 * np.pi, 2)
+    true_log_median = (
+        12.2 + 0.3 * np.sin(col / 9 + phase[0]) + 0.3 * np.cos(row / 13 + phase[1])
+    )
+    return gdf, true_log_median
+
+
+def main(n_zips, seed):
+
+    rng = np.random.default_rng(seed)
+    gdf, true_log_median = synthetic_zips(n_zips, seed)
+    zipcodes = gdf.GEOID20.astype(int).to_numpy()
+
+    start = time.perf_counter()
+    adjacency = ZipAdjacency.from_shapes(gdf)
+    build_s = time.perf_counter() - start
+
+    # most zips get a handful of listings
+    counts = np.minimum(rng.geometric(0.15, n_zips), 200)
+    df_house = pd.DataFrame(
+        {
+            "Zipcode": np.repeat(zipcodes, counts),
+            "Price": np.exp(
+                np.repeat(true_log_median, counts)
+                + rng.normal(0, LOG_PRICE_SD, counts.sum())
+            ),
+        }
+    )
+    df_zip = (
+        df_house.groupby("Zipcode").agg(Median_Price=("Price", "median")).reset_index()
+    )
+    income = rng.normal(62_000, 8_000, n_zips)
+    df_zip["Household_Median_Income"] = income
+    df_zip["Household_Median_Income_MOE"] = income * rng.uniform(0.05, 0.3, n_zips)
+
+    start = time.perf_counter()
+    df_smoothed = smooth_zip_metrics(df_house, df_zip, adjacency)
+    smooth_s = time.perf_counter() - start
+
+    def rmse(prices, mask=slice(None)):
+        return np.sqrt(np.mean((np.log(prices) - true_log_median)[mask] ** 2))
+
+    raw, smoothed = df_zip.Median_Price, df_smoothed.Median_Price_Smoothed
+    small = counts <= 3
+    print(
+        f"{n_zips:,} zips, {len(df_house):,} listings, {adjacency.matrix.nnz:,} edges"
+    )
+    print(f"adjacency build: {build_s:8.3f} s")
+    print(f"smoothing pass:  {smooth_s:8.3f} s")
+    print(f"log median price rmse, all zips:       raw {rmse(raw):.3f}", end="")
+    print(f"  smoothed {rmse(smoothed):.3f}")
+    print(f"log median price rmse, <= 3 listings:  raw {rmse(raw, small):.3f}", end="")
+    print(f"  smoothed {rmse(smoothed, small):.3f}")
+    return {"build_s": build_s, "smooth_s": smooth_s}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--zips", type=int, default=33_791)  # 2020 census ZCTAs
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    main(args.zips, args.seed)
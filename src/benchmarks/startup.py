@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+File:        startup.py
+Description: Measures the cold start of the real dashboard script, app.py
+                of the working tree (lazy startup: header + KPIs from the
+                precomputed summary) against app.py of the tree before the
+                lazy startup (--baseline, eager imports and loads), each run
+                with streamlit's AppTest in a fresh interpreter. Airtable
+                serves synthetic listings from memory. Reported: time to the
+                first delta sent to the browser (first paint) and to the end
+                of the script run (map view ready).
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       python -m benchmarks.startup [--listings 2000] [--repeat 5]
+                 [--baseline 0a55723^]
+"""
+
+import os
+import sys
+import json
+import pickle
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+from dashboard_map import load_zip_shapes
+from dashboard_summary import build_summary, save_summary
+from benchmarks.pipeline import build_inputs
+from benchmarks.synthetic import generate_airtable_records
+from benchmarks.static_export import on_shapefile_zips
+from config import PROJECT_ROOT, PATH_TO_ZIP_SHAPEFILE
+
+# last tree with the eager startup (parent of the lazy startup commit)
+BASELINE_REV = "0a55723^"
+
+# one cold start of app.py in the tree at cwd. airtable and the output paths
+# are patched before the script runs, the clock starts with the script run
+# (streamlit itself is already imported in a serving process)
+RUN = """
+import sys, time, json, pickle
+sys.path.insert(0, "src")
+import pyairtable, config
+from streamlit.runtime.forward_msg_queue import ForwardMsgQueue
+from streamlit.testing.v1 import AppTest
+
+with open(RECORDS_PATH, "rb") as f:
+    records = pickle.load(f)
+
+class Table:
+    def __init__(self, name):
+        self.name = name
+    def all(self):
+        return records[self.name]
+
+class Api:
+    def __init__(self, *args, **kwargs):
+        pass
+    def table(self, base_id, name):
+        return Table(name)
+
+pyairtable.Api = Api
+for name, path in OUTPUT_PATHS.items():
+    if hasattr(config, name):
+        setattr(config, name, path)
+
+first_delta = []
+enqueue = ForwardMsgQueue.enqueue
+def timed_enqueue(self, msg):
+    if not first_delta and msg.HasField("delta"):
+        first_delta.append(time.perf_counter())
+    enqueue(self, msg)
+ForwardMsgQueue.enqueue = timed_enqueue
+
+at = AppTest.from_file("src/app.py", default_timeout=600)
+start = time.perf_counter()
+at.run()
+script_run = time.perf_counter() - start
+assert not at.exception, [e.value for e in at.exception]
+print(json.dumps({"first_paint": first_delta[0] - start, "map_ready": script_run}))
+"""
+
+
+def run_once(tree, records_path, output_dir):
+    """
+    Runs one cold start of tree/src/app.py in a fresh interpreter and
+    returns its timings.
+    """
+
+    output_paths = {
+        "PATH_TO_DASHBOARD_SUMMARY": os.path.join(output_dir, "summary.json"),
+        "PATH_TO_DASHBOARD_DATASET": os.path.join(output_dir, "dashboard"),
+        "PATH_TO_GRID_CELLS": os.path.join(output_dir, "grid_cells.arrow"),
+    }
+    # the dataset file is written by the first start of the app
+    shutil.rmtree(output_paths["PATH_TO_DASHBOARD_DATASET"], ignore_errors=True)
+    header = f"RECORDS_PATH = {records_path!r}\nOUTPUT_PATHS = {output_paths!r}\n"
+    result = subprocess.run(
+        [sys.executable, "-c", header + RUN],
+        cwd=tree,
+        env=dict(os.environ, PYTHONUTF8="1"),
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"app.py failed in {tree}:\n{result.stderr[-3000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def export_tree(rev, directory):
+    """
+    Writes src and data/input of the repo at rev into directory.
+    """
+
+    archive = subprocess.run(
+        ["git", "archive", rev, "src", "data/input"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        check=True,
+    )
+    subprocess.run(["tar", "-x", "-C", directory], input=archive.stdout, check=True)
+
+
+def main(n_listings=2000, repeat=5, baseline=BASELINE_REV):
+
+    # dashboard data as served by airtable, on zips of the shapefile so the
+    # map has every geometry (as in benchmarks.static_export)
+    print(f"Generating {n_listings:,} synthetic listings...")
+    inputs = build_inputs(n_listings)
+    gdf_zip_shapes = load_zip_shapes(os.path.join(PROJECT_ROOT, PATH_TO_ZIP_SHAPEFILE))
+    df_house, df_zip = on_shapefile_zips(
+        inputs["df_house"].dropna(subset=["Affordable_Price"]),
+        inputs["df_zip"].dropna(subset=["PIR"]),
+        gdf_zip_shapes["Zipcode"],
+    )
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        records_path = os.path.join(work_dir, "records.pkl")
+        with open(records_path, "wb") as f:
+            pickle.dump(
+                {
+                    "House Listings": generate_airtable_records(df_house),
+                    "Zip Metrics": generate_airtable_records(df_zip),
+                },
+                f,
+            )
+
+        # summary of the last pipeline run, as written by main.py
+        output_dir = os.path.join(work_dir, "output")
+        os.makedirs(output_dir)
+        save_summary(
+            build_summary(df_house, df_zip), os.path.join(output_dir, "summary.json")
+        )
+
+        baseline_tree = os.path.join(work_dir, "baseline")
+        os.makedirs(baseline_tree)
+        export_tree(baseline, baseline_tree)
+
+        results = {}
+        for name, tree in [("eager", baseline_tree), ("lazy", PROJECT_ROOT)]:
+            runs = [run_once(tree, records_path, output_dir) for _ in range(repeat)]
+            results[name] = {
+                key: statistics.median(run[key] for run in runs)
+                for key in ("first_paint", "map_ready")
+            }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(
+        f"\nStartup of app.py, {len(df_house):,} listings "
+        f"(median of {repeat} cold runs, seconds)"
+    )
+    print(f"{'mode':<8}{'first paint':>14}{'map ready':>12}")
+    for name, timings in results.items():
+        print(f"{name:<8}{timings['first_paint']:>14.3f}{timings['map_ready']:>12.3f}")
+    print(
+        "Time-to-first-paint speedup: "
+        f"{results['eager']['first_paint'] / results['lazy']['first_paint']:.1f}x"
+    )
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--listings", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", default=BASELINE_REV)
+    args = parser.parse_args()
+    main(args.listings, args.repeat, args.baseline)
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+File:        static_export.py
+Description: Compares serving the dashboard live (streamlit: python work on
+                every visit) with serving the pre-rendered static bundle of
+                static_export.py. For the live app, one visit with warm caches
+                is timed: KPIs, folium map build + render, zip ranking and
+                chart frames, as done by app.py. For the static bundle, the
+                one-off export is timed, then concurrent visitors fetch
+                index.html, data.json and map.html from a plain threaded
+                HTTP server. Bytes sent per visit are reported for both
+                (the live map html is what the iframe receives).
+                No browser is available here, so the in-browser filtering
+                and chart rendering time of the static page isn't measured.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       python -m benchmarks.static_export [--listings 10000]
+                 [--visitors 50] [--repeat 3]
+"""
+
+import os
+import gzip
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import urllib.request
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+import numpy as np
+from static_export import export_static_dashboard, dashboard_frames
+from dashboard_summary import compute_kpis, rank_zips
+from dashboard_map import load_zip_shapes, build_geojson_map, build_map
+from chart_data import build_chart_data, filter_chart_data
+from benchmarks.pipeline import build_inputs
+from config import PROJECT_ROOT, PATH_TO_ZIP_SHAPEFILE
+
+BUNDLE_FILES = ["index.html", "data.json", "map.html"]
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def on_shapefile_zips(df_house, df_zip, shape_zips):
+    """
+    Moves the synthetic zips onto the shapefile's zips so every zip of the
+    map has a geometry (the extra synthetic zips are folded onto them, their
+    zip level rows dropped).
+    """
+
+    synthetic = np.sort(df_zip["Zipcode"].unique())
+    shape_zips = np.sort(shape_zips.astype(np.int64))
+    relabel = dict(
+        zip(synthetic, shape_zips[np.arange(len(synthetic)) % len(shape_zips)])
+    )
+    df_house = df_house.assign(Zipcode=df_house["Zipcode"].map(relabel))
+    df_zip = df_zip[df_zip["Zipcode"].isin(synthetic[: len(shape_zips)])]
+    return df_house, df_zip.assign(Zipcode=df_zip["Zipcode"].map(relabel))
+
+
+def live_visit(df_houses, df_zips, geojson_map, chart_data):
+    """
+    Server side work of one unfiltered visit to the live app (cached data and
+    geometries). Returns the bytes of the map html sent to the browser.
+    """
+
+    compute_kpis(df_houses)
+    map_html = build_map(geojson_map, df_zips, df_houses).get_root().render()
+    rank_zips(df_zips)
+    price_range = (int(df_houses["Price"].min()), int(df_houses["Price"].max()))
+    filter_chart_data(chart_data, price_range, [], True, True)
+    return len(map_html.encode())
+
+
+def static_visit(base_url):
+    """
+    Fetches the bundle as a browser would on a first visit, returns bytes.
+    """
+
+    size = 0
+    for name in BUNDLE_FILES:
+        with urllib.request.urlopen(f"{base_url}/{name}") as response:
+            size += len(response.read())
+    return size
+
+
+def main(n_listings, n_visitors, n_repeat):
+
+    print(f"Generating {n_listings:,} synthetic listings...")
+    inputs = build_inputs(n_listings)
+    shapefile_path = os.path.join(PROJECT_ROOT, PATH_TO_ZIP_SHAPEFILE)
+    gdf_zip_shapes = load_zip_shapes(shapefile_path)
+    # the map needs the PIR of every zip and the affordable price of every
+    # listing (synthetic zips without income data have neither)
+    df_house, df_zip = on_shapefile_zips(
+        inputs["df_house"].dropna(subset=["Affordable_Price"]),
+        inputs["df_zip"].dropna(subset=["PIR"]),
+        gdf_zip_shapes["Zipcode"],
+    )
+
+    # live app, warm caches (loaded records, geojson, chart bins)
+    df_houses, df_zips = dashboard_frames(df_house, df_zip)
+    geojson_map = build_geojson_map(df_zips, gdf_zip_shapes)
+    chart_data = build_chart_data(df_houses, df_zips)
+    live_times = []
+    for _ in range(n_repeat):
+        start = time.perf_counter()
+        live_bytes = live_visit(df_houses, df_zips, geojson_map, chart_data)
+        live_times.append(time.perf_counter() - start)
+
+    # static bundle: exported once, then served as plain files
+    directory = os.path.join(tempfile.mkdtemp(), "static")
+    start = time.perf_counter()
+    sizes = export_static_dashboard(df_house, df_zip, directory, shapefile_path)
+    export_s = time.perf_counter() - start
+
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), partial(QuietHandler, directory=directory)
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    static_times = []
+
+    def visitor():
+        start = time.perf_counter()
+        static_visit(base_url)
+        static_times.append(time.perf_counter() - start)
+
+    static_bytes = static_visit(base_url)
+    threads = [threading.Thread(target=visitor) for _ in range(n_visitors)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    static_wall_s = time.perf_counter() - start
+    server.shutdown()
+
+    gzip_bytes = sum(
+        len(gzip.compress(open(os.path.join(directory, name), "rb").read()))
+        for name in BUNDLE_FILES
+    )
+    shutil.rmtree(os.path.dirname(directory), ignore_errors=True)
+
+    print(f"\nStatic bundle ({export_s:.2f} s to export, once per pipeline run)")
+    for name, size in sizes.items():
+        print(f"  {name:<20}{size / 1024:>10,.1f} KB")
+
+    print(f"\nPer visit ({n_listings:,} listings)")
+    print(f"{'':<22}{'server ms':>10}{'KB sent':>10}")
+    print(
+        f"{'live (streamlit)':<22}{np.median(live_times) * 1000:>10.0f}"
+        f"{live_bytes / 1024:>10,.0f}"
+    )
+    print(
+        f"{'static':<22}{np.median(static_times) * 1000:>10.0f}"
+        f"{static_bytes / 1024:>10,.0f}"
+    )
+    print(f"{'static, gzipped':<22}{'':>10}{gzip_bytes / 1024:>10,.0f}")
+    print(
+        f"\n{n_visitors} concurrent static visitors served in {static_wall_s:.2f} s "
+        f"(live: ~{np.median(live_times) * n_visitors:.1f} s of python, "
+        f"one filter change = one more visit)"
+    )
+    return {
+        "export_s": export_s,
+        "live_ms": float(np.median(live_times) * 1000),
+        "static_ms": float(np.median(static_times) * 1000),
+        "live_bytes": live_bytes,
+        "static_bytes": static_bytes,
+        "static_gzip_bytes": gzip_bytes,
+        "static_wall_s": static_wall_s,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--listings", type=int, default=10_000)
+    parser.add_argument("--visitors", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args.listings, args.visitors, args.repeat)
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+File:        synthetic.py
+Description: Generators for realistic synthetic pipeline inputs: raw listing
+                dicts in the exact shape returned by scraper.extract_data,
+                ACS S1901 style income CSVs, and the Airtable records the
+                dashboard loads. Everything is seeded so benchmark runs are
+                reproducible.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       --
+"""
+
+import math
+import numpy as np
+import pandas as pd
+
+STREET_NAMES = [
+    "Main", "Elmwood", "Delaware", "Hertel", "Niagara", "Seneca", "Genesee",
+    "Roosevelt", "Parkside", "Colvin", "Kenmore", "Sheridan", "Transit",
+    "Union", "Maple", "Oak", "Walden", "Abbott", "Bailey", "Grant",
+]  # fmt: skip
+STREET_SUFFIXES = ["St", "Ave", "Rd", "Dr", "Blvd", "Pl", "Ct", "Ln"]
+CITIES = ["Buffalo", "Amherst", "Tonawanda", "Cheektowaga", "Lockport", "Batavia"]
+AGENCIES = [
+    "Howard Hanna", "MJ Peterson", "Keller Williams Realty", "RE/MAX Plus",
+    "Hunt Real Estate ERA", "Coldwell Banker Integrity", "Gurney Becker & Bourne",
+]  # fmt: skip
+DESCRIPTIONS = [
+    "Price reduced! Charming colonial close to shopping and schools.",
+    "New construction ranch with open floor plan and attached garage.",
+    "Multi-family investment opportunity, both units rented.",
+    "Sold as-is. Needs TLC, great bones and a large yard.",
+    "Open house Sunday 1-3pm. Updated kitchen and baths.",
+    "Move-in ready cape cod with hardwood floors throughout.",
+    "Spacious split level on a quiet street, new roof in 2021.",
+]
+
+# ACS S1901 household income brackets (lower bounds) and their column labels
+INCOME_BRACKETS = [
+    (0, "Less than $10,000"),
+    (10_000, "$10,000 to $14,999"),
+    (15_000, "$15,000 to $24,999"),
+    (25_000, "$25,000 to $34,999"),
+    (35_000, "$35,000 to $49,999"),
+    (50_000, "$50,000 to $74,999"),
+    (75_000, "$75,000 to $99,999"),
+    (100_000, "$100,000 to $149,999"),
+    (150_000, "$150,000 to $199,999"),
+    (200_000, "$200,000 or more"),
+]
+
+
+def synthetic_zips(n_zips, seed=0):
+    """
+    n_zips distinct 5 digit zipcodes (western NY style 14xxx first).
+    """
+
+    rng = np.random.default_rng(seed)
+    pool = np.arange(14001, 14001 + max(n_zips, 1) * 3)
+    return np.sort(rng.choice(pool, n_zips, replace=False))
+
+
+def _format_price(prices, rng):
+    """
+    Mixes the price formats seen on Redfin cards ($249,900 / $250K / $1.2M).
+    """
+
+    style = rng.random(len(prices))
+    return np.where(
+        style < 0.9,
+        ["$" + f"{int(p):,}" for p in prices],
+        np.where(
+            prices >= 1_000_000,
+            [f"${p / 1_000_000:.1f}M" for p in prices],
+            [f"${int(p / 1_000)}K" for p in prices],
+        ),
+    )
+
+
+def generate_listing_dicts(n, zips=None, seed=0, description_rate=0.8):
+    """
+    Raw listings in the shape returned by scraper.extract_data.
+
+    Parameters
+    ----------
+    n : int
+        number of listings
+    zips : array-like, optional
+        zipcodes to draw from (defaults to ~n/30 synthetic zips)
+    seed : int
+    description_rate : float
+        share of listings that have a description (the rest are nan)
+
+    Returns
+    -------
+    list of dicts
+        Price, Address, Specs, Description, Listed_By
+    """
+
+    rng = np.random.default_rng(seed)
+    if zips is None:
+        zips = synthetic_zips(min(max(n // 30, 10), 30_000), seed)
+    zips = np.asarray(zips)
+
+    # per zip price level, so zip medians differ realistically
+    zip_idx = rng.integers(0, len(zips), n)
+    zip_level = rng.lognormal(12.2, 0.35, len(zips))
+    sqft = np.clip(rng.normal(1_650, 550, n), 450, 8_000).round(-1)
+    prices = zip_level[zip_idx] * (sqft / 1_650) ** 0.7 * rng.lognormal(0, 0.25, n)
+    prices = np.clip(prices, 15_000, 5_000_000).round(-3)
+    beds = np.clip(np.round(sqft / 550 + rng.normal(0, 0.7, n)), 1, 9).astype(int)
+    baths = np.clip(np.round((beds * 0.6 + rng.normal(0, 0.5, n)) * 2) / 2, 1, 6)
+
+    price_str = _format_price(prices, rng)
+    numbers = rng.integers(1, 9_999, n)
+    streets = rng.choice(STREET_NAMES, n)
+    suffixes = rng.choice(STREET_SUFFIXES, n)
+    cities = rng.choice(CITIES, n)
+    agencies = rng.choice(AGENCIES, n)
+    phones = rng.integers(2_000_000, 9_999_999, n)
+    has_description = rng.random(n) < description_rate
+    descriptions = rng.choice(DESCRIPTIONS, n)
+
+    return [
+        {
+            "Price": str(price_str[i]),
+            "Address": f"{numbers[i]} {streets[i]} {suffixes[i]}, {cities[i]}, NY {zips[zip_idx[i]]}",
+            "Specs": f"{beds[i]} beds\n{baths[i]:g} baths\n{int(sqft[i]):,} sq ft",
+            "Description": descriptions[i] if has_description[i] else np.nan,
+            "Listed_By": f"Listing by {agencies[i]} (716) {str(phones[i])[:3]}-{str(phones[i])[3:]}",
+        }
+        for i in range(n)
+    ]
+
+
+_erf = np.frompyfunc(math.erf, 1, 1)
+
+
+def _lognormal_cdf(x, median, sigma):
+    with np.errstate(divide="ignore"):
+        z = (np.log(x) - np.log(median)) / (sigma * np.sqrt(2))
+    return 0.5 * (1 + _erf(z).astype(float))
+
+
+def generate_income_frame(zips, seed=0, missing_rate=0.02):
+    """
+    ACS S1901 style household income table for the given zips, with the
+    bracket distribution (percentages), margins of error, and the median.
+    Includes the '-' / '250,000+' quirks of the real census export.
+    """
+
+    rng = np.random.default_rng(seed)
+    zips = np.asarray(zips)
+    n = len(zips)
+
+    # bracket shares from a lognormal income distribution per zip
+    median = rng.lognormal(np.log(62_000), 0.35, n)
+    lower = np.array([b for b, _ in INCOME_BRACKETS], dtype=float)
+    cdf = _lognormal_cdf(np.append(lower, np.inf)[None, :], median[:, None], 0.8)
+    shares = np.round(np.diff(cdf, axis=1) * 100, 1)
+
+    households = rng.integers(50, 25_000, n)
+    moe_scale = 1.645 * np.sqrt(1 / households)
+
+    columns = {
+        "Geography": [f"860Z200US{z:05d}" for z in zips],
+        "Geographic Area Name": [f"ZCTA5 {z:05d}" for z in zips],
+        "Estimate!!Households!!Total": households,
+        "Margin of Error!!Households!!Total": np.round(households * moe_scale).astype(
+            int
+        ),
+    }
+    for j, (_, label) in enumerate(INCOME_BRACKETS):
+        columns[f"Estimate!!Households!!Total!!{label}"] = shares[:, j]
+        columns[f"Margin of Error!!Households!!Total!!{label}"] = np.round(
+            np.maximum(shares[:, j], 1) * moe_scale * 3, 1
+        )
+
+    median_str = np.round(median).astype(int).astype(str).astype(object)
+    median_moe = np.round(median * moe_scale).astype(int).astype(str).astype(object)
+    median_str[median >= 250_000] = "250,000+"
+    missing = rng.random(n) < missing_rate
+    median_str[missing] = "-"
+    median_moe[missing] = "**"
+    columns["Estimate!!Households!!Median income (dollars)"] = median_str
+    columns["Margin of Error!!Households!!Median income (dollars)"] = median_moe
+
+    return pd.DataFrame(columns)
+
+
+def write_income_csv(path, zips, seed=0):
+    """
+    Writes an income table with the two header rows of the census export
+    (column ids, then labels), so it reads with pd.read_csv(path, header=1).
+    """
+
+    df_income = generate_income_frame(zips, seed)
+    ids = ["GEO_ID", "NAME"] + [
+        f"S1901_C01_{i:03d}" for i in range(df_income.shape[1] - 2)
+    ]
+    with open(path, "w", newline="") as f:
+        f.write(",".join(f'"{c}"' for c in ids) + "\n")
+        df_income.to_csv(f, index=False)
+
+    return path
+
+
+def generate_airtable_records(df, created="2025-08-24T12:00:00.000Z"):
+    """
+    Wraps the rows of a pipeline output frame as Airtable records (what
+    table.all() returns to the dashboard), including the Created field.
+    """
+
+    df = df.replace([np.nan], None)
+    return [
+        {
+            "id": f"rec{i:014d}",
+            "createdTime": created,
+            "fields": {**row, "Created": created},
+        }
+        for i, row in enumerate(df.to_dict(orient="records"))
+    ]
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+File:        text_features.py
+Description: Throughput of description_features and hash_vectorize on up to
+                1M synthetic card descriptions (sentences drawn from the
+                synthetic templates plus street / number noise), against a
+                per row python re version on a sample, whose flags and scores
+                must match.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       python -m benchmarks.text_features [--descriptions 1000000]
+"""
+
+import re
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from text_features import (
+    KEYWORDS,
+    CONDITION_POSITIVE,
+    CONDITION_NEGATIVE,
+    description_features,
+    hash_vectorize,
+)
+from benchmarks.synthetic import DESCRIPTIONS, STREET_NAMES
+
+EXTRA_SENTENCES = [
+    "Investor special, cash only.",
+    "Two-family up/down with separate utilities.",
+    "Fully renovated with new roof and new windows.",
+    "Estate sale, bring your ideas!",
+    "Turnkey home, immaculate and well-maintained.",
+    "New price! Seller motivated.",
+    "Handyman special, water damage in basement.",
+]
+
+
+def synthetic_descriptions(n, seed=0, missing_rate=0.2):
+    """
+    Descriptions of one to three random sentences, some missing.
+    """
+
+    rng = np.random.default_rng(seed)
+    sentences = np.array(DESCRIPTIONS + EXTRA_SENTENCES, dtype=object)
+    streets = np.array(STREET_NAMES, dtype=object)
+    text = (
+        rng.choice(sentences, n)
+        + " Near "
+        + rng.choice(streets, n)
+        + " St, "
+        + rng.integers(1, 4, n).astype(str).astype(object)
+        + " car garage."
+    )
+    extra = rng.random(n) < 0.5
+    text[extra] = text[extra] + " " + rng.choice(sentences, extra.sum())
+    text[rng.random(n) < missing_rate] = None
+    return pd.Series(text)
+
+
+def description_features_loop(descriptions):
+    """
+    Reference version, one description at a time with python's re.
+    """
+
+    flags = {name: re.compile("|".join(p)) for name, p in KEYWORDS.items()}
+    positive = re.compile("|".join(f"(?:{p})" for p in CONDITION_POSITIVE))
+    negative = re.compile("|".join(f"(?:{p})" for p in CONDITION_NEGATIVE))
+    rows = []
+    for text in descriptions:
+        text = (text or "").lower()
+        row = {name: bool(pattern.search(text)) for name, pattern in flags.items()}
+        n_pos, n_neg = len(positive.findall(text)), len(negative.findall(text))
+        row["Condition_Score"] = round((n_pos - n_neg) / (n_pos + n_neg + 1), 2)
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def main(n, sample, seed):
+
+    descriptions = synthetic_descriptions(n, seed)
+
+    start = time.perf_counter()
+    df_features = description_features(descriptions)
+    features_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    X = hash_vectorize(descriptions)
+    hash_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = description_features_loop(descriptions[:sample])
+    loop_s = (time.perf_counter() - start) * n / sample
+
+    matches = df_features[:sample].reset_index(drop=True).equals(expected)
+    print(f"{n:,} descriptions")
+    print(f"flags + condition score: {features_s:7.2f} s  ({n / features_s:,.0f} / s)")
+    print(f"hashed bag of words:     {hash_s:7.2f} s  ({X.nnz:,} nonzeros)")
+    print(f"per row python re:       {loop_s:7.2f} s  (extrapolated from {sample:,})")
+    print(f"matches reference: {matches}")
+    print(df_features.drop(columns="Condition_Score").mean().round(3).to_string())
+    return {"features_s": features_s, "hash_s": hash_s, "loop_s": loop_s}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--descriptions", type=int, default=1_000_000)
+    parser.add_argument("--sample", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    main(args.descriptions, args.sample, args.seed)
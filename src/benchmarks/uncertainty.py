@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+File:        uncertainty.py
+Description: Times pir_uncertainty on synthetic zip and house level results,
+                from a metro sized run up to every US ZCTA, and checks that the
+                order statistic bootstrap of the median matches resampling
+                the listings for a few zips.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       python -m benchmarks.uncertainty [--zips 150 1000 5000] [--draws 1000]
+"""
+
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from uncertainty import pir_uncertainty
+
+
+def synthetic_results(n_zips, listings_per_zip, seed=0):
+    """
+    House and zip level frames with the columns pir_uncertainty reads, with
+    a skewed number of listings per zip (many small zips).
+    """
+
+    rng = np.random.default_rng(seed)
+    zips = np.arange(10_001, 10_001 + n_zips)
+    counts = np.maximum(rng.geometric(1 / listings_per_zip, n_zips), 1)
+    df_house = pd.DataFrame(
+        {
+            "Zipcode": np.repeat(zips, counts),
+            "Price": np.round(rng.lognormal(12.3, 0.5, counts.sum()), -3),
+        }
+    )
+    income = rng.lognormal(np.log(62_000), 0.35, n_zips)
+    df_zip = (
+        df_house.groupby("Zipcode").agg(Median_Price=("Price", "median")).reset_index()
+    )
+    df_zip["Household_Median_Income"] = income
+    df_zip["Household_Median_Income_MOE"] = income * rng.uniform(0.05, 0.4, n_zips)
+    df_zip["PIR"] = (df_zip.Median_Price / df_zip.Household_Median_Income).round(1)
+    return df_house, df_zip
+
+
+def check_bootstrap(df_house, df_zip, draws, n_check=5):
+    """
+    Largest gap between the simulated PIR interval bounds and those from
+    resampled listings, for the first n_check zips, relative to the width of
+    the interval (both are monte carlo estimates, so a few percent is noise).
+    """
+
+    df_result = pir_uncertainty(df_house, df_zip, draws=draws)
+    rng = np.random.default_rng(1)
+    gap = 0.0
+    for row in df_zip.head(n_check).itertuples():
+        prices = df_house.loc[df_house.Zipcode == row.Zipcode, "Price"].to_numpy()
+        medians = np.median(rng.choice(prices, (draws, len(prices))), axis=1)
+        se = row.Household_Median_Income_MOE / 1.645
+        incomes = row.Household_Median_Income + se * rng.standard_normal(draws)
+        low, high = np.percentile(medians / incomes, [5, 95])
+        simulated = df_result.loc[df_result.Zipcode == row.Zipcode].iloc[0]
+        width = max(high - low, 0.1)
+        gap = max(
+            gap,
+            abs(simulated.PIR_Low - low) / width,
+            abs(simulated.PIR_High - high) / width,
+        )
+    return gap
+
+
+def main(zip_counts, listings_per_zip, draws):
+
+    print(f"{'zips':>8}{'listings':>10}{'draws':>7}{'seconds':>10}")
+    results = []
+    for n_zips in zip_counts:
+        df_house, df_zip = synthetic_results(n_zips, listings_per_zip)
+        start = time.perf_counter()
+        pir_uncertainty(df_house, df_zip, draws=draws)
+        seconds = time.perf_counter() - start
+        print(f"{n_zips:>8,}{len(df_house):>10,}{draws:>7}{seconds:>10.2f}")
+        results.append({"zips": n_zips, "seconds": seconds})
+
+    df_house, df_zip = synthetic_results(20, listings_per_zip)
+    print(
+        f"max interval gap vs resampling: "
+        f"{check_bootstrap(df_house, df_zip, draws):.1%} of the interval width"
+    )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--zips", type=int, nargs="+", default=[150, 1_000, 5_000])
+    parser.add_argument("--listings-per-zip", type=int, default=30)
+    parser.add_argument("--draws", type=int, default=1_000)
+    args = parser.parse_args()
+    main(args.zips, args.listings_per_zip, args.draws)
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+File:        chart_data.py
+Description: Pre-aggregates the house and zip level data into small chart
+                datasets (price histograms, price per sqft, a downsampled
+                sqft vs price scatter and PIR rankings). These are built once
+                per data version, and filtered views are produced by combining
+                the precomputed bins rather than rescanning the listings.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       --
+"""
+
+import numpy as np
+import pandas as pd
+from config import (
+    CHART_PRICE_BIN_WIDTH,
+    CHART_PRICE_BIN_MAX,
+    CHART_SCATTER_POINTS_PER_ZIP,
+    CHART_SCATTER_MAX_POINTS,
+)
+
+#########
+# HELPERS
+#########
+
+
+def price_bin_edges(bin_width=CHART_PRICE_BIN_WIDTH, bin_max=CHART_PRICE_BIN_MAX):
+    """
+    Fixed price bin edges shared by every data version, so that histograms
+    from different runs line up. The last bin is open ended (bin_max+).
+    """
+    return np.arange(0, bin_max + bin_width, bin_width, dtype=float)
+
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling. Picks the points that best
+    preserve the visual shape of a series (x must be sorted ascending).
+
+    Parameters
+    ----------
+    x : np.ndarray
+    y : np.ndarray
+    n_out : int
+        number of points to keep
+
+    Returns
+    -------
+    np.ndarray
+        indices of the selected points
+    """
+
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # first and last points are always kept, the rest is split into buckets
+    bucket_edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    prev = 0
+    for i in range(n_out - 2):
+        start, end = bucket_edges[i], bucket_edges[i + 1]
+
+        # average of the next bucket is the third corner of the triangle
+        next_start = end
+        next_end = bucket_edges[i + 2] if i + 2 < len(bucket_edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        # keep the point of this bucket forming the largest triangle
+        area = np.abs(
+            (x[prev] - avg_x) * (y[start:end] - y[prev])
+            - (x[prev] - x[start:end]) * (avg_y - y[prev])
+        )
+        prev = start + int(np.argmax(area))
+        selected[i + 1] = prev
+
+    return selected
+
+
+##################
+# PRE-AGGREGATION
+##################
+
+
+def build_chart_data(df_houses, df_zips):
+    """
+    Builds every chart dataset once from the full house and zip level data.
+
+    Per (zip, affordable flag, price bin) it stores listing counts and the
+    sum of price per sqft, so any combination of the sidebar filters can be
+    answered by summing bins. The scatter plot keeps at most
+    CHART_SCATTER_POINTS_PER_ZIP points per zip, selected with LTTB.
+
+    Returns
+    -------
+    dict
+        zips, bin_edges, counts, ppsf_sum, ppsf_count, scatter, pir_ranking
+    """
+
+    edges = price_bin_edges()
+    zips = np.sort(df_houses["Zipcode"].astype(str).unique())
+    n_zips, n_bins = len(zips), len(edges)
+
+    # locate every listing in the (zip, affordable, bin) cube
+    zip_idx = np.searchsorted(zips, df_houses["Zipcode"].astype(str).to_numpy())
+    aff_idx = df_houses["Is_Affordable"].to_numpy().astype(int)
+    price = df_houses["Price"].to_numpy(dtype=float)
+    bin_idx = np.clip(np.searchsorted(edges, price, side="right") - 1, 0, n_bins - 1)
+    flat_idx = (zip_idx * 2 + aff_idx) * n_bins + bin_idx
+    shape = (n_zips, 2, n_bins)
+
+    counts = np.bincount(flat_idx, minlength=n_zips * 2 * n_bins).reshape(shape)
+
+    # price per sqft is summed so that filtered views can take a mean
+    ppsf = df_houses["Price_Per_SqFt"].to_numpy(dtype=float)
+    valid = np.isfinite(ppsf)
+    ppsf_sum = np.bincount(
+        flat_idx[valid], weights=ppsf[valid], minlength=n_zips * 2 * n_bins
+    ).reshape(shape)
+    ppsf_count = np.bincount(flat_idx[valid], minlength=n_zips * 2 * n_bins).reshape(
+        shape
+    )
+
+    # downsample sqft vs price per zip
+    df_scatter = pd.DataFrame(
+        {
+            "Zipcode": df_houses["Zipcode"].astype(str).to_numpy(),
+            "SqFt": df_houses["SqFt"].to_numpy(dtype=float),
+            "Price": price,
+            "Is_Affordable": aff_idx.astype(bool),
+        }
+    ).dropna(subset=["SqFt", "Price"])
+    df_scatter = df_scatter.sort_values(["Zipcode", "SqFt"], kind="stable")
+    scatter_parts = []
+    for _, df_zip_points in df_scatter.groupby("Zipcode", sort=False):
+        keep = lttb(
+            df_zip_points["SqFt"].to_numpy(),
+            df_zip_points["Price"].to_numpy(),
+            CHART_SCATTER_POINTS_PER_ZIP,
+        )
+        scatter_parts.append(df_zip_points.iloc[keep])
+    df_scatter = (
+        pd.concat(scatter_parts, ignore_index=True)
+        if scatter_parts
+        else df_scatter.iloc[0:0]
+    )
+
+    # zips ranked from most to least affordable
+    df_pir_ranking = (
+        df_zips[["Zipcode", "PIR", "Median_Price", "Household_Median_Income"]]
+        .dropna(subset=["PIR"])
+        .sort_values("PIR")
+        .reset_index(drop=True)
+    )
+    df_pir_ranking["Zipcode"] = df_pir_ranking["Zipcode"].astype(str)
+
+    return {
+        "zips": zips,
+        "bin_edges": edges,
+        "counts": counts,
+        "ppsf_sum": ppsf_sum,
+        "ppsf_count": ppsf_count,
+        "scatter": df_scatter,
+        "pir_ranking": df_pir_ranking,
+    }
+
+
+################
+# FILTERED VIEWS
+################
+
+
+def filter_chart_data(
+    chart_data, price_range, selected_zips, show_affordable, show_unaffordable
+):
+    """
+    Produces the chart frames for the current sidebar filters by combining the
+    precomputed bins. Cost depends on the number of zips and bins only, never
+    on the number of listings.
+
+    NOTE: the price filter is applied at bin granularity, i.e. a bin is
+    included if it overlaps the selected price range.
+    """
+
+    zips = chart_data["zips"]
+    edges = chart_data["bin_edges"]
+
+    # zip selection (empty means all)
+    if selected_zips:
+        zip_mask = np.isin(zips, [str(z) for z in selected_zips])
+    else:
+        zip_mask = np.ones(len(zips), dtype=bool)
+
+    # affordable flag selection (index 0 = unaffordable, 1 = affordable)
+    aff_mask = np.array([show_unaffordable, show_affordable])
+
+    # bins overlapping the price range
+    bin_upper = np.append(edges[1:], np.inf)
+    bin_mask = (bin_upper > price_range[0]) & (edges <= price_range[1])
+
+    def _combine(cube):
+        return cube[zip_mask][:, aff_mask][:, :, bin_mask]
+
+    counts = _combine(chart_data["counts"])
+    ppsf_sum = _combine(chart_data["ppsf_sum"])
+    ppsf_count = _combine(chart_data["ppsf_count"])
+
+    # price histogram over the selected zips
+    bin_labels = [
+        f"${int(lo / 1_000):,}K+" if hi == np.inf else f"${int(lo / 1_000):,}K"
+        for lo, hi in zip(edges[bin_mask], bin_upper[bin_mask])
+    ]
+    df_hist = pd.DataFrame(
+        {"Price Bin": bin_labels, "Homes": counts.sum(axis=(0, 1))}
+    ).set_index("Price Bin")
+
+    # average price per sqft per zip
+    zip_ppsf_count = ppsf_count.sum(axis=(1, 2))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        zip_ppsf = ppsf_sum.sum(axis=(1, 2)) / zip_ppsf_count
+    df_ppsf = pd.DataFrame({"Zipcode": zips[zip_mask], "Price Per SqFt": zip_ppsf})[
+        zip_ppsf_count > 0
+    ].set_index("Zipcode")
+
+    # scatter points, already downsampled per zip
+    df_scatter = chart_data["scatter"]
+    scatter_mask = (
+        df_scatter["Zipcode"].isin(zips[zip_mask])
+        & df_scatter["Price"].between(price_range[0], price_range[1])
+        & (
+            (df_scatter["Is_Affordable"] & show_affordable)
+            | (~df_scatter["Is_Affordable"] & show_unaffordable)
+        )
+    )
+    df_scatter = df_scatter[scatter_mask].sort_values("SqFt")
+    if len(df_scatter) > CHART_SCATTER_MAX_POINTS:
+        keep = lttb(
+            df_scatter["SqFt"].to_numpy(),
+            df_scatter["Price"].to_numpy(),
+            CHART_SCATTER_MAX_POINTS,
+        )
+        df_scatter = df_scatter.iloc[keep]
+
+    # pir ranking of the selected zips
+    df_pir_ranking = chart_data["pir_ranking"]
+    if selected_zips:
+        df_pir_ranking = df_pir_ranking[
+            df_pir_ranking["Zipcode"].isin([str(z) for z in selected_zips])
+        ]
+
+    return {
+        "price_hist": df_hist,
+        "ppsf_by_zip": df_ppsf,
+        "scatter": df_scatter,
+        "pir_ranking": df_pir_ranking,
+    }
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+File:        checkpoint.py
+Description: Local checkpoints so a failed run can resume instead of starting
+                over. The scrape appends every finished page (its listings and
+                the next page url) to a json lines file, and main.py marks the
+                stages whose Arrow outputs (see columnar.py) were written by
+                the current run. Files are written atomically, so a crash
+                mid-write never leaves a corrupt checkpoint behind.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       python main.py --resume
+"""
+
+import os
+import json
+import shutil
+from columnar import stage_path, write_stage, read_stage_frame
+from config import PATH_TO_STAGE_OUTPUTS
+
+PAGES_NAME = "scrape_pages.jsonl"
+STAGES_NAME = "stages.json"
+
+
+class Checkpoint:
+    """
+    Checkpoints of one run, kept in a local folder until the run completes.
+
+    Parameters
+    ----------
+    directory : str
+        checkpoint folder, created if needed
+    stage_dir : str
+        folder of the stage outputs, which outlive the checkpoints
+    """
+
+    def __init__(self, directory, stage_dir=PATH_TO_STAGE_OUTPUTS):
+        self.directory = directory
+        self.stage_dir = stage_dir
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def clear(self):
+        """
+        Removes every checkpoint (new run, or a run that completed). Stage
+        outputs are kept, they are the inputs of independently re-run stages.
+        """
+
+        shutil.rmtree(self.directory, ignore_errors=True)
+        os.makedirs(self.directory, exist_ok=True)
+
+    #######
+    # PAGES
+    #######
+
+    def save_page(self, page_num, parsed_data, next_url):
+        """
+        Appends a finished page. next_url is None for the last page.
+        """
+
+        # nan descriptions are stored as null
+        record = {
+            "page": page_num,
+            "next_url": next_url,
+            "listings": [
+                {k: (None if v != v else v) for k, v in listing.items()}
+                for listing in parsed_data
+            ],
+        }
+        with open(self._path(PAGES_NAME), "a") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def load_pages(self):
+        """
+        Listings of every checkpointed page.
+
+        Returns
+        -------
+        listing_data : list of dicts
+        last_page : int
+            0 if no page was checkpointed
+        next_url : str or None
+            where to continue, None if the scrape had finished
+        """
+
+        listing_data, last_page, next_url = [], 0, None
+        if not os.path.exists(self._path(PAGES_NAME)):
+            return listing_data, last_page, next_url
+
+        with open(self._path(PAGES_NAME)) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # partially written last line of a crashed run
+                    break
+                listing_data.extend(record["listings"])
+                last_page, next_url = record["page"], record["next_url"]
+
+        return listing_data, last_page, next_url
+
+    ########
+    # STAGES
+    ########
+
+    def _completed_stages(self):
+        if not os.path.exists(self._path(STAGES_NAME)):
+            return []
+        with open(self._path(STAGES_NAME)) as f:
+            return json.load(f)
+
+    def save_stage(self, name, df):
+        """
+        Writes a stage's output frame (see columnar.py) and marks the stage as
+        completed in this run.
+        """
+
+        write_stage(df, stage_path(name, self.stage_dir))
+
+        completed = self._completed_stages() + [name]
+        tmp_path = self._path(f"{STAGES_NAME}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(completed, f)
+        os.replace(tmp_path, self._path(STAGES_NAME))
+
+    def has_stage(self, *names):
+        """
+        Whether all the stages were completed in this run.
+        """
+        completed = self._completed_stages()
+        return all(name in completed for name in names)
+
+    def load_stage(self, name):
+        return read_stage_frame(stage_path(name, self.stage_dir))
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+File:        columnar.py
+Description: Arrow IPC files as the hand-off format between pipeline stages
+                (listings.arrow, house_metrics.arrow, zip_metrics.arrow).
+                Files are written uncompressed so readers can memory map them
+                and get zero-copy column buffers, which lets stages run as
+                separate processes, be re-run on their own, and be loaded by
+                the dashboard without a CSV / JSON round trip.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       write_stage(df_listings, stage_path("listings"))
+             df_listings = read_stage_frame(stage_path("listings"))
+             read_partitions("house_metrics", PATH_TO_METRO_PARTITIONS)
+"""
+
+import os
+import glob
+import pyarrow as pa
+from config import PATH_TO_STAGE_OUTPUTS
+
+STAGE_FILES = {
+    "listings": "listings.arrow",
+    "house_metrics": "house_metrics.arrow",
+    "zip_metrics": "zip_metrics.arrow",
+}
+
+
+def stage_path(name, directory=PATH_TO_STAGE_OUTPUTS):
+    return os.path.join(directory, STAGE_FILES.get(name, f"{name}.arrow"))
+
+
+def write_stage(df, path):
+    """
+    Writes a stage output frame as an Arrow IPC file, atomically (a reader
+    never sees a half written file).
+
+    Returns
+    -------
+    pa.Table
+        the table that was written
+    """
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    tmp_path = f"{path}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+    return table
+
+
+def read_stage(path, columns=None):
+    """
+    Memory maps a stage output. Fixed width columns are zero-copy views of
+    the file, only the pages actually touched are read from disk.
+
+    Parameters
+    ----------
+    path : str
+    columns : list of str, optional
+        subset of columns to read
+
+    Returns
+    -------
+    pa.Table
+    """
+
+    source = pa.memory_map(path, "r")
+    table = pa.ipc.open_file(source).read_all()
+    if columns is not None:
+        table = table.select(columns)
+    return table
+
+
+def read_stage_frame(path, columns=None):
+    """
+    Stage output as a pandas frame. Numeric columns without nulls are
+    zero-copy views of the memory mapped file (read only), list columns such
+    as Parsed_Address come back as python lists.
+    """
+
+    table = read_stage(path, columns)
+    list_columns = [
+        field.name for field in table.schema if pa.types.is_list(field.type)
+    ]
+
+    df = table.drop_columns(list_columns).to_pandas(split_blocks=True)
+    for name in list_columns:
+        df[name] = table.column(name).to_pylist()
+
+    return df[table.column_names]
+
+
+def read_partitions(name, directory):
+    """
+    One stage output across hive style partition folders (e.g. the metro=<name>
+    folders of batch_runner.py), with the partition key added as a column.
+
+    Parameters
+    ----------
+    name : str
+        stage name, e.g. "house_metrics"
+    directory : str
+        folder holding the <key>=<value> partition folders
+
+    Returns
+    -------
+    pa.Table
+    """
+
+    filename = os.path.basename(stage_path(name, directory))
+    tables = []
+    for path in sorted(glob.glob(os.path.join(directory, "*=*", filename))):
+        key, value = os.path.basename(os.path.dirname(path)).split("=", 1)
+        table = read_stage(path)
+        tables.append(table.append_column(key, pa.array([value] * len(table))))
+    if not tables:
+        raise FileNotFoundError(f"No {filename} partitions in {directory}")
+
+    # e.g. a column that is all null in one partition is typed in another
+    return pa.concat_tables(tables, promote_options="permissive")
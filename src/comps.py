@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""
+File:        comps.py
+Description: Comparable listings ("comps") of every house: its nearest
+                similar listings (beds, baths and sqft within tolerances),
+                the nearest similar listing that is affordable in its own
+                zip, and where its price per sqft falls among its neighbours.
+                Listings are indexed in a KD-tree over their lat / lng as
+                points on the unit sphere (chord length orders neighbours
+                like great circle distance, across any metros), and all
+                listings are queried in batches, so the whole run is
+                O(n log n). The search starts from the nearest few listings
+                and widens only for listings with too few similar ones.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       df_house = df_house.join(comparable_listings(df_house))
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+from config import (
+    COMPS_K,
+    COMPS_CANDIDATES,
+    COMPS_MAX_CANDIDATES,
+    COMPS_MAX_BED_DIFF,
+    COMPS_MAX_BATH_DIFF,
+    COMPS_SQFT_TOLERANCE,
+    COMPS_CHUNK_SIZE,
+)
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def unit_vectors(lat, lng):
+    """
+    Lat / lng in degrees as (n x 3) points on the unit sphere.
+    """
+
+    lat, lng = np.radians(lat), np.radians(lng)
+    return np.column_stack(
+        [np.cos(lat) * np.cos(lng), np.cos(lat) * np.sin(lng), np.sin(lat)]
+    )
+
+
+def chord_to_km(chord):
+    """
+    Great circle distance of a chord between unit sphere points.
+    """
+
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2, 0, 1))
+
+
+def _similar(features, rows, neighbors):
+    # (rows x candidates) mask of neighbors similar to their row, a missing
+    # value (e.g. no sqft on the card) doesn't rule a neighbor out
+    beds, baths, sqft = [
+        (values[rows][:, None], values[neighbors]) for values in features
+    ]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        checks = [
+            np.abs(beds[1] - beds[0]) <= COMPS_MAX_BED_DIFF,
+            np.abs(baths[1] - baths[0]) <= COMPS_MAX_BATH_DIFF,
+            np.abs(sqft[1] / sqft[0] - 1) <= COMPS_SQFT_TOLERANCE,
+        ]
+    similar = np.ones(neighbors.shape, dtype=bool)
+    for (own, other), check in zip([beds, baths, sqft], checks):
+        similar &= check | np.isnan(own) | np.isnan(other)
+    return similar
+
+
+def _first_k(mask, k):
+    # mask keeping only the first k true entries of every row
+    return mask & (np.cumsum(mask, axis=1) <= k)
+
+
+def _masked_median(values, mask):
+    # row medians of the masked entries, nan for rows with none
+    values = np.sort(np.where(mask, values, np.nan), axis=1)
+    counts = mask.sum(axis=1)
+    low = np.maximum((counts - 1) // 2, 0)[:, None]
+    high = (counts // 2)[:, None]
+    median = 0.5 * (
+        np.take_along_axis(values, low, axis=1)[:, 0]
+        + np.take_along_axis(values, high, axis=1)[:, 0]
+    )
+    return np.where(counts > 0, median, np.nan)
+
+
+def _nearest_similar(tree, tree_rows, points, features, rows, k, candidates):
+    """
+    The k nearest listings similar to each of rows, nearest first.
+
+    Parameters
+    ----------
+    tree : cKDTree
+        over points[tree_rows]
+    tree_rows : np.ndarray
+        listing of every tree point
+    points, features : unit vectors and [beds, baths, sqft] of all listings
+    rows : np.ndarray
+        listings to find comps for
+    k : int
+    candidates : int
+        nearest tree points searched at first, multiplied by 4 for listings
+        with fewer than k similar ones, up to COMPS_MAX_CANDIDATES
+
+    Returns
+    -------
+    (np.ndarray, np.ndarray)
+        (rows x k) listings, -1 where fewer were found, and chord distances
+    """
+
+    found = np.full((len(rows), k), -1)
+    chords = np.full((len(rows), k), np.inf)
+    pending = np.arange(len(rows))
+    n_query = candidates
+    while len(pending):
+        n_query = min(n_query, tree.n)
+        # wider searches for fewer listings, same size arrays
+        batch = max(len(rows) * candidates // n_query, 1)
+        done = []
+        for start in range(0, len(pending), batch):
+            part = pending[start : start + batch]
+            distance, hits = tree.query(points[rows[part]], k=n_query, workers=-1)
+            hits = tree_rows[hits.reshape(len(part), n_query)]
+            distance = distance.reshape(len(part), n_query)
+            similar = (hits != rows[part][:, None]) & _similar(
+                features, rows[part], hits
+            )
+            similar = _first_k(similar, k)
+
+            # slot of each kept hit in its row
+            r, c = np.nonzero(similar)
+            slot = np.cumsum(similar, axis=1)[r, c] - 1
+            found[part[r], slot] = hits[r, c]
+            chords[part[r], slot] = distance[r, c]
+            done.append(similar.sum(axis=1) >= k)
+
+        if n_query >= min(tree.n, COMPS_MAX_CANDIDATES):
+            break
+        pending = pending[~np.concatenate(done)]
+        n_query *= 4
+    return found, chords
+
+
+def comparable_listings(
+    df_house,
+    k=COMPS_K,
+    candidates=COMPS_CANDIDATES,
+    chunk_size=COMPS_CHUNK_SIZE,
+):
+    """
+    Comps of every listing, from batched k nearest neighbour queries.
+
+    Parameters
+    ----------
+    df_house : pd.DataFrame
+        house level results (Lat, Lng, Address, Price, Affordable_Price,
+        Bedrooms, Bathrooms, SqFt, Price_Per_SqFt)
+    k : int
+        comps per listing
+    candidates : int
+        nearest listings searched first for similar ones
+    chunk_size : int
+        listings queried at once, bounds the (chunk x candidates) arrays
+
+    Returns
+    -------
+    pd.DataFrame
+        indexed like df_house: Comps_Count, Comps_Median_Price,
+        Local_PPSF_Percentile (percent of the k nearest listings with a
+        lower price per sqft), Nearest_Affordable_Address,
+        Nearest_Affordable_Price and Nearest_Affordable_Km (the nearest
+        similar listing priced within its Affordable_Price). Comps are only
+        searched for among the nearest COMPS_MAX_CANDIDATES listings, and
+        there are none without coordinates.
+    """
+
+    n = len(df_house)
+    result = pd.DataFrame(
+        {
+            "Comps_Count": np.zeros(n),
+            "Comps_Median_Price": np.nan,
+            "Local_PPSF_Percentile": np.nan,
+            "Nearest_Affordable_Address": pd.Series([None] * n, dtype=object),
+            "Nearest_Affordable_Price": np.nan,
+            "Nearest_Affordable_Km": np.nan,
+        }
+    )
+
+    lat = df_house["Lat"].to_numpy(dtype=float)
+    lng = df_house["Lng"].to_numpy(dtype=float)
+    located = np.flatnonzero(~np.isnan(lat) & ~np.isnan(lng))
+    if len(located) < 2:
+        result.index = df_house.index
+        return result
+
+    # everything below is indexed by position among the located listings
+    n_located = len(located)
+    points = unit_vectors(lat[located], lng[located])
+    price = df_house["Price"].to_numpy(dtype=float)[located]
+    ppsf = df_house["Price_Per_SqFt"].to_numpy(dtype=float)[located]
+    address = df_house["Address"].to_numpy(dtype=object)[located]
+    features = [
+        df_house[col].to_numpy(dtype=float)[located]
+        for col in ["Bedrooms", "Bathrooms", "SqFt"]
+    ]
+    affordable = np.flatnonzero(
+        price <= df_house["Affordable_Price"].to_numpy(dtype=float)[located]
+    )
+
+    tree = cKDTree(points)
+    affordable_tree = cKDTree(points[affordable]) if len(affordable) else None
+
+    comps_count = np.zeros(n_located)
+    comps_median = np.full(n_located, np.nan)
+    ppsf_percentile = np.full(n_located, np.nan)
+    nearest = np.full(n_located, -1)
+    nearest_km = np.full(n_located, np.nan)
+
+    for start in range(0, n_located, chunk_size):
+        rows = np.arange(start, min(start + chunk_size, n_located))
+
+        comps, _ = _nearest_similar(
+            tree, np.arange(n_located), points, features, rows, k, candidates
+        )
+        has_comp = comps >= 0
+        comps_count[rows] = has_comp.sum(axis=1)
+        comps_median[rows] = _masked_median(price[comps], has_comp)
+
+        # price per sqft among the k nearest, similar or not (the listing
+        # itself is among its own nearest)
+        n_query = min(k + 1, n_located)
+        _, neighbors = tree.query(points[rows], k=n_query, workers=-1)
+        neighbors = neighbors.reshape(len(rows), n_query)
+        local = _first_k((neighbors != rows[:, None]) & ~np.isnan(ppsf[neighbors]), k)
+        own = ppsf[rows][:, None]
+        below = ((ppsf[neighbors] < own) + 0.5 * (ppsf[neighbors] == own)) * local
+        with np.errstate(invalid="ignore"):
+            ppsf_percentile[rows] = np.where(
+                ~np.isnan(own[:, 0]),
+                100 * below.sum(axis=1) / local.sum(axis=1),
+                np.nan,
+            )
+
+        if affordable_tree is not None:
+            hits, chords = _nearest_similar(
+                affordable_tree, affordable, points, features, rows, 1, candidates
+            )
+            nearest[rows] = hits[:, 0]
+            nearest_km[rows] = chord_to_km(chords[:, 0])
+
+    has_nearest = nearest >= 0
+    result.loc[located, "Comps_Count"] = comps_count
+    result.loc[located, "Comps_Median_Price"] = comps_median
+    result.loc[located, "Local_PPSF_Percentile"] = np.round(ppsf_percentile, 1)
+    result.loc[located[has_nearest], "Nearest_Affordable_Address"] = address[
+        nearest[has_nearest]
+    ]
+    result.loc[located, "Nearest_Affordable_Price"] = np.where(
+        has_nearest, price[nearest], np.nan
+    )
+    result.loc[located, "Nearest_Affordable_Km"] = np.where(
+        has_nearest, np.round(nearest_km, 2), np.nan
+    )
+    result.index = df_house.index
+    return result
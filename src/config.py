@@ -4,34 +4,155 @@ File:        config.py
 Description: Constant values, including file paths, to be used for data scraping and analysis.
 Author:      Yuseof
 Created:     2025-07-24
-Modified:    2025-08-22
+Modified:    2026-10-19
 """
 
 import os
 
+# absolute project root, for files shared by main.py (run from src/) and the streamlit app
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 # for scraper
 CHROME_STABLE_VERSION = "116.0.5845.140"
 HOUSING_URL = "https://www.redfin.com/city/2832/NY/Buffalo"
 # PATH_TO_LISTINGS_OUTPUT = "../data/output/scraped_listings.csv"
 MAX_LISTINGS = 400
+SCRAPER_PACING_PROFILE = "stealth"  # stealth, balanced, fast or replay (see pacing.py)
+SCRAPER_WAIT_BUDGET_S = None  # overrides the profile's wait budget if set
+PATH_TO_CHROME_PROFILE = os.path.join(PROJECT_ROOT, "data", "chrome_profile")
+DRIVER_MAX_PAGES = 50  # browser is recycled after this many pages
+DRIVER_MAX_HEAP_GROWTH_MB = 500  # or when its JS heap grows this much
+
+# requests dropped by the scraping browser (see resource_blocking.py), only
+# the text of the home cards is needed
+BLOCKED_URL_PATTERNS = [
+    # images and media
+    "*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.mp4", "*.webm", "*.m3u8",
+    # fonts
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    # listing photos and map tiles
+    "*ssl.cdn-redfin.com/photo*", "*maps.googleapis.com*", "*maps.gstatic.com*",
+    "*tiles.redfin.com*",
+    # analytics and ads
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*facebook.net*", "*facebook.com/tr*",
+    "*bing.com/bat*", "*hotjar.com*", "*optimizely.com*", "*segment.io*",
+    "*newrelic.com*", "*nr-data.net*", "*quantserve.com*", "*adnxs.com*",
+]  # fmt: skip
 
 # for affordability analaysis
 PATH_TO_INCOME_DATA = (
     "../data/input/ACSST5Y2023.S1901_2025-07-24T192912/ACSST5Y2023.S1901-Data.csv"
 )
+AFFORDABLE_INCOME_MULTIPLE = 3.0  # a home is affordable up to 3x household income
+INCOME_PARETO_ALPHA = 2.0  # tail of the $200,000 or more bracket
+UNCERTAINTY_DRAWS = 1000  # monte carlo draws for the PIR intervals (uncertainty.py)
+UNCERTAINTY_INTERVAL = 0.9  # same width as the census margins of error
+UNCERTAINTY_SEED = 0
+TEXT_HASH_FEATURES = 2**18  # hashed description tokens (text_features.py)
+COMPS_K = 10  # comparable listings per house (comps.py)
+COMPS_CANDIDATES = 32  # nearest listings searched first for similar ones
+COMPS_MAX_CANDIDATES = 2048  # widest search, for listings with rare comps
+COMPS_MAX_BED_DIFF = 1
+COMPS_MAX_BATH_DIFF = 1
+COMPS_SQFT_TOLERANCE = 0.25  # comps within 25% of the house's sqft
+COMPS_CHUNK_SIZE = 100_000  # listings queried at once
 
 # for main.py
 # PATH_TO_OUTPUT_ZIP_METRICS = "../data/output/zip_metrics.csv"
 # PATH_TO_OUTPUT_HOUSE_METRICS = "../data/output/house_metrics.csv"
+PATH_TO_RUN_REPORT = os.path.join(PROJECT_ROOT, "data", "output", "run_report.json")
+PATH_TO_RUN_HISTORY = os.path.join(PROJECT_ROOT, "data", "output", "run_history.jsonl")
+PATH_TO_CHECKPOINTS = os.path.join(PROJECT_ROOT, "data", "checkpoints")
+# arrow outputs of the pipeline stages (see columnar.py)
+PATH_TO_STAGE_OUTPUTS = os.path.join(PROJECT_ROOT, "data", "stages")
+
+# for batch_runner.py, one partition folder of stage outputs per metro
+PATH_TO_METRO_MANIFEST = os.path.join(PROJECT_ROOT, "data", "input", "metros.json")
+PATH_TO_METRO_PARTITIONS = os.path.join(PROJECT_ROOT, "data", "metros")
+PATH_TO_METRO_CHROME_PROFILES = os.path.join(PROJECT_ROOT, "data", "chrome_profiles")
+BATCH_MAX_WORKERS = 4  # metros scraped at once, each with its own browser
+METRO_CPU_LIMIT_S = 3600  # cpu seconds of a metro's worker process
+METRO_MEMORY_LIMIT_MB = 4096  # address space of a metro's analysis
+
+# for refresh_scheduler.py, zips are refreshed by priority within a daily budget
+PATH_TO_REFRESH_STATE = os.path.join(
+    PROJECT_ROOT, "data", "output", "refresh_state.json"
+)
+PATH_TO_REFRESH_MANIFEST = os.path.join(
+    PROJECT_ROOT, "data", "output", "refresh_manifest.json"
+)
+REDFIN_ZIP_URL = "https://www.redfin.com/zipcode/{zipcode}"
+REDFIN_LISTINGS_PER_PAGE = 40
+REFRESH_PAGES_PER_DAY = 40  # scraping budget
+REFRESH_MIN_INTERVAL_DAYS = 1
+REFRESH_MAX_INTERVAL_DAYS = 14  # zips this stale are refreshed first
+REFRESH_BASE_CHURN = 0.01  # assumed daily churn of a zip with no changes seen
+REFRESH_CHURN_SMOOTHING = 0.5  # weight of the latest refresh in the churn average
+REFRESH_PIR_THRESHOLD = 8  # the map's PIR color scale cutoff (vmax)
+REFRESH_PIR_MARGIN = 1.5  # PIR this close to the cutoff counts as near it
+REFRESH_PRICE_MARGIN = 0.1  # listings within 10% of their Affordable_Price
+
+# for sketches.py, mergeable zip level price summaries
+SKETCH_K = 200  # KLL accuracy, ~1.65% rank error (exact up to 200 listings per zip)
+ZIP_SKETCHES_FILE = "zip_sketches.json"  # in each metro partition
+PATH_TO_ZIP_SKETCHES = os.path.join(PROJECT_ROOT, "data", "output", "zip_sketches.json")
+
+# for hedonic.py, the price model's statistics carried across runs
+HEDONIC_MODEL_FILE = "hedonic_model.npz"  # in each metro partition
+PATH_TO_HEDONIC_MODEL = os.path.join(PROJECT_ROOT, "data", "output", HEDONIC_MODEL_FILE)
+HEDONIC_DECAY = 0.75  # weight of the previous runs' statistics (~4 week memory)
+HEDONIC_RIDGE = 1e-6
+HEDONIC_TEXT_FEATURES = 2**10  # hashed description words in the design matrix
+HEDONIC_TEXT_RIDGE = 10.0  # shrinks the effect of words seen in few listings
+HEDONIC_FAIR_BAND = 0.1  # asking prices within 10% of the expected price are fair
+
+# for grid_aggregates.py, heatmap cells on the map's own z / x / y tiles
+PATH_TO_GRID_CELLS = os.path.join(PROJECT_ROOT, "data", "output", "grid_cells.arrow")
+GRID_ZOOMS = [8, 10, 12, 14, 16]  # tile levels aggregated (~150 km to ~0.6 km)
+GRID_CELL_ZOOM_OFFSET = 4  # map zoom z draws level z + 4 cells (16 px across)
 
 # for airtable upload
 HOUSE_TABLE_NAME = "House Listings"
 ZIP_TABLE_NAME = "Zip Metrics"
 BASE_ID = os.getenv("AIRTABLE_BASE_NAME")
 AIRTABLE_ACCESS_TOKEN = os.getenv("AIRTABLE_ACCESS_TOKEN")
+AIRTABLE_API_URL = "https://api.airtable.com"
 
 # for streamlit app
 PATH_TO_ZIP_SHAPEFILE = "data/input/zip_shapefile_filtered/zip_shapefile_filtered.shp"
+PATH_TO_DASHBOARD_SUMMARY = os.path.join(
+    PROJECT_ROOT, "data", "output", "dashboard_summary.json"
+)
+DASHBOARD_RANKED_ZIPS = 3  # zips in each most / least affordable card
+# the dataset shared by every session is served from a memory map of these files
+DASHBOARD_MMAP = True
+PATH_TO_DASHBOARD_DATASET = os.path.join(PROJECT_ROOT, "data", "output", "dashboard")
+# pre-rendered dashboard for static hosting (static_export.py)
+PATH_TO_STATIC_EXPORT = os.path.join(PROJECT_ROOT, "data", "output", "static")
+
+# for dashboard charts
+CHART_PRICE_BIN_WIDTH = 25_000
+CHART_PRICE_BIN_MAX = 1_500_000  # last bin holds everything above this
+CHART_SCATTER_POINTS_PER_ZIP = 50
+CHART_SCATTER_MAX_POINTS = 1_000
+
+# for dashboard data table
+DATA_TABLE_COLUMNS = [
+    "Address",
+    "Zipcode",
+    "Price",
+    "Bedrooms",
+    "Bathrooms",
+    "SqFt",
+    "Price_Per_SqFt",
+    "Affordable_Price",
+    "Affordability_Gap",
+    "Listing_Agency",
+]
+DATA_TABLE_PAGE_SIZES = [25, 50, 100]
+DATA_TABLE_EXPORT_CHUNK_SIZE = 10_000
 
 # for geolocation
 OPEN_MAPS_API_URL = "https://nominatim.openstreetmap.org/search"
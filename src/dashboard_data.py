@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+File:        dashboard_data.py
+Description: Turns the raw Airtable records into the house and zip level
+                frames used by the streamlit dashboard. Kept out of app.py so
+                the same preparation can be benchmarked offline.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       --
+"""
+
+import numpy as np
+import pandas as pd
+from schema import compact_house_frame, compact_zip_frame
+
+
+def zips_from_records(rows, verbose=True):
+    """
+    Zip level frame from Airtable records (as returned by table.all()).
+    """
+
+    df = pd.json_normalize(r["fields"] for r in rows)
+
+    # zip as str for join
+    df["Zipcode"] = df["Zipcode"].astype(str).str.strip()
+
+    # round PIR to one decimal
+    df["PIR"] = df["PIR"].round(1)
+
+    # NOTE: formatted price / income strings for the map are built when the
+    # geojson is rendered, not stored per row
+    return compact_zip_frame(df, verbose)
+
+
+def houses_from_records(rows, verbose=True):
+    """
+    House level frame from Airtable records (as returned by table.all()).
+    """
+
+    df = pd.json_normalize(r["fields"] for r in rows)
+
+    # fields for mapping
+    df["Affordable_Color"] = np.where(df["Affordability_Gap"] < 0, "red", "green")
+    df["Is_Affordable"] = np.where(df["Affordability_Gap"] < 0, False, True)
+
+    return compact_house_frame(df, verbose)
@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+"""
+File:        dashboard_map.py
+Description: Loads zip geometries and builds the folium affordability map for
+                the streamlit dashboard. Geopandas, folium and branca are only
+                imported when a map is actually built, so the dashboard can
+                paint its header without paying for them.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       --
+"""
+
+import pandas as pd
+from schema import format_currency
+from config import GRID_CELL_ZOOM_OFFSET
+
+
+def load_zip_shapes(path):
+    """
+    Loads the zip shapefile used for the choropleth, with zips as str.
+    """
+
+    import geopandas as gpd
+
+    # load data
+    gdf = gpd.read_file(path)
+
+    # remove any null geometries
+    gdf = gdf[gdf["geometry"].notnull()].copy()
+
+    # format zip col
+    gdf.rename(columns={"GEOID20": "Zipcode"}, inplace=True)
+    gdf["Zipcode"] = gdf["Zipcode"].astype(str)
+
+    return gdf
+
+
+def build_geojson_map(df_zip_analysis, gdf_zip_shapes):
+    """
+    Merges zip affordability metrics with zip geometries into a GeoJSON
+    FeatureCollection (multipolygons are split into one feature per polygon).
+    Zips missing from the shapefile aren't drawn.
+    """
+
+    # merge zip affordability metrics with zip gdf
+    gdf_zip_analysis = df_zip_analysis.merge(gdf_zip_shapes, how="left", on="Zipcode")
+    gdf_zip_analysis = gdf_zip_analysis[gdf_zip_analysis["geometry"].notnull()]
+
+    # select only relevant columns
+    gdf_zip_map = gdf_zip_analysis[
+        ["Zipcode", "PIR", "geometry", "Median_Price", "Household_Median_Income"]
+    ].copy()
+
+    # display strings are only built for the zips drawn on the map
+    gdf_zip_map["Median_Price_Formatted"] = format_currency(gdf_zip_map["Median_Price"])
+    gdf_zip_map["Household_Median_Income_Formatted"] = format_currency(
+        gdf_zip_map["Household_Median_Income"]
+    )
+
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": geom.__geo_interface__,
+                "properties": {
+                    "Zipcode": str(row.Zipcode),
+                    # float32 PIR back to the one decimal it was rounded to,
+                    # None for zips without census income
+                    "PIR": None if pd.isna(row.PIR) else round(float(row.PIR), 1),
+                    "PIR_Formatted": "N/A" if pd.isna(row.PIR) else f"{row.PIR:.1f}",
+                    "Median_Price_Formatted": row.Median_Price_Formatted,
+                    "Household_Median_Income_Formatted": row.Household_Median_Income_Formatted,
+                },
+            }
+            for idx, row in gdf_zip_map.iterrows()
+            for geom in (
+                [row.geometry]
+                if row.geometry.geom_type != "MultiPolygon"
+                else row.geometry.geoms
+            )
+        ],
+    }
+
+
+def build_grid_geojson(df_cells):
+    """
+    GeoJSON FeatureCollection of grid cells (see grid_aggregates.py), one
+    rectangle per cell.
+    """
+
+    from grid_aggregates import tile_bounds
+
+    south, west, north, east = tile_bounds(
+        df_cells.X.to_numpy(), df_cells.Y.to_numpy(), df_cells.Zoom.to_numpy()
+    )
+    mean_price = format_currency(df_cells.Mean_Price)
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {
+                    "type": "Polygon",
+                    "coordinates": [
+                        [[w, s], [e, s], [e, n], [w, n], [w, s]],
+                    ],
+                },
+                "properties": {
+                    "Listings": int(listings),
+                    "PIR": None if pd.isna(pir) else float(pir),
+                    "Mean_Price_Formatted": price,
+                    "Affordable_Pct": f"{share:.0%}",
+                },
+            }
+            for s, w, n, e, listings, pir, price, share in zip(
+                south,
+                west,
+                north,
+                east,
+                df_cells.Listings,
+                df_cells.PIR,
+                mean_price,
+                df_cells.Affordable_Share,
+            )
+        ],
+    }
+
+
+def add_grid_layers(map, df_cells, colormap):
+    """
+    Adds the grid cells as an optional overlay with one layer per grid
+    level, of which only the level matching the map's zoom is shown (see
+    grid_aggregates.grid_level).
+    """
+
+    import folium
+    from branca.element import MacroElement, Template
+
+    group = folium.FeatureGroup(name="Price Grid", show=False).add_to(map)
+    layers = []
+    for zoom, df_level in df_cells.groupby("Zoom"):
+        layer = folium.GeoJson(
+            build_grid_geojson(df_level),
+            style_function=lambda feature: {
+                "fillColor": (
+                    colormap(feature["properties"]["PIR"])
+                    if feature["properties"]["PIR"] is not None
+                    else "gray"
+                ),
+                "color": "black",
+                "weight": 0.2,
+                "fillOpacity": 0.6,
+            },
+            tooltip=folium.GeoJsonTooltip(
+                fields=["Listings", "PIR", "Mean_Price_Formatted", "Affordable_Pct"],
+                aliases=[
+                    "Listings",
+                    "Price to Income Ratio",
+                    "Mean House Price",
+                    "Affordable",
+                ],
+            ),
+        ).add_to(group)
+        layers.append((int(zoom), layer))
+
+    switcher = MacroElement()
+    switcher._template = Template(
+        """
+        {% macro script(this, kwargs) %}
+        (function () {
+            var map = {{ this._parent.get_name() }};
+            var group = {{ this.group.get_name() }};
+            var levels = [{% for zoom, layer in this.layers %}
+                [{{ zoom }}, {{ layer.get_name() }}],{% endfor %}
+            ];
+            function showLevel() {
+                var target = map.getZoom() + {{ this.offset }};
+                var shown = levels[0];
+                levels.forEach(function (level) {
+                    if (level[0] <= target) { shown = level; }
+                });
+                levels.forEach(function (level) {
+                    if (level === shown) { group.addLayer(level[1]); }
+                    else { group.removeLayer(level[1]); }
+                });
+            }
+            map.on("zoomend", showLevel);
+            showLevel();
+        })();
+        {% endmacro %}
+        """
+    )
+    switcher.group, switcher.layers = group, layers
+    switcher.offset = GRID_CELL_ZOOM_OFFSET
+    map.add_child(switcher)
+    folium.LayerControl().add_to(map)
+
+
+def comps_tooltip(row):
+    """
+    Tooltip lines from the precomputed comps of a house (see comps.py), empty
+    for data from before comps were computed.
+    """
+
+    lines = ""
+    if pd.notna(row.get("Local_PPSF_Percentile")):
+        lines += (
+            f"<br><b><i>Price / SqFt Percentile (Nearby):</i></b> "
+            f"{row['Local_PPSF_Percentile']:.0f}"
+        )
+    if pd.notna(row.get("Nearest_Affordable_Price")):
+        lines += (
+            f"<br><b><i>Nearest Affordable Comp:</i></b> "
+            f"{row['Nearest_Affordable_Address']}, "
+            f"${int(row['Nearest_Affordable_Price']):,} "
+            f"({row['Nearest_Affordable_Km']:.1f} km)"
+        )
+    return lines
+
+
+def model_tooltip(row):
+    """
+    Tooltip line of a house's expected price under the hedonic model (see
+    hedonic.py), empty for data from before the model was fitted.
+    """
+
+    if pd.isna(row.get("Expected_Price")):
+        return ""
+    return (
+        f"<br><b><i>Model Price:</i></b> ${int(row['Expected_Price']):,} "
+        f"({row['Model_Pricing']}, {row['Price_vs_Model']:+.0%})"
+    )
+
+
+def build_map(geojson_map, df_zip_analysis, df_houses_filtered, df_cells=None):
+    """
+    Builds the folium map: zip choropleth colored by PIR, its legend, and one
+    pin per (filtered) house, plus the price grid overlay when its cells are
+    given.
+    """
+
+    import folium
+    import branca.colormap as cm
+
+    # create folium map
+    map = folium.Map(location=[42.9159281, -78.7487142], zoom_start=11)
+
+    # Create a custom colormap (green → yellow → red)
+    vmax = 8  # NOTE!! This value is somewhat arbitrary, based on what is an "affordable" PIR from research
+    # the scale starts at the lowest PIR, kept below vmax (0 if no zip has one)
+    vmin = df_zip_analysis["PIR"].min()
+    vmin = min(vmin, vmax - 1) if pd.notna(vmin) else 0
+    colormap = cm.LinearColormap(
+        colors=["green", "yellow", "red"],
+        vmin=vmin,
+        vmax=vmax,
+        caption="Price to Income Ratio (Affordability Measure)",
+    )
+
+    # add GeoJson layer with per-feature fill (none of the zips may be in the
+    # shapefile, e.g. for another metro, and folium can't build the tooltip of
+    # an empty layer)
+    if not geojson_map["features"]:
+        print("No zips with a shape, the map has no zip layer")
+    else:
+        folium.GeoJson(
+            geojson_map,
+            style_function=lambda feature: {
+                "fillColor": (
+                    colormap(feature["properties"]["PIR"])
+                    if feature["properties"]["PIR"] is not None
+                    else "gray"
+                ),
+                "color": "black",
+                "weight": 0.5,
+                "fillOpacity": 0.7,
+            },
+            tooltip=folium.GeoJsonTooltip(
+                fields=[
+                    "Zipcode",
+                    "PIR_Formatted",
+                    "Median_Price_Formatted",
+                    "Household_Median_Income_Formatted",
+                ],
+                aliases=[
+                    "Zipcode",
+                    "Price to Income Ratio",
+                    "Median House Price",
+                    "Median Income",
+                ],
+            ),
+        ).add_to(map)
+
+    # add colormap legend
+    colormap.add_to(map)
+
+    # grid cells of every listing (not just the filtered ones), precomputed
+    # by main.py
+    if df_cells is not None and len(df_cells):
+        add_grid_layers(map, df_cells, colormap)
+
+    # Add house pins (affordable price and gap are missing in zips without
+    # census income)
+    prices = format_currency(df_houses_filtered["Price"])
+    affordable_prices = format_currency(df_houses_filtered["Affordable_Price"])
+    gaps = format_currency(df_houses_filtered["Affordability_Gap"])
+    for (_, row), price, affordable_price, gap in zip(
+        df_houses_filtered.iterrows(), prices, affordable_prices, gaps
+    ):
+        folium.Marker(
+            location=[row["Lat"], row["Lng"]],
+            tooltip=(
+                f"<b>{row['Address']}</b><br>"
+                f"<div style='line-height:2'></div>"
+                f"<b><i>Price:</i></b> {price}<br>"
+                f"<b><i>Affordable Price:</i></b> {affordable_price}<br>"
+                f"<b><i>Affordability Gap:</i></b> {gap}"
+                f"{comps_tooltip(row)}"
+                f"{model_tooltip(row)}"
+            ),
+            icon=folium.Icon(color=row["Affordable_Color"], icon="home", prefix="fa"),
+        ).add_to(map)
+
+    return map
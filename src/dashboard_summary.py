@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+File:        dashboard_summary.py
+Description: Builds, saves and loads the tiny precomputed dashboard summary
+                (headline KPIs and most / least affordable zips) that lets the
+                streamlit app paint its header before any heavy data is loaded.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       --
+"""
+
+import os
+import json
+import math
+from datetime import datetime, timezone
+from config import DASHBOARD_RANKED_ZIPS
+
+
+def compute_kpis(df_houses):
+    """
+    Headline KPIs shown above the map for a (possibly filtered) house frame.
+
+    Returns
+    -------
+    dict
+        total_homes, median_price, median_gap, pct_affordable. Values are None
+        if there are no houses.
+    """
+
+    total_homes = len(df_houses)
+    if total_homes == 0:
+        return {
+            "total_homes": 0,
+            "median_price": None,
+            "median_gap": None,
+            "pct_affordable": None,
+        }
+
+    return {
+        "total_homes": total_homes,
+        "median_price": int(df_houses["Price"].median()),
+        "median_gap": int(df_houses["Affordability_Gap"].median()),
+        "pct_affordable": math.trunc(
+            (df_houses["Affordability_Gap"] == 0).sum() / total_homes * 100
+        ),
+    }
+
+
+def _zip_records(df_zips):
+    # the PIR interval is included when the data has it (see uncertainty.py)
+    has_interval = "PIR_Low" in df_zips and "PIR_High" in df_zips
+    records = []
+    for row in df_zips.itertuples():
+        # PIRs are float32 in memory (see schema.py), rounded back to the
+        # one decimal shown so the summary json has no float32 noise
+        record = {"Zipcode": str(row.Zipcode), "PIR": round(float(row.PIR), 1)}
+        if has_interval and row.PIR_Low == row.PIR_Low:
+            record["PIR_Low"] = round(float(row.PIR_Low), 1)
+            record["PIR_High"] = round(float(row.PIR_High), 1)
+        records.append(record)
+    return records
+
+
+def rank_zips(df_zips, n=DASHBOARD_RANKED_ZIPS):
+    """
+    Most and least affordable zips by price to income ratio, as shown in the
+    dashboard summary cards. Zips without census income have no PIR and
+    aren't ranked.
+    """
+
+    columns = [c for c in ["Zipcode", "PIR", "PIR_Low", "PIR_High"] if c in df_zips]
+    df_ranked = df_zips.dropna(subset=["PIR"]).sort_values("PIR")[columns]
+
+    return _zip_records(df_ranked.head(n)), _zip_records(df_ranked.tail(n))
+
+
+def build_summary(df_houses, df_zips, data_version=None):
+    """
+    Builds the dashboard summary from the full house and zip level results.
+    data_version identifies the Airtable data it was built from (see
+    SharedDataset.data_version), None when built by the pipeline.
+    """
+
+    most_affordable, least_affordable = rank_zips(df_zips)
+
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "data_version": data_version,
+        "kpis": compute_kpis(df_houses),
+        "most_affordable": most_affordable,
+        "least_affordable": least_affordable,
+    }
+
+
+def save_summary(summary, path):
+    """
+    Writes the summary as json, creating the output folder if needed.
+    """
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(summary, f, indent=2)
+
+
+def load_summary(path):
+    """
+    Reads a previously saved summary. Returns None if there isn't one yet, or
+    it can't be read, so callers can fall back to the full data.
+    """
+
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
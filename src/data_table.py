@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+File:        data_table.py
+Description: Server-side sorting, pagination, column projection and streaming
+                export for the dashboard data table, so that only the rows of
+                the current page are ever sent to the browser.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       --
+"""
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from config import DATA_TABLE_EXPORT_CHUNK_SIZE
+
+#########
+# SORTING
+#########
+
+
+def build_sort_index(df, column, ascending=True):
+    """
+    Builds the row order of the full listing frame for one sort column. This
+    is the only O(n log n) step, and is meant to be cached per data version.
+
+    Missing values are always placed last.
+
+    Returns
+    -------
+    np.ndarray
+        positional row indices in sorted order
+    """
+
+    values = df[column]
+    missing = values.isna().to_numpy()
+    valid_pos = np.flatnonzero(~missing)
+
+    # stable sort so ties keep their original (airtable) order
+    valid_order = valid_pos[np.argsort(values.to_numpy()[valid_pos], kind="stable")]
+    if not ascending:
+        valid_order = valid_order[::-1]
+
+    return np.concatenate([valid_order, np.flatnonzero(missing)])
+
+
+def filter_sort_index(sort_index, mask):
+    """
+    Restricts a precomputed sort order to the rows that pass the sidebar
+    filters, without sorting again.
+
+    Parameters
+    ----------
+    sort_index : np.ndarray
+        output of build_sort_index
+    mask : np.ndarray of bool
+        positional filter mask over the full frame
+    """
+    return sort_index[mask[sort_index]]
+
+
+############
+# PAGINATION
+############
+
+
+def _take(df, rows, columns):
+    """
+    Selects rows and columns together so that only the requested cells are
+    copied (df[columns] alone would copy every row of those columns).
+    """
+    return df.iloc[rows, df.columns.get_indexer(columns)]
+
+
+def page_count(order, page_size):
+    """
+    Number of pages needed to show every row in order (at least one).
+    """
+    return max(1, -(-len(order) // page_size))
+
+
+def get_page(df, order, page, page_size, columns):
+    """
+    Returns a single page of the sorted and filtered listings, projected to
+    the requested columns. Cost is O(page_size).
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        full listing frame
+    order : np.ndarray
+        filtered sort order from filter_sort_index
+    page : int
+        1-based page number
+    page_size : int
+    columns : list of str
+    """
+
+    start = (page - 1) * page_size
+    return _take(df, order[start : start + page_size], columns)
+
+
+########
+# EXPORT
+########
+
+
+def iter_csv_chunks(df, order, columns, chunk_size=DATA_TABLE_EXPORT_CHUNK_SIZE):
+    """
+    Yields the export as CSV encoded byte chunks, one chunk of rows at a
+    time, so the whole export is never held in memory. The header comes
+    first, so an empty filter still exports the columns.
+    """
+
+    yield _take(df, order[:0], columns).to_csv(index=False).encode("utf-8")
+    for start in range(0, len(order), chunk_size):
+        df_chunk = _take(df, order[start : start + chunk_size], columns)
+        yield df_chunk.to_csv(index=False, header=False).encode("utf-8")
+
+
+def write_csv(path, df, order, columns, chunk_size=DATA_TABLE_EXPORT_CHUNK_SIZE):
+    """
+    Streams the current filter / sort to a CSV file on disk.
+    """
+
+    with open(path, "wb") as f:
+        for chunk in iter_csv_chunks(df, order, columns, chunk_size):
+            f.write(chunk)
+
+    return path
+
+
+def write_parquet(path, df, order, columns, chunk_size=DATA_TABLE_EXPORT_CHUNK_SIZE):
+    """
+    Streams the current filter / sort to a parquet file on disk, writing one
+    row group per chunk.
+    """
+
+    writer = None
+    try:
+        for start in range(0, max(len(order), 1), chunk_size):
+            df_chunk = _take(df, order[start : start + chunk_size], columns)
+            table = pa.Table.from_pandas(df_chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return path
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+File:        dedup.py
+Description: De-duplication of scraped listings. Redfin pagination can shift
+                while a scrape pages through results, so the same home can be
+                scraped twice, and merged multi-region scrapes overlap at
+                region borders. Listings are resolved to a normalized address
+                key (street suffix, directional and unit canonicalization on
+                top of parse_address) kept in a hash index, which makes the
+                stage a single linear pass over any number of scrapes.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       df_listings = deduplicate_listings(df_listings)
+"""
+
+import re
+from functools import lru_cache
+from instrumentation import count
+
+STREET_SUFFIXES = {
+    "STREET": "ST", "STR": "ST", "AVENUE": "AVE", "AV": "AVE", "AVEN": "AVE",
+    "ROAD": "RD", "DRIVE": "DR", "DRV": "DR", "BOULEVARD": "BLVD",
+    "BOUL": "BLVD", "PLACE": "PL", "COURT": "CT", "LANE": "LN",
+    "TERRACE": "TER", "TERR": "TER", "PARKWAY": "PKWY", "PKY": "PKWY",
+    "CIRCLE": "CIR", "HIGHWAY": "HWY", "TRAIL": "TRL", "SQUARE": "SQ",
+    "EXPRESSWAY": "EXPY", "CRESCENT": "CRES",
+}  # fmt: skip
+DIRECTIONALS = {
+    "NORTH": "N", "SOUTH": "S", "EAST": "E", "WEST": "W",
+    "NORTHEAST": "NE", "NORTHWEST": "NW", "SOUTHEAST": "SE", "SOUTHWEST": "SW",
+}  # fmt: skip
+
+# "Apt 2B", "Unit 2B", "Suite 2B", "# 2B", "Apt. #2B" -> "#2B"
+UNIT_PATTERN = re.compile(
+    r"\s*(?:,\s*)?"
+    r"(?:\b(?:APARTMENT|APT|UNIT|SUITE|STE|FLOOR|FL|RM|ROOM)\b\.?\s*#?|#)"
+    r"\s*([A-Z0-9-]+)\s*$"
+)
+PUNCTUATION = re.compile(r"[^\w#\s-]")
+WHITESPACE = re.compile(r"\s+")
+
+###############
+# NORMALIZATION
+###############
+
+
+@lru_cache(maxsize=1_000_000)
+def normalize_street(street):
+    """
+    Canonical form of a street line, e.g.
+    "157 Roosevelt Avenue Apt. 2" -> "157 ROOSEVELT AVE #2"
+    """
+
+    street = WHITESPACE.sub(" ", PUNCTUATION.sub(" ", street.upper())).strip()
+
+    # split off the unit before expanding suffixes ("Ste" is also a suffix)
+    unit = ""
+    match = UNIT_PATTERN.search(street)
+    if match and match.start() > 0:
+        unit = "#" + match.group(1).lstrip("#")
+        street = street[: match.start()].strip()
+
+    tokens = [
+        DIRECTIONALS.get(token, STREET_SUFFIXES.get(token, token))
+        for token in street.split(" ")
+    ]
+    return " ".join(tokens + ([unit] if unit else []))
+
+
+def address_key(parsed_address, address=None):
+    """
+    Entity key of a listing: normalized street (with unit) and zipcode. Falls
+    back to the normalized raw address when parse_address failed.
+
+    Parameters
+    ----------
+    parsed_address : list or None
+        output of util.parse_address, [street, city, county, state, zipcode]
+    address : str, optional
+        raw address, used when parsed_address is None
+    """
+
+    if parsed_address:
+        return f"{normalize_street(parsed_address[0])}|{parsed_address[4].strip()}"
+    return normalize_street(address or "")
+
+
+def _listing_fingerprint(price, specs):
+    # listing attributes that differ between a near-duplicate and an exact one
+    return (re.sub(r"\D", "", str(price)), specs)
+
+
+def _specs(df_listings):
+    return zip(df_listings["Bedrooms"], df_listings["Bathrooms"], df_listings["SqFt"])
+
+
+#######
+# INDEX
+#######
+
+
+class DedupIndex:
+    """
+    Hash index of the listings seen so far, keyed by address_key. The first
+    listing seen for a key is kept. Later ones are exact duplicates (same
+    price and specs) or near duplicates (same home, different price, agent or
+    formatting).
+
+    One index can be fed many scrapes (e.g. one per region) in turn, so
+    listings already kept from earlier scrapes are dropped from later ones.
+    """
+
+    def __init__(self):
+        self.keys = {}
+        self.stats = {"seen": 0, "kept": 0, "exact": 0, "near": 0}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, df_listings):
+        """
+        Adds a batch of processed listings to the index.
+
+        Returns
+        -------
+        list of bool
+            True for listings to keep
+        """
+
+        keep = []
+        for parsed_address, address, price, specs in zip(
+            df_listings["Parsed_Address"],
+            df_listings["Address"],
+            df_listings["Price"],
+            _specs(df_listings),
+        ):
+            key = address_key(parsed_address, address)
+            fingerprint = _listing_fingerprint(price, specs)
+            seen = self.keys.get(key)
+            if seen is None:
+                self.keys[key] = fingerprint
+                keep.append(True)
+            else:
+                self.stats["exact" if seen == fingerprint else "near"] += 1
+                keep.append(False)
+
+        self.stats["seen"] += len(keep)
+        self.stats["kept"] += sum(keep)
+        return keep
+
+
+def deduplicate_listings(df_listings, index=None):
+    """
+    Drops duplicate listings from the processed scrape (output of
+    process_listing_data).
+
+    Parameters
+    ----------
+    df_listings : pd.DataFrame
+    index : DedupIndex, optional
+        shared index when de-duplicating several scrapes against each other
+
+    Returns
+    -------
+    pd.DataFrame
+        de-duplicated listings, in scrape order
+    """
+
+    index = index if index is not None else DedupIndex()
+    exact, near = index.stats["exact"], index.stats["near"]
+
+    df_listings = df_listings[index.add(df_listings)].reset_index(drop=True)
+
+    n_exact = index.stats["exact"] - exact
+    n_near = index.stats["near"] - near
+    count("duplicates_exact", n_exact)
+    count("duplicates_near", n_near)
+    print(
+        f"Removed {n_exact} exact and {n_near} near duplicate listings, "
+        f"{len(df_listings)} unique listings left"
+    )
+
+    return df_listings
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+File:        driver_manager.py
+Description: Keeps a warm, long lived browser for the scraper. The browser
+                uses a persistent chrome profile (HTTP cache, cookies), is
+                reused across region scrapes, and is health checked and
+                recycled after a number of pages or when its JS heap grows
+                too much. Startup and page counts are tracked so cold and warm
+                sessions can be compared.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       with DriverManager(headless=True) as manager:
+                 for url in region_urls:
+                     listing_data = manager.scrape(url, MAX_LISTINGS)
+"""
+
+import os
+import time
+from scraper import instantiate_driver, scrape_listings
+from instrumentation import count, timer
+from config import (
+    PATH_TO_CHROME_PROFILE,
+    DRIVER_MAX_PAGES,
+    DRIVER_MAX_HEAP_GROWTH_MB,
+)
+
+
+class DriverManager:
+    """
+    Owns at most one browser at a time and hands it out to scrapes.
+
+    Parameters
+    ----------
+    headless : bool
+    profile_dir : str, optional
+        persistent chrome profile folder, None for a throwaway profile
+    max_pages : int, optional
+        pages served before the browser is recycled
+    max_heap_growth_mb : float, optional
+        JS heap growth (vs right after startup) that triggers a recycle
+    """
+
+    def __init__(
+        self,
+        headless=True,
+        profile_dir=PATH_TO_CHROME_PROFILE,
+        max_pages=DRIVER_MAX_PAGES,
+        max_heap_growth_mb=DRIVER_MAX_HEAP_GROWTH_MB,
+    ):
+        self.headless = headless
+        self.profile_dir = profile_dir
+        self.max_pages = max_pages
+        self.max_heap_growth_mb = max_heap_growth_mb
+
+        self.driver = None
+        self.pages = 0
+        self.baseline_heap_mb = None
+        self.stats = {"startups": 0, "startup_s": [], "recycles": 0, "pages": 0}
+
+    #############
+    # LIFECYCLE
+    #############
+
+    def start(self):
+        """
+        Launches a new browser (closing the current one, if any).
+        """
+
+        self.close()
+        if self.profile_dir is not None:
+            os.makedirs(self.profile_dir, exist_ok=True)
+
+        start = time.perf_counter()
+        with timer("driver_startup"):
+            self.driver = instantiate_driver(self.headless, self.profile_dir)
+        self.stats["startups"] += 1
+        self.stats["startup_s"].append(round(time.perf_counter() - start, 3))
+
+        self.pages = 0
+        self.baseline_heap_mb = self.heap_mb()
+        return self.driver
+
+    def get(self):
+        """
+        The current browser if it's still usable, otherwise a fresh one.
+        """
+
+        if self.driver is None or not self.is_healthy():
+            return self.start()
+        if self.needs_recycle():
+            return self.recycle()
+        return self.driver
+
+    def recycle(self, resume_url=None):
+        """
+        Replaces the browser with a fresh one, optionally reopening the page
+        the old one was on.
+        """
+
+        print(f"Recycling browser after {self.pages} pages")
+        self.stats["recycles"] += 1
+        count("driver_recycles")
+        driver = self.start()
+        if resume_url:
+            driver.get(resume_url)
+        return driver
+
+    def close(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                print(f"Error closing browser: {e}")
+            self.driver = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    ###############
+    # HEALTH CHECK
+    ###############
+
+    def is_healthy(self):
+        """
+        Whether the browser still responds to commands.
+        """
+
+        try:
+            return self.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def heap_mb(self):
+        """
+        JS heap currently used by the page, read over CDP (None if
+        unavailable).
+        """
+
+        try:
+            self.driver.execute_cdp_cmd("Performance.enable", {})
+            metrics = self.driver.execute_cdp_cmd("Performance.getMetrics", {})
+        except Exception:
+            return None
+
+        for metric in metrics.get("metrics", []):
+            if metric["name"] == "JSHeapUsedSize":
+                return metric["value"] / 1024**2
+        return None
+
+    def page_done(self):
+        self.pages += 1
+        self.stats["pages"] += 1
+
+    def needs_recycle(self):
+        """
+        Whether the browser should be replaced: unresponsive, served
+        max_pages, or its heap grew past max_heap_growth_mb.
+        """
+
+        if not self.is_healthy():
+            return True
+        if self.max_pages is not None and self.pages >= self.max_pages:
+            return True
+        if self.max_heap_growth_mb is not None and self.baseline_heap_mb is not None:
+            heap_mb = self.heap_mb()
+            if heap_mb is not None:
+                return heap_mb - self.baseline_heap_mb > self.max_heap_growth_mb
+        return False
+
+    ##########
+    # SCRAPING
+    ##########
+
+    def scrape(self, housing_listings_url, max_listings, **kwargs):
+        """
+        scrape_listings on the managed browser, leaving it open for the next
+        scrape.
+        """
+
+        return scrape_listings(
+            self.get(),
+            housing_listings_url,
+            max_listings,
+            driver_manager=self,
+            quit_driver=False,
+            **kwargs,
+        )
@@ -7,22 +7,28 @@ Description: Used to filter census zipcode shapefile (which contains all US zips
              uploaded to github and used by streamlit for mapping. 
 Author:      Yuseof
 Created:     2025-08-22
-Modified:    2025-08-22
-Usage:       --
+Modified:    2026-10-19
+Usage:       filter_zipcodes(zips, output_path) for a metro's subset
 """
 
+import os
 import geopandas as gpd
 from config import NY_COUNTY_ZIPS, CENSUS_ZIP_SHAPEFILE_PATH, PATH_TO_ZIP_SHAPEFILE
 
 
-def filter_zipcodes():
+def filter_zipcodes(
+    zips=NY_COUNTY_ZIPS,
+    output_path=PATH_TO_ZIP_SHAPEFILE,
+    census_path=CENSUS_ZIP_SHAPEFILE_PATH,
+):
 
     # load census shapefile
-    gdf = gpd.read_file(CENSUS_ZIP_SHAPEFILE_PATH)
+    gdf = gpd.read_file(census_path)
 
-    # filter for erie county zips
+    # filter for the metro's zips (erie and surrounding counties by default)
     gdf.GEOID20 = gdf.GEOID20.astype(int)
-    gdf = gdf[gdf.GEOID20.isin(NY_COUNTY_ZIPS)]
+    gdf = gdf[gdf.GEOID20.isin(zips)]
 
     # output filtered shapefile
-    gdf.to_file(PATH_TO_ZIP_SHAPEFILE, driver="ESRI Shapefile")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    gdf.to_file(output_path, driver="ESRI Shapefile")
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+File:        grid_aggregates.py
+Description: Listing aggregates on a hierarchy of square web mercator tiles
+                (the z / x / y tiles of the map itself), so the heatmap can be
+                drawn at a resolution that matches the zoom level instead of
+                whole zip polygons. Listings are binned into the finest tiles
+                once; every coarser level is summed from the level below it
+                (a tile's parent is (x // 2, y // 2)), never from the points.
+                Cells only keep sums, so any level can be rebuilt from its
+                children and cells from separate runs can be added up.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       df_cells = build_grid(df_house_level_analysis)
+             GridIndex(df_cells).cells_in_view(south, west, north, east, zoom)
+"""
+
+import numpy as np
+import pandas as pd
+from config import GRID_ZOOMS, GRID_CELL_ZOOM_OFFSET
+
+# web mercator stops short of the poles
+MAX_LATITUDE = 85.0511
+
+# summed per cell, the rest of the cell columns are derived from them
+SUM_COLUMNS = ["Listings", "Price_Sum", "Income_Price_Sum", "Income_Sum", "Affordable"]
+
+
+def tile_xy(lat, lng, zoom):
+    """
+    x, y of the tiles at a zoom level holding the given points.
+    """
+
+    n = 2**zoom
+    lat = np.radians(np.clip(lat, -MAX_LATITUDE, MAX_LATITUDE))
+    x = np.floor((np.asarray(lng) + 180) / 360 * n)
+    y = np.floor((1 - np.arcsinh(np.tan(lat)) / np.pi) / 2 * n)
+    return np.clip(x, 0, n - 1).astype(np.int64), np.clip(y, 0, n - 1).astype(np.int64)
+
+
+def tile_bounds(x, y, zoom):
+    """
+    south, west, north, east of tiles, in degrees.
+    """
+
+    n = 2**zoom
+    x, y = np.asarray(x), np.asarray(y)
+    west = x / n * 360 - 180
+    east = (x + 1) / n * 360 - 180
+    north = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * y / n))))
+    south = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (y + 1) / n))))
+    return south, west, north, east
+
+
+def _sum_cells(zoom, x, y, values):
+    # sums of values (columns of SUM_COLUMNS) per distinct (x, y)
+    keys, inverse = np.unique(x * 2**zoom + y, return_inverse=True)
+    sums = {
+        col: np.bincount(inverse, weights=v, minlength=len(keys))
+        for col, v in values.items()
+    }
+    return pd.DataFrame(
+        {"Zoom": zoom, "X": keys // 2**zoom, "Y": keys % 2**zoom, **sums}
+    )
+
+
+def add_cell_metrics(df_cells):
+    """
+    Per cell metrics from the sums: Mean_Price, PIR (mean price over mean
+    zip median income of the cell's listings, a proxy of the zip PIR) and
+    Affordable_Share.
+    """
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        df_cells["Mean_Price"] = df_cells.Price_Sum / df_cells.Listings
+        df_cells["PIR"] = (df_cells.Income_Price_Sum / df_cells.Income_Sum).round(1)
+        df_cells["Affordable_Share"] = df_cells.Affordable / df_cells.Listings
+    return df_cells
+
+
+def build_grid(df_houses, zooms=GRID_ZOOMS):
+    """
+    Cells of every zoom level holding at least one listing.
+
+    Parameters
+    ----------
+    df_houses : pd.DataFrame
+        house level results (Lat, Lng, Price, Household_Median_Income,
+        Affordability_Gap)
+    zooms : list of int
+        tile zoom levels
+
+    Returns
+    -------
+    pd.DataFrame
+        Zoom, X, Y, the SUM_COLUMNS and the add_cell_metrics columns, sorted
+        by Zoom, X and Y
+    """
+
+    zooms = sorted(zooms)
+    df = df_houses.dropna(subset=["Lat", "Lng"])
+    price = df["Price"].to_numpy(dtype=float)
+    income = df["Household_Median_Income"].to_numpy(dtype=float)
+    has_income = ~np.isnan(income)
+    values = {
+        "Listings": np.ones(len(df)),
+        "Price_Sum": price,
+        "Income_Price_Sum": np.where(has_income, price, 0),
+        "Income_Sum": np.where(has_income, income, 0),
+        "Affordable": (df["Affordability_Gap"].to_numpy() >= 0).astype(float),
+    }
+
+    # finest level from the listings, each coarser one from the level below
+    x, y = tile_xy(df["Lat"].to_numpy(), df["Lng"].to_numpy(), zooms[-1])
+    levels = [_sum_cells(zooms[-1], x, y, values)]
+    for child_zoom, zoom in zip(zooms[:0:-1], zooms[-2::-1]):
+        child, shift = levels[-1], child_zoom - zoom
+        levels.append(
+            _sum_cells(
+                zoom,
+                child.X.to_numpy() >> shift,
+                child.Y.to_numpy() >> shift,
+                {col: child[col].to_numpy() for col in SUM_COLUMNS},
+            )
+        )
+
+    df_cells = pd.concat(levels[::-1], ignore_index=True)
+    df_cells["Listings"] = df_cells.Listings.astype(np.int64)
+    df_cells["Affordable"] = df_cells.Affordable.astype(np.int64)
+    return add_cell_metrics(df_cells)
+
+
+def grid_level(zoom, zooms=GRID_ZOOMS, offset=GRID_CELL_ZOOM_OFFSET):
+    """
+    Grid level drawn at a map zoom: cells of the map zoom + offset (a tile
+    of that zoom is 256 / 2**offset pixels across), or the nearest coarser
+    level available.
+    """
+
+    zooms = sorted(zooms)
+    eligible = [level for level in zooms if level <= zoom + offset]
+    return eligible[-1] if eligible else zooms[0]
+
+
+class GridIndex:
+    """
+    Viewport queries over the cells of build_grid.
+
+    Parameters
+    ----------
+    df_cells : pd.DataFrame
+        output of build_grid (sorted by Zoom, X and Y)
+    """
+
+    def __init__(self, df_cells):
+        self.df_cells = df_cells
+        self.zooms = sorted(df_cells.Zoom.unique())
+        zoom = df_cells.Zoom.to_numpy()
+        # row range and sorted x of every level
+        self.levels = {}
+        for level in self.zooms:
+            start, stop = np.searchsorted(zoom, [level, level + 1])
+            self.levels[level] = (
+                start,
+                df_cells.X.to_numpy()[start:stop],
+                df_cells.Y.to_numpy()[start:stop],
+            )
+
+    def cells_in_view(self, south, west, north, east, zoom):
+        """
+        Cells of the level drawn at a map zoom (see grid_level) that
+        intersect a viewport, found by binary search on x then a y filter.
+        """
+
+        level = grid_level(zoom, self.zooms)
+        start, xs, ys = self.levels[level]
+        (x0, x1), (y1, y0) = tile_xy(
+            np.array([south, north]), np.array([west, east]), level
+        )
+        lo, hi = np.searchsorted(xs, [x0, x1 + 1])
+        in_view = (ys[lo:hi] >= y0) & (ys[lo:hi] <= y1)
+        return self.df_cells.iloc[start + lo + np.flatnonzero(in_view)]
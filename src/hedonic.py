@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+"""
+File:        hedonic.py
+Description: Hedonic price model: log price regressed on log sqft, bedrooms,
+                bathrooms, the hashed words of the description and zip fixed
+                effects,
+
+                    log(Price) = b1 log(SqFt) + b2 Bedrooms + b3 Bathrooms
+                                 + sum_j c_j word_j + a_zip + e
+
+                The design matrix is sparse (three dense columns, the
+                description's hashed bag of words, see
+                text_features.hash_vectorize, and one indicator per zip, in
+                that order) and the model keeps only its sufficient
+                statistics X'X, X'y, y'y and n. Each run adds the new
+                listings' statistics to the previous ones (older weeks
+                discounted by HEDONIC_DECAY) and re-solves the normal
+                equations with a direct sparse solve, so weekly runs refine
+                the model without refitting the history. Listings are then
+                priced against the model: expected price and how far over or
+                under it the asking price is.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       model = HedonicModel.load_or_new(PATH_TO_HEDONIC_MODEL)
+             df = df.join(model.update(df).predict(df))
+             model.save(PATH_TO_HEDONIC_MODEL)
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.linalg import spsolve
+from text_features import hash_vectorize
+from config import (
+    HEDONIC_DECAY,
+    HEDONIC_RIDGE,
+    HEDONIC_TEXT_FEATURES,
+    HEDONIC_TEXT_RIDGE,
+    HEDONIC_FAIR_BAND,
+)
+
+# dense columns of the design matrix, the text columns and zip indicators
+# follow them
+FEATURES = ["Log_SqFt", "Bedrooms", "Bathrooms"]
+
+
+def hedonic_features(df_houses):
+    """
+    Dense features and log price of every listing, with a mask of the
+    listings that have all of them (columns as in preprocess_scraped_listings).
+    """
+
+    sqft = df_houses["SqFt"].to_numpy(dtype=float)
+    price = df_houses["Price"].to_numpy(dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        features = np.column_stack(
+            [
+                np.log(np.where(sqft > 0, sqft, np.nan)),
+                df_houses["Bedrooms"].to_numpy(dtype=float),
+                df_houses["Bathrooms"].to_numpy(dtype=float),
+            ]
+        )
+        log_price = np.log(np.where(price > 0, price, np.nan))
+    complete = ~np.isnan(features).any(axis=1)
+    return features, log_price, complete
+
+
+def hedonic_text(df_houses, n_text):
+    """
+    Hashed description words of every listing, (n, n_text) sparse, empty
+    rows for listings (or data) without a description.
+    """
+
+    if n_text and "Description" in df_houses:
+        return hash_vectorize(df_houses["Description"], n_text)
+    return sparse.csr_matrix((len(df_houses), n_text))
+
+
+class HedonicModel:
+    """
+    Sufficient statistics of the regression and its solved coefficients.
+
+    Parameters
+    ----------
+    zipcodes : array-like of int, optional
+        zips with a fixed effect, in column order
+    n_text : int, optional
+        hashed description columns, 0 leaves the description out
+    """
+
+    def __init__(self, zipcodes=(), n_text=HEDONIC_TEXT_FEATURES):
+        self.zipcodes = np.asarray(zipcodes, dtype=np.int64)
+        self.n_text = int(n_text)
+        p = self.n_fixed + len(self.zipcodes)
+        self.xtx = sparse.csr_matrix((p, p))
+        self.xty = np.zeros(p)
+        self.yty = 0.0
+        self.n = 0.0
+        self.coef = np.zeros(p)
+        self.sigma2 = 0.0
+
+    @property
+    def n_fixed(self):
+        # columns before the zip indicators
+        return len(FEATURES) + self.n_text
+
+    @property
+    def n_params(self):
+        return self.n_fixed + len(self.zipcodes)
+
+    def _zip_columns(self, zipcodes, add=False):
+        # column of every zip, -1 if the model has none (new zips are added
+        # first when add is set, their statistics padded with zeros)
+        zipcodes = np.asarray(zipcodes, dtype=np.int64)
+        if add:
+            new = np.setdiff1d(zipcodes, self.zipcodes)
+            if len(new):
+                self.zipcodes = np.concatenate([self.zipcodes, new])
+                pad = len(new)
+                self.xtx = sparse.block_diag(
+                    [self.xtx, sparse.csr_matrix((pad, pad))], format="csr"
+                )
+                self.xty = np.concatenate([self.xty, np.zeros(pad)])
+                self.coef = np.concatenate([self.coef, np.zeros(pad)])
+        order = np.argsort(self.zipcodes, kind="stable")
+        if not len(order):
+            return np.full(len(zipcodes), -1)
+        found = np.minimum(
+            np.searchsorted(self.zipcodes[order], zipcodes), len(order) - 1
+        )
+        columns = order[found]
+        return np.where(self.zipcodes[columns] == zipcodes, columns, -1)
+
+    def _design(self, features, text, zip_columns):
+        # [dense features | text | zip indicators], rows without a zip
+        # column get no indicator
+        n = len(features)
+        has_zip = zip_columns >= 0
+        indicators = sparse.csr_matrix(
+            (
+                np.ones(has_zip.sum()),
+                (np.flatnonzero(has_zip), zip_columns[has_zip]),
+            ),
+            shape=(n, len(self.zipcodes)),
+        )
+        return sparse.hstack(
+            [sparse.csr_matrix(features), text, indicators], format="csr"
+        )
+
+    def update(self, df_houses, decay=HEDONIC_DECAY):
+        """
+        Adds the statistics of new listings (the previous ones weighted by
+        decay) and re-solves the coefficients.
+
+        Parameters
+        ----------
+        df_houses : pd.DataFrame
+            preprocessed listings (Price, SqFt, Bedrooms, Bathrooms, Zipcode,
+            and Description if any)
+        decay : float, optional
+            weight of the statistics so far, 1 keeps the whole history
+
+        Returns
+        -------
+        HedonicModel
+            self
+        """
+
+        features, log_price, complete = hedonic_features(df_houses)
+        complete &= ~np.isnan(log_price)
+        rows = np.flatnonzero(complete)
+        zipcodes = df_houses["Zipcode"].to_numpy(dtype=np.int64)[rows]
+        zip_columns = self._zip_columns(zipcodes, add=True)
+        text = hedonic_text(df_houses, self.n_text)[rows]
+        X = self._design(features[rows], text, zip_columns)
+        y = log_price[complete]
+
+        self.xtx = (decay * self.xtx + (X.T @ X)).tocsr()
+        self.xty = decay * self.xty + X.T @ y
+        self.yty = decay * self.yty + y @ y
+        self.n = decay * self.n + len(y)
+        return self.solve()
+
+    def solve(self, ridge=HEDONIC_RIDGE, text_ridge=HEDONIC_TEXT_RIDGE):
+        """
+        Coefficients from the normal equations (X'X + R) b = X'y, and the
+        residual variance from the sufficient statistics. R is diagonal: the
+        small ridge keeps zips whose listings are all discounted away
+        solvable, the larger text_ridge shrinks words seen in few listings.
+        """
+
+        if not self.n:
+            return self
+        penalty = np.full(self.n_params, ridge)
+        penalty[len(FEATURES) : self.n_fixed] = text_ridge
+        A = (self.xtx + sparse.diags(penalty)).tocsc()
+        self.coef = np.atleast_1d(spsolve(A, self.xty))
+        rss = self.yty - 2 * self.coef @ self.xty + self.coef @ (self.xtx @ self.coef)
+        self.sigma2 = max(rss, 0.0) / max(self.n - self.n_params, 1.0)
+        return self
+
+    def predict(self, df_houses, band=HEDONIC_FAIR_BAND):
+        """
+        Expected price of every listing and its asking price relative to it.
+
+        Zips without a fixed effect get the listing weighted mean effect.
+
+        Parameters
+        ----------
+        df_houses : pd.DataFrame
+            preprocessed listings (Price, SqFt, Bedrooms, Bathrooms, Zipcode,
+            and Description if any)
+        band : float, optional
+            asking prices within this fraction of the expected price are fair
+
+        Returns
+        -------
+        pd.DataFrame
+            indexed like df_houses: Expected_Price, Price_vs_Model (asking /
+            expected - 1) and Model_Pricing (Overpriced, Underpriced or Fair),
+            nan / None where a feature is missing
+        """
+
+        features, _, complete = hedonic_features(df_houses)
+        zip_columns = self._zip_columns(df_houses["Zipcode"].to_numpy(dtype=np.int64))
+
+        beta = self.coef[: len(FEATURES)]
+        text_effect = (
+            hedonic_text(df_houses, self.n_text)
+            @ self.coef[len(FEATURES) : self.n_fixed]
+        )
+        zip_effects = self.coef[self.n_fixed :]
+        counts = self.xtx.diagonal()[self.n_fixed :]
+        mean_effect = zip_effects @ counts / counts.sum() if counts.sum() else np.nan
+        # zip column -1 picks the mean effect appended last
+        effect = np.append(zip_effects, mean_effect)[zip_columns]
+
+        # median (not mean) of the lognormal price, so that as many listings
+        # are over as under it
+        expected = np.where(
+            complete, np.exp(features @ beta + text_effect + effect), np.nan
+        )
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ratio = df_houses["Price"].to_numpy(dtype=float) / expected - 1
+        pricing = np.select(
+            [ratio > band, ratio < -band, np.abs(ratio) <= band],
+            ["Overpriced", "Underpriced", "Fair"],
+            None,
+        )
+        return pd.DataFrame(
+            {
+                "Expected_Price": np.round(expected),
+                "Price_vs_Model": np.round(ratio, 3),
+                "Model_Pricing": pricing,
+            },
+            index=df_houses.index,
+        )
+
+    def summary(self):
+        """
+        Dense coefficients, residual sd and the (discounted) listing count.
+        """
+
+        return {
+            **dict(zip(FEATURES, self.coef[: len(FEATURES)].round(4))),
+            "text_columns": self.n_text,
+            "zips": len(self.zipcodes),
+            "listings": round(self.n, 1),
+            "residual_sd": round(float(np.sqrt(self.sigma2)), 4),
+        }
+
+    def save(self, path):
+        """
+        Writes the statistics and coefficients as npz, atomically.
+        """
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        xtx = self.xtx.tocsr()
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                zipcodes=self.zipcodes,
+                n_text=self.n_text,
+                data=xtx.data,
+                indices=xtx.indices,
+                indptr=xtx.indptr,
+                xty=self.xty,
+                scalars=np.array([self.yty, self.n, self.sigma2]),
+                coef=self.coef,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        model = cls()
+        with np.load(path) as f:
+            model.zipcodes = f["zipcodes"]
+            # models saved before the description was used have no text
+            model.n_text = int(f["n_text"]) if "n_text" in f.files else 0
+            p = model.n_params
+            model.xtx = sparse.csr_matrix(
+                (f["data"], f["indices"], f["indptr"]), shape=(p, p)
+            )
+            model.xty, model.coef = f["xty"], f["coef"]
+            model.yty, model.n, model.sigma2 = f["scalars"]
+        return model
+
+    @classmethod
+    def load_or_new(cls, path):
+        """
+        The model saved at path, or an empty one on the first run.
+        """
+
+        return cls.load(path) if os.path.exists(path) else cls()
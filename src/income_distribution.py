@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+File:        income_distribution.py
+Description: Share of a zip's households that can afford a home, from the
+                household income brackets of the census S1901 table (Less than
+                $10,000 ... $200,000 or more) instead of the median alone.
+                The brackets of every zip are turned into a piecewise linear
+                CDF once (Pareto tail above $200,000), and all listings are
+                then evaluated together: zips are looked up and income
+                thresholds placed into brackets with searchsorted, and the
+                bracket CDF values are gathered and interpolated as arrays.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       distribution = IncomeDistribution.from_census(df_income)
+             pct = distribution.pct_can_afford(df.Zipcode, df.Price)
+"""
+
+import numpy as np
+import pandas as pd
+from config import AFFORDABLE_INCOME_MULTIPLE, INCOME_PARETO_ALPHA
+
+# S1901 household income brackets: lower bound and column label
+BRACKETS = [
+    (0, "Less than $10,000"),
+    (10_000, "$10,000 to $14,999"),
+    (15_000, "$15,000 to $24,999"),
+    (25_000, "$25,000 to $34,999"),
+    (35_000, "$35,000 to $49,999"),
+    (50_000, "$50,000 to $74,999"),
+    (75_000, "$75,000 to $99,999"),
+    (100_000, "$100,000 to $149,999"),
+    (150_000, "$150,000 to $199,999"),
+    (200_000, "$200,000 or more"),
+]
+BRACKET_EDGES = np.array([lower for lower, _ in BRACKETS], dtype=float)
+SHARE_COLUMN = "Estimate!!Households!!Total!!{label}"
+MOE_COLUMN = "Margin of Error!!Households!!Total!!{label}"
+
+
+def parse_zipcodes(df_income):
+    """
+    Zipcodes of the census rows, from "ZCTA5 14201" style area names.
+    """
+
+    return df_income["Geographic Area Name"].str.split().str[-1].astype(int).to_numpy()
+
+
+def bracket_table(df_income, column=SHARE_COLUMN):
+    """
+    (zips x brackets) array of a bracket column family, nan where the census
+    has no estimate ("-", "N").
+    """
+
+    return np.column_stack(
+        [
+            pd.to_numeric(df_income[column.format(label=label)], errors="coerce")
+            for _, label in BRACKETS
+        ]
+    ).astype(float)
+
+
+class IncomeDistribution:
+    """
+    Household income distribution of every zip, as bracket CDFs.
+
+    Parameters
+    ----------
+    zipcodes : array-like of int
+    shares : array-like, shape (n_zips, n_brackets)
+        percent of households in each bracket (rows needn't sum to exactly
+        100, census rounding is normalized away)
+    """
+
+    def __init__(self, zipcodes, shares):
+        zipcodes = np.asarray(zipcodes, dtype=np.int64)
+        order = np.argsort(zipcodes, kind="stable")
+        self.zipcodes = zipcodes[order]
+
+        shares = np.asarray(shares, dtype=float)[order]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            shares = shares / shares.sum(axis=1, keepdims=True)
+
+        # cdf[i, k] is the share of zip i's households below BRACKET_EDGES[k],
+        # the open top bracket is kept apart for the tail
+        self.cdf = np.concatenate(
+            [np.zeros((len(shares), 1)), np.cumsum(shares[:, :-1], axis=1)], axis=1
+        )
+        self.top_share = shares[:, -1]
+
+    @classmethod
+    def from_census(cls, df_income):
+        """
+        From the raw S1901 table (pd.read_csv(path, header=1)).
+        """
+
+        return cls(parse_zipcodes(df_income), bracket_table(df_income))
+
+    def __len__(self):
+        return len(self.zipcodes)
+
+    def zip_rows(self, zipcodes):
+        """
+        Row of every zipcode in the distribution table, -1 when unknown.
+        """
+
+        zipcodes = np.asarray(zipcodes, dtype=np.int64)
+        if not len(self.zipcodes):
+            return np.full(len(zipcodes), -1)
+        rows = np.searchsorted(self.zipcodes, zipcodes)
+        rows = np.minimum(rows, len(self.zipcodes) - 1)
+        return np.where(self.zipcodes[rows] == zipcodes, rows, -1)
+
+    def share_below(self, zipcodes, incomes):
+        """
+        Share of each zip's households with an income below the given one,
+        for many (zipcode, income) pairs at once.
+
+        Parameters
+        ----------
+        zipcodes : array-like of int
+        incomes : array-like of float
+
+        Returns
+        -------
+        np.ndarray
+            shares in [0, 1], nan for unknown zips or zips without estimates
+        """
+
+        rows = self.zip_rows(zipcodes)
+        incomes = np.maximum(np.asarray(incomes, dtype=float), 0)
+
+        # bracket of each income, the open top bracket is the last one
+        k = np.searchsorted(BRACKET_EDGES, incomes, side="right") - 1
+        in_tail = k >= len(BRACKET_EDGES) - 1
+        k = np.minimum(k, len(BRACKET_EDGES) - 2)
+
+        # linear within a bracket (households spread evenly across it)
+        valid_rows = np.maximum(rows, 0)
+        lower = self.cdf[valid_rows, k]
+        upper = self.cdf[valid_rows, k + 1]
+        width = BRACKET_EDGES[k + 1] - BRACKET_EDGES[k]
+        fraction = np.clip((incomes - BRACKET_EDGES[k]) / width, 0, 1)
+        below = lower + fraction * (upper - lower)
+
+        # pareto above the top edge, where incomes thin out quickly
+        with np.errstate(divide="ignore"):
+            tail = (BRACKET_EDGES[-1] / incomes[in_tail]) ** INCOME_PARETO_ALPHA
+        below[in_tail] = 1 - self.top_share[valid_rows[in_tail]] * tail
+
+        below[rows < 0] = np.nan
+        return below
+
+    def pct_can_afford(self, zipcodes, prices):
+        """
+        Percent of each zip's households that can afford each price, i.e.
+        earn at least price / AFFORDABLE_INCOME_MULTIPLE (the same rule as
+        Affordable_Price). Rounded to one decimal, like the census percents.
+        """
+
+        required_income = np.asarray(prices, dtype=float) / AFFORDABLE_INCOME_MULTIPLE
+        pct = (1 - self.share_below(zipcodes, required_income)) * 100
+        return np.round(pct, 1)
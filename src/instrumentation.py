@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+File:        instrumentation.py
+Description: Run-level instrumentation for the scraping / analysis pipeline.
+                Records per-stage spans (wall time, CPU time, row counts),
+                event counters (pages scraped, listings dropped, geocode hits
+                and misses, upload retries) and accumulated timers (page
+                waits, scrolling, geocoding sleeps), and writes them out as a
+                JSON run report. State is module level so any module can
+                record into the current run without passing objects around.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       --
+"""
+
+import os
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+_run = {}
+
+
+def start_run(name="main"):
+    """
+    Resets the instrumentation state for a new run.
+    """
+
+    _run.clear()
+    _run.update(
+        {
+            "name": name,
+            "started": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "start_wall": time.perf_counter(),
+            "start_cpu": time.process_time(),
+            "stages": [],
+            "counters": {},
+            "timers": {},
+        }
+    )
+
+
+def _ensure_run():
+    if not _run:
+        start_run()
+
+
+@contextmanager
+def stage(name, rows=None):
+    """
+    Times a pipeline stage. The yielded dict can be updated inside the block,
+    e.g. span["rows"] = len(df), to record the number of rows produced.
+
+    Example
+    -------
+    with stage("scrape") as span:
+        listing_data = scrape_listings(...)
+        span["rows"] = len(listing_data)
+    """
+
+    _ensure_run()
+    span = {"name": name, "rows": rows, "status": "ok"}
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    try:
+        yield span
+    except BaseException:
+        span["status"] = "failed"
+        raise
+    finally:
+        span["wall_s"] = round(time.perf_counter() - start_wall, 3)
+        span["cpu_s"] = round(time.process_time() - start_cpu, 3)
+        _run["stages"].append(span)
+
+
+def count(name, n=1):
+    """
+    Increments an event counter.
+    """
+
+    _ensure_run()
+    _run["counters"][name] = _run["counters"].get(name, 0) + n
+
+
+@contextmanager
+def timer(name):
+    """
+    Accumulates the wall time spent inside the block under timers[name], for
+    time that is spread across many small calls (waits, sleeps, requests).
+    """
+
+    _ensure_run()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _run["timers"][name] = _run["timers"].get(name, 0.0) + (
+            time.perf_counter() - start
+        )
+
+
+def add_time(name, seconds):
+    """
+    Adds an externally measured duration (e.g. a browser reported page load)
+    to timers[name].
+    """
+
+    _ensure_run()
+    _run["timers"][name] = _run["timers"].get(name, 0.0) + seconds
+
+
+def get_report():
+    """
+    Snapshot of the current run as a json serializable dict.
+    """
+
+    _ensure_run()
+    return {
+        "name": _run["name"],
+        "started": _run["started"],
+        "wall_s": round(time.perf_counter() - _run["start_wall"], 3),
+        "cpu_s": round(time.process_time() - _run["start_cpu"], 3),
+        "stages": list(_run["stages"]),
+        "counters": dict(_run["counters"]),
+        "timers": {name: round(t, 3) for name, t in _run["timers"].items()},
+    }
+
+
+def print_report(report=None):
+    """
+    Prints a readable stage table with counters and timers.
+    """
+
+    report = report or get_report()
+    print(f"{'stage':<24}{'wall (s)':>10}{'cpu (s)':>10}{'rows':>8}  status")
+    for span in report["stages"]:
+        rows = "" if span["rows"] is None else span["rows"]
+        print(
+            f"{span['name']:<24}{span['wall_s']:>10.2f}{span['cpu_s']:>10.2f}"
+            f"{rows:>8}  {span['status']}"
+        )
+    print(f"{'total':<24}{report['wall_s']:>10.2f}{report['cpu_s']:>10.2f}")
+    for name, value in {**report["counters"], **report["timers"]}.items():
+        print(f"  {name}: {value}")
+
+
+def write_report(path, history_path=None):
+    """
+    Writes the run report as json, creating the output folder if needed. If
+    history_path is given, the report is also appended to it as one json line,
+    so timings can be compared across runs.
+    """
+
+    report = get_report()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+    if history_path is not None:
+        os.makedirs(os.path.dirname(os.path.abspath(history_path)), exist_ok=True)
+        with open(history_path, "a") as f:
+            f.write(json.dumps(report) + "\n")
+
+    return report
+
+
+###########
+# PROFILING
+###########
+
+
+@contextmanager
+def profile(profiler=None, output_path=None):
+    """
+    Optionally profiles the block with cProfile or pyinstrument.
+
+    Parameters
+    ----------
+    profiler : str, optional
+        "cprofile", "pyinstrument" or None (no profiling)
+    output_path : str, optional
+        .prof stats file for cprofile, .html report for pyinstrument
+    """
+
+    if profiler is None:
+        yield
+        return
+
+    if profiler == "cprofile":
+        import cProfile
+
+        prof = cProfile.Profile()
+        prof.enable()
+        try:
+            yield
+        finally:
+            prof.disable()
+            prof.dump_stats(output_path or "run.prof")
+
+    elif profiler == "pyinstrument":
+        # optional dependency, only needed when this profiler is requested
+        from pyinstrument import Profiler
+
+        prof = Profiler()
+        prof.start()
+        try:
+            yield
+        finally:
+            prof.stop()
+            with open(output_path or "run_profile.html", "w") as f:
+                f.write(prof.output_html())
+
+    else:
+        raise ValueError(f"Unknown profiler: {profiler}")
@@ -4,91 +4,364 @@ File:        main.py
 Description: Scrape housing listings and calculate affordability metrics.
 Author:      Yuseof
 Created:     2025-07-24
-Modified:    2025-08-22
-Usage:       python main.py
+Modified:    2026-10-19
+Usage:       python main.py [--report PATH] [--profile cprofile|pyinstrument]
+                 [--record DIR] [--pacing stealth|balanced|fast|replay]
+                 [--resume] [--stages scrape,analyze,upload,export]
 """
 
+import os
 import ast
 import argparse
 import pandas as pd
 from util import address_to_lat_lng, upload_to_airtable
 from affordability_analysis import calculate_affordability_metrics
-from scraper import scrape_listings, process_listing_data, instantiate_driver
+from comps import comparable_listings
+from grid_aggregates import build_grid
+from spatial_smoothing import load_adjacency, smooth_zip_metrics
+from hedonic import HedonicModel
+from columnar import write_stage, read_stage_frame
+from static_export import export_static_dashboard
+from scraper import process_listing_data
+from dedup import deduplicate_listings
+from driver_manager import DriverManager
+from scrape_replay import PageRecorder
+from pacing import Pacer, PROFILES
+from checkpoint import Checkpoint
+from dashboard_summary import build_summary, save_summary
+from instrumentation import start_run, stage, print_report, write_report, profile
 from config import (
     HOUSING_URL,
     MAX_LISTINGS,
+    SCRAPER_PACING_PROFILE,
+    SCRAPER_WAIT_BUDGET_S,
     PATH_TO_INCOME_DATA,
-    # PATH_TO_OUTPUT_ZIP_METRICS,
-    # PATH_TO_OUTPUT_HOUSE_METRICS,
     HOUSE_TABLE_NAME,
     ZIP_TABLE_NAME,
     BASE_ID,
     AIRTABLE_ACCESS_TOKEN,
+    PATH_TO_DASHBOARD_SUMMARY,
+    PATH_TO_GRID_CELLS,
+    PATH_TO_HEDONIC_MODEL,
+    PATH_TO_STATIC_EXPORT,
+    PATH_TO_RUN_REPORT,
+    PATH_TO_RUN_HISTORY,
+    PATH_TO_CHECKPOINTS,
+    PATH_TO_CHROME_PROFILE,
+    PATH_TO_ZIP_SHAPEFILE,
+    PROJECT_ROOT,
 )
 
+# pipeline stages, in order
+STAGES = ["scrape", "analyze", "upload", "export"]
 
-def main(headless=True):
+
+def scrape(
+    headless,
+    record_dir,
+    pacing,
+    wait_budget_s,
+    checkpoint,
+    housing_url=HOUSING_URL,
+    max_listings=MAX_LISTINGS,
+    profile_dir=PATH_TO_CHROME_PROFILE,
+):
+    """
+    Scrapes, processes and de-duplicates the listings, checkpointing every
+    finished page.
+    """
 
     # scrape, process, and output listing data
     print("Initiating webdriver...")
-    driver = instantiate_driver(headless)
+    with stage("driver_startup"):
+        driver_manager = DriverManager(headless, profile_dir)
+        driver_manager.start()
     print("Webdriver created successfully!")
 
     # scrape, process, and output listing data
     print("Scraping initiated...")
-    listing_data = scrape_listings(driver, HOUSING_URL, MAX_LISTINGS)
-    df_listings = process_listing_data(listing_data)
+    with stage("scrape") as span:
+        # optionally save page snapshots, to replay the scrape offline later
+        recorder = PageRecorder(record_dir) if record_dir else None
+        pacer = Pacer(pacing, wait_budget_s)
+        listing_data = driver_manager.scrape(
+            housing_url,
+            max_listings,
+            recorder=recorder,
+            pacer=pacer,
+            checkpoint=checkpoint,
+        )
+        driver_manager.close()
+        span["pacing"] = pacer.report()
+        span["rows"] = len(listing_data)
+    with stage("process_listings") as span:
+        df_listings = process_listing_data(listing_data)
+        span["rows"] = len(df_listings)
+    with stage("dedup") as span:
+        df_listings = deduplicate_listings(df_listings)
+        span["rows"] = len(df_listings)
     print("Scraping successful!")
 
+    return df_listings
+
+
+def analyze(
+    df_listings,
+    income_path=PATH_TO_INCOME_DATA,
+    geocode=None,
+    shapefile_path=PATH_TO_ZIP_SHAPEFILE,
+    hedonic_model=None,
+):
+    """
+    Affordability metrics and geocoding of the processed listings.
+
+    Parameters
+    ----------
+    df_listings : pd.DataFrame
+    income_path : str, optional
+        census S1901 income csv
+    geocode : callable, optional
+        parsed address -> [lat, lng] or None, default util.address_to_lat_lng
+    shapefile_path : str, optional
+        zip shapefile, whose adjacency the zip metrics are smoothed over
+    hedonic_model : HedonicModel, optional
+        price model of the previous runs, refined in place with this run's
+        listings (saving it is left to the caller), default a new model
+    """
+
+    geocode = geocode or address_to_lat_lng
+    if hedonic_model is None:
+        hedonic_model = HedonicModel()
+
     # calculate affordability
     print("Affordability Calculations initiated...")
-    df_income = pd.read_csv(PATH_TO_INCOME_DATA, header=1)
-    df_zip_level_analysis, df_house_level_analysis = calculate_affordability_metrics(
-        df_listings, df_income
-    )
+    with stage("affordability") as span:
+        df_income = pd.read_csv(income_path, header=1)
+        df_zip_level_analysis, df_house_level_analysis = (
+            calculate_affordability_metrics(df_listings, df_income)
+        )
+        span["rows"] = len(df_house_level_analysis)
     print("Affordability Calculations successful!")
 
+    # zips with a handful of listings borrow strength from their neighbors
+    print("Smoothing zip metrics...")
+    with stage("smoothing") as span:
+        if os.path.exists(os.path.join(PROJECT_ROOT, shapefile_path)):
+            df_zip_level_analysis = df_zip_level_analysis.merge(
+                smooth_zip_metrics(
+                    df_house_level_analysis,
+                    df_zip_level_analysis,
+                    load_adjacency(shapefile_path),
+                ),
+                on="Zipcode",
+                how="left",
+            )
+        else:
+            print(f"No zip shapefile at {shapefile_path}, skipping smoothing")
+        span["rows"] = len(df_zip_level_analysis)
+    print("Smoothing successful!")
+
+    # this week's listings refine the model carried over from previous runs
+    print("Fitting hedonic price model...")
+    with stage("hedonic") as span:
+        hedonic_model.update(df_house_level_analysis)
+        df_house_level_analysis = df_house_level_analysis.join(
+            hedonic_model.predict(df_house_level_analysis)
+        )
+        span["model"] = hedonic_model.summary()
+        span["rows"] = len(df_house_level_analysis)
+    print("Hedonic price model fitted!")
+
     print("Performing geolocation...")
-    df_house_level_analysis["Lat_Lng"] = df_house_level_analysis[
-        "Parsed_Address"
-    ].apply(lambda x: address_to_lat_lng(x))
-    # TODO: fix this later instead of removing
-    df_house_level_analysis = df_house_level_analysis[
-        df_house_level_analysis["Lat_Lng"].apply(lambda x: isinstance(x, list))
-    ]
-    df_house_level_analysis["Lat"] = (
-        df_house_level_analysis["Lat_Lng"].apply(lambda x: x[0]).copy()
-    )
-    df_house_level_analysis["Lng"] = (
-        df_house_level_analysis["Lat_Lng"].apply(lambda x: x[1]).copy()
-    )
-    df_house_level_analysis.drop(columns=["Lat_Lng"], inplace=True)
+    with stage("geocode") as span:
+        coords = df_house_level_analysis["Parsed_Address"].map(geocode)
+        # TODO: fix this later instead of removing
+        found = coords.map(lambda x: isinstance(x, list)).to_numpy(dtype=bool)
+        lat, lng = zip(*coords[found]) if found.any() else ((), ())
+        df_house_level_analysis = df_house_level_analysis[found].assign(
+            Lat=pd.to_numeric(lat, errors="coerce"),
+            Lng=pd.to_numeric(lng, errors="coerce"),
+        )
+        # the parsed address is only needed for geocoding
+        df_house_level_analysis = df_house_level_analysis.drop(
+            columns=["Parsed_Address"]
+        )
+        span["rows"] = len(df_house_level_analysis)
     print("Geolocation successful!")
 
-    # output results
-    # print("Saving data locally...")
-    # df_zip_level_analysis.to_csv(PATH_TO_OUTPUT_ZIP_METRICS, index=False)
-    # df_house_level_analysis.to_csv(PATH_TO_OUTPUT_HOUSE_METRICS, index=False)
-    # print("Saved successfully!")
+    print("Finding comparable listings...")
+    with stage("comps") as span:
+        df_house_level_analysis = df_house_level_analysis.join(
+            comparable_listings(df_house_level_analysis)
+        )
+        span["rows"] = len(df_house_level_analysis)
+    print("Comparable listings found!")
+
+    return df_zip_level_analysis, df_house_level_analysis
+
+
+def upload(df_house_level_analysis, df_zip_level_analysis):
+    """
+    Uploads the house and zip level results to Airtable.
+    """
 
     print("Uploading house-level data to Airtable...")
-    df_house_level_analysis.drop(columns=["Parsed_Address"], inplace=True)
-    upload_to_airtable(
-        AIRTABLE_ACCESS_TOKEN, BASE_ID, HOUSE_TABLE_NAME, df_house_level_analysis
-    )
+    with stage("upload_houses", rows=len(df_house_level_analysis)):
+        upload_to_airtable(
+            AIRTABLE_ACCESS_TOKEN, BASE_ID, HOUSE_TABLE_NAME, df_house_level_analysis
+        )
     print("Upload Successful!")
 
     print("Uploading zip-level data to Airtable...")
-    upload_to_airtable(
-        AIRTABLE_ACCESS_TOKEN, BASE_ID, ZIP_TABLE_NAME, df_zip_level_analysis
-    )
+    with stage("upload_zips", rows=len(df_zip_level_analysis)):
+        upload_to_airtable(
+            AIRTABLE_ACCESS_TOKEN, BASE_ID, ZIP_TABLE_NAME, df_zip_level_analysis
+        )
     print("Upload Successful!")
 
+
+def main(
+    headless=True,
+    report_path=PATH_TO_RUN_REPORT,
+    record_dir=None,
+    pacing=SCRAPER_PACING_PROFILE,
+    wait_budget_s=SCRAPER_WAIT_BUDGET_S,
+    resume=False,
+    stages=STAGES,
+):
+
+    start_run("main")
+
+    # checkpoints of a failed run are kept for --resume, a new run clears them
+    checkpoint = Checkpoint(PATH_TO_CHECKPOINTS)
+    if not resume:
+        checkpoint.clear()
+
+    try:
+        # every stage reads its inputs from the previous stage's arrow output, so
+        # stages can also be run (or re-run) on their own with --stages
+        if "scrape" in stages and not checkpoint.has_stage("listings"):
+            df_listings = scrape(
+                headless, record_dir, pacing, wait_budget_s, checkpoint
+            )
+            checkpoint.save_stage("listings", df_listings)
+
+        if "analyze" in stages and not checkpoint.has_stage(
+            "house_metrics", "zip_metrics"
+        ):
+            df_listings = checkpoint.load_stage("listings")
+            hedonic_model = HedonicModel.load_or_new(PATH_TO_HEDONIC_MODEL)
+            df_zip_level_analysis, df_house_level_analysis = analyze(
+                df_listings, hedonic_model=hedonic_model
+            )
+            checkpoint.save_stage("house_metrics", df_house_level_analysis)
+            checkpoint.save_stage("zip_metrics", df_zip_level_analysis)
+            # saved only once this run's metrics are checkpointed, so that a
+            # resumed run doesn't add the same listings to the model twice
+            hedonic_model.save(PATH_TO_HEDONIC_MODEL)
+
+        if "upload" in stages:
+            df_house_level_analysis = checkpoint.load_stage("house_metrics")
+            df_zip_level_analysis = checkpoint.load_stage("zip_metrics")
+            upload(df_house_level_analysis, df_zip_level_analysis)
+
+            # precomputed kpis let the dashboard paint before loading the full data
+            print("Saving dashboard summary...")
+            save_summary(
+                build_summary(df_house_level_analysis, df_zip_level_analysis),
+                PATH_TO_DASHBOARD_SUMMARY,
+            )
+            print("Saved successfully!")
+
+            # heatmap cells at every grid level, for the map's price grid
+            print("Saving map grid...")
+            with stage("grid", rows=len(df_house_level_analysis)):
+                write_stage(build_grid(df_house_level_analysis), PATH_TO_GRID_CELLS)
+            print("Saved successfully!")
+
+        if "export" in stages:
+            df_house_level_analysis = checkpoint.load_stage("house_metrics")
+            df_zip_level_analysis = checkpoint.load_stage("zip_metrics")
+
+            # the data changes weekly, so the dashboard is also pre-rendered once
+            # for static hosting
+            print("Exporting static dashboard...")
+            with stage("static_export", rows=len(df_house_level_analysis)) as span:
+                df_cells = (
+                    read_stage_frame(PATH_TO_GRID_CELLS)
+                    if os.path.exists(PATH_TO_GRID_CELLS)
+                    else None
+                )
+                span["bytes"] = export_static_dashboard(
+                    df_house_level_analysis,
+                    df_zip_level_analysis,
+                    PATH_TO_STATIC_EXPORT,
+                    df_cells=df_cells,
+                )
+            print("Exported successfully!")
+    finally:
+        # run report, for tracking stage timings across weekly runs. failed
+        # runs are reported too (their failed stage marked as such)
+        print_report(write_report(report_path, PATH_TO_RUN_HISTORY))
+
+    # completed, nothing to resume
+    checkpoint.clear()
+
     print("Script completed successfully!")
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--headless", type=bool, default=True)
+    parser.add_argument(
+        "--report", default=PATH_TO_RUN_REPORT, help="path of the json run report"
+    )
+    parser.add_argument(
+        "--profile",
+        choices=["cprofile", "pyinstrument"],
+        default=None,
+        help="profile the whole run with the given profiler",
+    )
+    parser.add_argument(
+        "--profile-output",
+        default=None,
+        help="profiler output file (.prof for cprofile, .html for pyinstrument)",
+    )
+    parser.add_argument(
+        "--record",
+        default=None,
+        help="folder to save page snapshots to, for offline replay of the scrape",
+    )
+    parser.add_argument(
+        "--pacing",
+        choices=list(PROFILES),
+        default=SCRAPER_PACING_PROFILE,
+        help="pacing profile for the scraper's human-like waits",
+    )
+    parser.add_argument(
+        "--wait-budget",
+        type=float,
+        default=SCRAPER_WAIT_BUDGET_S,
+        help="max seconds of deliberate waiting in the scrape",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue a failed run from its last checkpoint",
+    )
+    parser.add_argument(
+        "--stages",
+        default=",".join(STAGES),
+        help="comma separated subset of " + ",".join(STAGES),
+    )
     args = parser.parse_args()
-    main(headless=args.headless)
+    with profile(args.profile, args.profile_output):
+        main(
+            headless=args.headless,
+            report_path=args.report,
+            record_dir=args.record,
+            pacing=args.pacing,
+            wait_budget_s=args.wait_budget,
+            resume=args.resume,
+            stages=args.stages.split(","),
+        )
@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+"""
+File:        pacing.py
+Description: Human-like pacing for the scraper. All deliberate waits (page
+                load pauses, scroll steps, per-card delays, pauses between
+                pages) come from a named profile, are capped by a per-run wait
+                budget, and are only stretched when block signals appear
+                (captchas, empty result pages, unexpected page titles). Keeps
+                track of how much wall time went to waiting vs real work.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       pacer = Pacer("balanced")
+             scrape_listings(driver, HOUSING_URL, MAX_LISTINGS, pacer=pacer)
+"""
+
+import time
+import random
+from instrumentation import count, timer
+from selenium.webdriver.common.by import By
+
+# delay ranges are (low, high) seconds, drawn uniformly
+PROFILES = {
+    # original hard-coded pacing
+    "stealth": {
+        "page_load": (1.5, 3.0),
+        "before_click": (0.5, 1.5),
+        "click_hold": (0.1, 0.5),
+        "between_pages": (1.5, 3.5),
+        "per_card": (0.05, 0.15),
+        "scroll_step": (0.25, 0.75),
+        "scroll_px": 200,
+        "scroll_timeout": 30,
+        "wait_budget_s": None,
+        "block_retries": 2,
+    },
+    "balanced": {
+        "page_load": (1.0, 2.0),
+        "before_click": (0.3, 0.8),
+        "click_hold": (0.1, 0.3),
+        "between_pages": (1.0, 2.5),
+        "per_card": (0.0, 0.0),
+        "scroll_step": (0.1, 0.3),
+        "scroll_px": 400,
+        "scroll_timeout": 8,
+        "wait_budget_s": 300,
+        "block_retries": 2,
+    },
+    "fast": {
+        "page_load": (0.3, 0.8),
+        "before_click": (0.1, 0.3),
+        "click_hold": (0.05, 0.1),
+        "between_pages": (0.3, 0.8),
+        "per_card": (0.0, 0.0),
+        "scroll_step": (0.0, 0.05),
+        "scroll_px": 1_000,
+        "scroll_timeout": 2,
+        "wait_budget_s": 60,
+        "block_retries": 1,
+    },
+    # offline replays of recorded pages, no waiting at all
+    "replay": {
+        "page_load": (0.0, 0.0),
+        "before_click": (0.0, 0.0),
+        "click_hold": (0.0, 0.0),
+        "between_pages": (0.0, 0.0),
+        "per_card": (0.0, 0.0),
+        "scroll_step": (0.0, 0.0),
+        "scroll_px": 2_000,
+        "scroll_timeout": 1,
+        "wait_budget_s": 0,
+        "block_retries": 0,
+    },
+}
+
+# backoff applied on block signals, halved again after every clean page
+BACKOFF_FACTOR = 2.0
+MAX_BACKOFF = 8.0
+BLOCK_COOLDOWN_S = (10.0, 20.0)
+
+# page titles and elements of bot walls / captchas
+BLOCK_TITLE_MARKERS = [
+    "captcha",
+    "robot",
+    "access denied",
+    "access to this page has been denied",
+    "just a moment",
+    "attention required",
+]
+BLOCK_ELEMENT_SELECTOR = (
+    "#px-captcha, .g-recaptcha, iframe[src*='captcha'], iframe[title*='challenge']"
+)
+
+
+class Pacer:
+    """
+    Holds the pacing state of one scrape run.
+
+    Parameters
+    ----------
+    profile : str
+        one of PROFILES
+    wait_budget_s : float, optional
+        total seconds of deliberate waiting allowed for the run, overrides
+        the profile's budget. Once spent, waits are skipped, except the
+        cooldowns after block signals.
+    """
+
+    def __init__(self, profile="stealth", wait_budget_s=None):
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown pacing profile: {profile}")
+
+        self.profile = profile
+        self.settings = PROFILES[profile]
+        self.wait_budget_s = (
+            wait_budget_s
+            if wait_budget_s is not None
+            else self.settings["wait_budget_s"]
+        )
+        self.backoff = 1.0
+        self.block_signals = 0
+        self.waited = {}
+        self.base_title = None
+        self.start = time.perf_counter()
+
+    @property
+    def total_wait(self):
+        return sum(self.waited.values())
+
+    def _sleep(self, kind, seconds):
+        if seconds <= 0:
+            return
+        with timer(f"wait_{kind}"):
+            time.sleep(seconds)
+        self.waited[kind] = self.waited.get(kind, 0.0) + seconds
+
+    def pause(self, kind):
+        """
+        Sleeps for a random duration from the profile's range for kind,
+        stretched by the current backoff and capped by the remaining budget.
+        """
+
+        low, high = self.settings[kind]
+        seconds = random.uniform(low, high) * self.backoff
+        if self.wait_budget_s is not None:
+            seconds = min(seconds, max(self.wait_budget_s - self.total_wait, 0.0))
+        self._sleep(kind, seconds)
+
+    def pause_seconds(self, kind):
+        """
+        Random duration for waits performed by the driver itself (e.g.
+        ActionChains.pause), counted towards the budget without sleeping.
+        """
+
+        low, high = self.settings[kind]
+        seconds = random.uniform(low, high) * self.backoff
+        if self.wait_budget_s is not None:
+            seconds = min(seconds, max(self.wait_budget_s - self.total_wait, 0.0))
+        self.waited[kind] = self.waited.get(kind, 0.0) + seconds
+        return seconds
+
+    ################
+    # BLOCK SIGNALS
+    ################
+
+    def block_signal(self, driver, n_found):
+        """
+        Checks the current page for signs of bot detection.
+
+        Returns
+        -------
+        str or None
+            the signal found ("captcha", "empty_page", "title_changed")
+        """
+
+        title = (driver.title or "").lower()
+        if any(marker in title for marker in BLOCK_TITLE_MARKERS):
+            return "captcha"
+        if driver.find_elements(By.CSS_SELECTOR, BLOCK_ELEMENT_SELECTOR):
+            return "captcha"
+        if n_found == 0:
+            return "empty_page"
+
+        # the results title keeps the search location across pages, a page
+        # sharing none of it is most likely an interstitial
+        words = set(title.split())
+        if self.base_title is None:
+            self.base_title = words
+        elif self.base_title and not words & self.base_title:
+            return "title_changed"
+
+        return None
+
+    def check_page(self, driver, n_found):
+        """
+        Updates the backoff after a page: doubled (and a cooldown taken) on a
+        block signal, halved back towards 1 on a clean page.
+
+        Returns
+        -------
+        str or None
+            the block signal, if any
+        """
+
+        signal = self.block_signal(driver, n_found)
+        if signal is None:
+            self.backoff = max(1.0, self.backoff / BACKOFF_FACTOR)
+            return None
+
+        self.block_signals += 1
+        count(f"block_{signal}")
+        self.backoff = min(MAX_BACKOFF, self.backoff * BACKOFF_FACTOR)
+        print(f"Block signal ({signal}), backing off x{self.backoff:g}")
+
+        # cooldowns are never cut by the budget, getting blocked costs more
+        if self.settings["block_retries"] > 0:
+            self._sleep("block_cooldown", random.uniform(*BLOCK_COOLDOWN_S))
+
+        return signal
+
+    ###########
+    # REPORTING
+    ###########
+
+    def report(self):
+        """
+        Wall time split into deliberate waits and real work since the pacer
+        was created.
+        """
+
+        # driver side pauses are counted but not timed, so clip to the elapsed
+        elapsed = time.perf_counter() - self.start
+        wait = min(self.total_wait, elapsed)
+        return {
+            "profile": self.profile,
+            "elapsed_s": round(elapsed, 2),
+            "wait_s": round(wait, 2),
+            "work_s": round(max(elapsed - wait, 0.0), 2),
+            "wait_share": round(wait / elapsed, 3) if elapsed > 0 else 0.0,
+            "wait_by_kind": {k: round(v, 2) for k, v in self.waited.items()},
+            "block_signals": self.block_signals,
+            "backoff": self.backoff,
+        }
+
+    def print_report(self):
+        report = self.report()
+        print(
+            f"Pacing ({report['profile']}): {report['wait_s']:.1f} s waiting, "
+            f"{report['work_s']:.1f} s working "
+            f"({report['wait_share']:.0%} of {report['elapsed_s']:.1f} s), "
+            f"{report['block_signals']} block signal(s)"
+        )
@@ -0,0 +1,489 @@
+# -*- coding: utf-8 -*-
+"""
+File:        refresh_scheduler.py
+Description: Decides which zips to re-scrape each day instead of re-running
+                every zip weekly. Every refresh of a zip is compared with the
+                previous one (new / removed listings, price changes) to keep a
+                smoothed daily churn rate per zip. Zips are then ranked by the
+                changes they are expected to have piled up since their last
+                refresh, weighted up when the zip's PIR is near the map's
+                cutoff or its listings are near their Affordable_Price, and
+                picked in that order until the daily page budget is spent.
+                Time comes from a clock function, so schedules can be
+                simulated (see benchmarks/refresh_schedule.py).
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       python refresh_scheduler.py --plan
+             python batch_runner.py --manifest ../data/output/refresh_manifest.json
+             python refresh_scheduler.py --record ../data/metros
+"""
+
+import os
+import json
+import math
+import argparse
+from datetime import datetime, timedelta, timezone
+from dedup import address_key
+from util import format_price
+from instrumentation import count
+from columnar import read_stage_frame, stage_path
+from config import (
+    PATH_TO_REFRESH_STATE,
+    PATH_TO_REFRESH_MANIFEST,
+    PATH_TO_METRO_MANIFEST,
+    NY_COUNTY_ZIPS,
+    REDFIN_ZIP_URL,
+    REDFIN_LISTINGS_PER_PAGE,
+    REFRESH_PAGES_PER_DAY,
+    REFRESH_MIN_INTERVAL_DAYS,
+    REFRESH_MAX_INTERVAL_DAYS,
+    REFRESH_BASE_CHURN,
+    REFRESH_CHURN_SMOOTHING,
+    REFRESH_PIR_THRESHOLD,
+    REFRESH_PIR_MARGIN,
+    REFRESH_PRICE_MARGIN,
+)
+
+#######
+# CLOCK
+#######
+
+
+def system_clock():
+    return datetime.now(timezone.utc)
+
+
+class SimulatedClock:
+    """
+    Clock that only moves when advanced, for simulating schedules.
+    """
+
+    def __init__(self, start=datetime(2026, 1, 4, 12, tzinfo=timezone.utc)):
+        self.current = start
+
+    def __call__(self):
+        return self.current
+
+    def advance(self, days=0, hours=0):
+        self.current += timedelta(days=days, hours=hours)
+        return self.current
+
+
+#######
+# CHURN
+#######
+
+
+def listing_snapshot(df_listings):
+    """
+    {address key: price} of a zip's listings, scraped ("$250,000") or
+    analyzed prices.
+    """
+
+    return {
+        address_key(None, address): float(
+            format_price(price) if isinstance(price, str) else price
+        )
+        for address, price in zip(df_listings["Address"], df_listings["Price"])
+    }
+
+
+def measure_churn(previous, current):
+    """
+    Listing changes between two snapshots of a zip.
+
+    Returns
+    -------
+    dict
+        new, removed and price_changes counts
+    """
+
+    return {
+        "new": len(current.keys() - previous.keys()),
+        "removed": len(previous.keys() - current.keys()),
+        "price_changes": sum(
+            1
+            for key, price in current.items()
+            if key in previous and previous[key] != price
+        ),
+    }
+
+
+def _near_price_share(df_houses):
+    # share of listings close enough to their Affordable_Price to flip
+    if not len(df_houses):
+        return 0.0
+    margin = REFRESH_PRICE_MARGIN * df_houses["Affordable_Price"]
+    near = (df_houses["Price"] - df_houses["Affordable_Price"]).abs() <= margin
+    return float(near.mean())
+
+
+###########
+# SCHEDULER
+###########
+
+
+class RefreshScheduler:
+    """
+    Per zip refresh state and the daily refresh plan.
+
+    Parameters
+    ----------
+    state_path : str, optional
+        json file the state is loaded from and saved to, None to keep it in
+        memory only
+    pages_per_day : int, optional
+        scraping budget of one plan, in result pages
+    clock : callable, optional
+        returns the current (timezone aware) datetime
+    zipcodes : list, optional
+        configured zips (see configured_zips): the ones never refreshed are
+        added to the state, so that they get planned too
+    """
+
+    def __init__(
+        self,
+        state_path=PATH_TO_REFRESH_STATE,
+        pages_per_day=REFRESH_PAGES_PER_DAY,
+        clock=system_clock,
+        zipcodes=None,
+    ):
+        self.state_path = state_path
+        self.pages_per_day = pages_per_day
+        self.clock = clock
+        self.zips = {}
+
+        if state_path and os.path.exists(state_path):
+            with open(state_path) as f:
+                self.zips = json.load(f)["zips"]
+
+        for zipcode in zipcodes or []:
+            self.zips.setdefault(str(zipcode), {"churn_rate": None})
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"zips": self.zips}, f)
+        os.replace(tmp_path, self.state_path)
+
+    ###########
+    # RECORDING
+    ###########
+
+    def record_refresh(self, zipcode, df_houses, pir=None, df_listings=None):
+        """
+        Records a refresh of one zip: updates its churn rate and its
+        threshold proximity.
+
+        Parameters
+        ----------
+        zipcode : int or str
+        df_houses : pd.DataFrame
+            the zip's house level results (Address, Price, Affordable_Price),
+            empty if no listings were found
+        pir : float, optional
+            the zip's price to income ratio
+        df_listings : pd.DataFrame, optional
+            the zip's de-duplicated listings (Address, Price), which the
+            churn is measured on. The house level results lack the listings
+            that couldn't be geocoded (default: df_houses)
+
+        Returns
+        -------
+        dict or None
+            churn since the previous refresh, None on the first one
+        """
+
+        now = self.clock()
+        zip_state = self.zips.setdefault(str(zipcode), {"churn_rate": None})
+        snapshot = listing_snapshot(df_houses if df_listings is None else df_listings)
+
+        churn = None
+        if zip_state.get("last_refresh"):
+            churn = measure_churn(zip_state["snapshot"], snapshot)
+            days = self.age_days(zipcode, now)
+            changes = churn["new"] + churn["removed"] + churn["price_changes"]
+            rate = changes / max(len(zip_state["snapshot"]), 1) / max(days, 1)
+
+            # smoothed, so one quiet or busy week doesn't swing the schedule
+            old_rate = zip_state["churn_rate"]
+            zip_state["churn_rate"] = (
+                rate
+                if old_rate is None
+                else REFRESH_CHURN_SMOOTHING * rate
+                + (1 - REFRESH_CHURN_SMOOTHING) * old_rate
+            )
+            for key, n in churn.items():
+                count(f"refresh_{key}", n)
+
+        zip_state.update(
+            {
+                "last_refresh": now.isoformat(),
+                "listings": len(snapshot),
+                "pir": None if pir is None or pir != pir else float(pir),
+                "near_price_share": _near_price_share(df_houses),
+                "snapshot": snapshot,
+            }
+        )
+        return churn
+
+    def record_run(
+        self,
+        df_house_level_analysis,
+        df_zip_level_analysis,
+        zipcodes=None,
+        df_listings=None,
+    ):
+        """
+        Records every zip refreshed by a run.
+
+        Parameters
+        ----------
+        df_house_level_analysis, df_zip_level_analysis : pd.DataFrame
+            outputs of main.analyze
+        zipcodes : list, optional
+            zips that were scraped, including ones where nothing was found
+            (default: the zips in df_zip_level_analysis)
+        df_listings : pd.DataFrame, optional
+            the run's de-duplicated listings (the "listings" stage), for the
+            churn snapshots (default: the house level results)
+        """
+
+        houses_by_zip = {
+            str(zipcode): df
+            for zipcode, df in df_house_level_analysis.groupby("Zipcode")
+        }
+        listings_by_zip = (
+            None
+            if df_listings is None
+            else {
+                str(zipcode): df
+                for zipcode, df in df_listings.groupby(
+                    df_listings["Zipcode"].astype(str).str.strip()
+                )
+            }
+        )
+        pir_by_zip = dict(
+            zip(
+                df_zip_level_analysis["Zipcode"].astype(str),
+                df_zip_level_analysis["PIR"],
+            )
+        )
+        if zipcodes is None:
+            zipcodes = list(pir_by_zip)
+
+        empty = df_house_level_analysis.iloc[:0]
+        for zipcode in map(str, zipcodes):
+            self.record_refresh(
+                zipcode,
+                houses_by_zip.get(zipcode, empty),
+                pir_by_zip.get(zipcode),
+                (
+                    None
+                    if listings_by_zip is None
+                    else listings_by_zip.get(zipcode, df_listings.iloc[:0])
+                ),
+            )
+
+    ##########
+    # PLANNING
+    ##########
+
+    def age_days(self, zipcode, now=None):
+        # a zip never refreshed is as stale as the most stale zip should be
+        last_refresh = self.zips[str(zipcode)].get("last_refresh")
+        if not last_refresh:
+            return REFRESH_MAX_INTERVAL_DAYS
+        now = now or self.clock()
+        return (now - datetime.fromisoformat(last_refresh)).total_seconds() / 86_400
+
+    def pages(self, zipcode):
+        """
+        Result pages a refresh of the zip is expected to take. For a zip never
+        refreshed, the median over the refreshed zips.
+        """
+
+        zip_state = self.zips[str(zipcode)]
+        if zip_state.get("last_refresh"):
+            listings = zip_state.get("listings") or 0
+        else:
+            known = sorted(
+                state.get("listings") or 0
+                for state in self.zips.values()
+                if state.get("last_refresh")
+            )
+            listings = known[len(known) // 2] if known else 0
+        return max(1, math.ceil(listings / REDFIN_LISTINGS_PER_PAGE))
+
+    def priority(self, zipcode, now=None):
+        """
+        Expected share of the zip's listings that changed since its last
+        refresh, weighted up (up to 2x) when the zip is near the PIR cutoff or
+        its listings are near their Affordable_Price.
+        """
+
+        zip_state = self.zips[str(zipcode)]
+        churn_rate = zip_state["churn_rate"]
+        churn_rate = REFRESH_BASE_CHURN if churn_rate is None else churn_rate
+
+        near_pir = 0.0
+        if zip_state.get("pir") is not None:
+            distance = abs(zip_state["pir"] - REFRESH_PIR_THRESHOLD)
+            near_pir = max(0.0, 1 - distance / REFRESH_PIR_MARGIN)
+        boundary = max(near_pir, zip_state.get("near_price_share", 0.0))
+
+        expected_changes = self.age_days(zipcode, now) * (
+            churn_rate + REFRESH_BASE_CHURN
+        )
+        return expected_changes * (1 + boundary)
+
+    def plan(self, pages_per_day=None):
+        """
+        Zips to refresh now, within the page budget. Zips not refreshed for
+        REFRESH_MAX_INTERVAL_DAYS (including the ones never refreshed) come
+        first, then the rest by priority. Zips refreshed less than REFRESH_MIN_INTERVAL_DAYS ago are
+        skipped.
+
+        Returns
+        -------
+        list of dicts
+            zipcode, pages, priority and reason ("overdue" or "priority")
+        """
+
+        now = self.clock()
+        budget = self.pages_per_day if pages_per_day is None else pages_per_day
+
+        candidates = []
+        for zipcode in self.zips:
+            age = self.age_days(zipcode, now)
+            if age < REFRESH_MIN_INTERVAL_DAYS:
+                continue
+            overdue = age >= REFRESH_MAX_INTERVAL_DAYS
+            candidates.append((overdue, self.priority(zipcode, now), zipcode))
+        candidates.sort(key=lambda c: (not c[0], -c[1]))
+
+        # greedy: a big zip that doesn't fit leaves room for smaller ones
+        planned = []
+        for overdue, priority, zipcode in candidates:
+            pages = self.pages(zipcode)
+            if pages > budget:
+                continue
+            budget -= pages
+            planned.append(
+                {
+                    "zipcode": zipcode,
+                    "pages": pages,
+                    "priority": round(priority, 4),
+                    "reason": "overdue" if overdue else "priority",
+                }
+            )
+
+        return planned
+
+
+def write_manifest(planned, path=PATH_TO_REFRESH_MANIFEST):
+    """
+    Writes a plan as a batch_runner.py manifest, one metro per zip.
+    """
+
+    manifest = {
+        "metros": [
+            {
+                "name": f"zip-{item['zipcode']}",
+                "housing_url": REDFIN_ZIP_URL.format(zipcode=item["zipcode"]),
+                "max_listings": item["pages"] * REDFIN_LISTINGS_PER_PAGE,
+                "zips": [int(item["zipcode"])],
+            }
+            for item in planned
+        ]
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def configured_zips(manifest_path=PATH_TO_METRO_MANIFEST):
+    """
+    Zips the pipeline covers: NY_COUNTY_ZIPS and the zips of every metro in
+    batch_runner.py's manifest.
+    """
+
+    zipcodes = set(map(str, NY_COUNTY_ZIPS))
+    if manifest_path and os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            for metro in json.load(f)["metros"]:
+                zipcodes.update(map(str, metro.get("zips") or []))
+    return sorted(zipcodes)
+
+
+def _load_listings(directory):
+    # de-duplicated listings of a run, None for runs saved without them
+    path = stage_path("listings", directory)
+    return read_stage_frame(path) if os.path.exists(path) else None
+
+
+def record_outputs(scheduler, directory):
+    """
+    Records the zips refreshed by a run, from main.py's stage outputs or from
+    the partitions of the completed metros of a batch_runner.py run.
+    """
+
+    if os.path.exists(stage_path("house_metrics", directory)):
+        scheduler.record_run(
+            read_stage_frame(stage_path("house_metrics", directory)),
+            read_stage_frame(stage_path("zip_metrics", directory)),
+            df_listings=_load_listings(directory),
+        )
+        return
+
+    with open(os.path.join(directory, "batch_report.json")) as f:
+        metros = [
+            s["metro"]
+            for s in json.load(f)["metros"]
+            if s["status"] == "ok" and not s.get("skipped")
+        ]
+    for name in metros:
+        partition_dir = os.path.join(directory, f"metro={name}")
+        df_zip_level_analysis = read_stage_frame(
+            stage_path("zip_metrics", partition_dir)
+        )
+        zipcodes = list(df_zip_level_analysis["Zipcode"])
+        # a zip metro with no listings left still counts as refreshed
+        if name.startswith("zip-"):
+            zipcodes.append(name[len("zip-") :])
+        scheduler.record_run(
+            read_stage_frame(stage_path("house_metrics", partition_dir)),
+            df_zip_level_analysis,
+            sorted(set(map(str, zipcodes))),
+            _load_listings(partition_dir),
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--plan", action="store_true", help="write today's plan")
+    parser.add_argument(
+        "--record",
+        default=None,
+        help="stage output or batch partition folder of a finished run",
+    )
+    parser.add_argument("--budget", type=int, default=REFRESH_PAGES_PER_DAY)
+    parser.add_argument("--manifest", default=PATH_TO_REFRESH_MANIFEST)
+    args = parser.parse_args()
+
+    scheduler = RefreshScheduler(pages_per_day=args.budget, zipcodes=configured_zips())
+    if args.record:
+        record_outputs(scheduler, args.record)
+        scheduler.save()
+        print(f"Recorded refresh, {len(scheduler.zips)} zips tracked")
+    if args.plan:
+        planned = scheduler.plan()
+        write_manifest(planned, args.manifest)
+        for item in planned:
+            print(
+                f"{item['zipcode']}  {item['pages']:>3} pages  "
+                f"priority {item['priority']}  ({item['reason']})"
+            )
+        print(f"{len(planned)} zips, {sum(i['pages'] for i in planned)} pages planned")
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+File:        resource_blocking.py
+Description: Request blocking for the scraping browser. extract_data only
+                reads the text of the home cards, so images, media, fonts, map
+                tiles and third party trackers are dropped with the Chrome
+                DevTools Protocol (Network.setBlockedURLs), using the patterns
+                in config. Also measures what each page actually loaded.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       enable_resource_blocking(driver)
+"""
+
+from instrumentation import count, add_time
+from config import BLOCKED_URL_PATTERNS
+
+# bytes and requests of the resources loaded since the last call, plus the
+# document itself the first time it's seen (in-page pagination keeps the same
+# document). Cross origin responses without a Timing-Allow-Origin header
+# report 0 bytes, so bytes are a lower bound.
+PAGE_STATS_JS = """
+const resources = performance.getEntriesByType("resource");
+const nav = performance.getEntriesByType("navigation")[0];
+const newDocument = !window.__pageStatsSeen;
+window.__pageStatsSeen = true;
+const stats = {
+    requests: resources.length,
+    bytes: resources.reduce((total, r) => total + (r.transferSize || 0), 0),
+    document_bytes: newDocument && nav ? nav.transferSize || 0 : 0,
+    load_s: newDocument && nav && nav.loadEventEnd > 0 ? nav.loadEventEnd / 1000 : null,
+    url: location.href,
+};
+performance.clearResourceTimings();
+return stats;
+"""
+
+
+def enable_resource_blocking(driver, patterns=BLOCKED_URL_PATTERNS):
+    """
+    Blocks every request whose url matches one of the patterns ("*" is a
+    wildcard) for the lifetime of the browser.
+    """
+
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+
+
+def disable_resource_blocking(driver):
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": []})
+
+
+def page_stats(driver):
+    """
+    Requests, bytes and load time of the current page, counting resources
+    loaded since the previous call. Totals are also added to the run's
+    instrumentation counters.
+
+    Returns
+    -------
+    dict
+        requests, bytes, document_bytes, load_s, url
+    """
+
+    try:
+        stats = driver.execute_script(PAGE_STATS_JS)
+    except Exception as e:
+        print(f"Could not read page stats: {e}")
+        return None
+
+    count("page_requests", stats["requests"])
+    count("page_bytes", stats["bytes"] + stats["document_bytes"])
+    if stats["load_s"] is not None:
+        count("page_loads")
+        add_time("page_load", stats["load_s"])
+    return stats
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+File:        schema.py
+Description: Compact in-memory dtypes for the house and zip level frames
+                loaded by the dashboard (categoricals for repeated labels,
+                int32 prices, float32 measures and coordinates, Arrow backed
+                strings), plus helpers that format display strings only for
+                the rows that are actually rendered.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       --
+"""
+
+import numpy as np
+import pandas as pd
+
+ARROW_STRING = "string[pyarrow]"
+
+# target dtype of every known column, columns not listed are left as is.
+# ordered categoricals are used where .max() is needed (e.g. the data version)
+HOUSE_SCHEMA = {
+    "Price": "int32",
+    "Address": ARROW_STRING,
+    "Zipcode": "category",
+    "Description": ARROW_STRING,
+    "Bedrooms": "float32",
+    "Bathrooms": "float32",
+    "SqFt": "float32",
+    "Listing_Agency": "category",
+    "Agency_Contact": "category",
+    "Price_Per_SqFt": "float32",
+    "Household_Median_Income": "float32",
+    "Affordable_Price": "int32",
+    "Affordability_Gap": "int32",
+    "Pct_Households_Can_Afford": "float32",
+    "Condition_Score": "float32",
+    "Lat": "float32",
+    "Lng": "float32",
+    "Comps_Count": "float32",
+    "Comps_Median_Price": "int32",
+    "Local_PPSF_Percentile": "float32",
+    "Nearest_Affordable_Address": ARROW_STRING,
+    "Nearest_Affordable_Price": "int32",
+    "Nearest_Affordable_Km": "float32",
+    "Expected_Price": "int32",
+    "Price_vs_Model": "float32",
+    "Model_Pricing": "category",
+    "Created": "ordered_category",
+    "Affordable_Color": "category",
+}
+
+ZIP_SCHEMA = {
+    "Zipcode": "category",
+    "Min_Price": "int32",
+    "Max_Price": "int32",
+    "Median_Price": "int32",
+    "Household_Median_Income": "float32",
+    "PIR": "float32",
+    "Pct_Households_Can_Afford_Median": "float32",
+    "Household_Median_Income_MOE": "float32",
+    "PIR_Low": "float32",
+    "PIR_High": "float32",
+    "Unaffordable_Prob": "float32",
+    "PIR_Rank_Low": "float32",
+    "PIR_Rank_High": "float32",
+    "Rank_Stability": "float32",
+    "Median_Price_Smoothed": "int32",
+    "Household_Median_Income_Smoothed": "float32",
+    "PIR_Smoothed": "float32",
+}
+
+
+def memory_usage_mb(df):
+    """
+    Deep memory usage of a frame in MB (includes python string objects).
+    """
+    return df.memory_usage(deep=True).sum() / 1024**2
+
+
+def _to_int32(series):
+    """
+    Rounds to int32, falling back to the nullable Int32 dtype when there are
+    missing values.
+    """
+
+    values = pd.to_numeric(series, errors="coerce").round()
+    if values.isna().any():
+        return values.astype("Int32")
+    return values.astype("int32")
+
+
+def apply_schema(df, schema):
+    """
+    Coerces the columns of df listed in schema to their compact dtype.
+    """
+
+    df = df.copy(deep=False)
+    for col, dtype in schema.items():
+        if col not in df:
+            continue
+        if dtype == "int32":
+            df[col] = _to_int32(df[col])
+        elif dtype == "float32":
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float32")
+        elif dtype == "ordered_category":
+            categories = np.sort(df[col].dropna().unique())
+            df[col] = pd.Categorical(df[col], categories=categories, ordered=True)
+        else:
+            df[col] = df[col].astype(dtype)
+
+    return df
+
+
+def report_memory(name, mb_before, mb_after):
+    """
+    Prints memory usage of a frame before and after compaction.
+    """
+    print(
+        f"{name}: {mb_before:,.2f} MB -> {mb_after:,.2f} MB "
+        f"({mb_before / max(mb_after, 1e-9):.1f}x smaller)"
+    )
+
+
+def compact_house_frame(df, verbose=True):
+    """
+    Returns the house level frame with compact dtypes.
+    """
+
+    df_compact = apply_schema(df, HOUSE_SCHEMA)
+    if verbose:
+        report_memory(
+            "House listings", memory_usage_mb(df), memory_usage_mb(df_compact)
+        )
+
+    return df_compact
+
+
+def compact_zip_frame(df, verbose=True):
+    """
+    Returns the zip level frame with compact dtypes.
+    """
+
+    df_compact = apply_schema(df, ZIP_SCHEMA)
+    if verbose:
+        report_memory("Zip metrics", memory_usage_mb(df), memory_usage_mb(df_compact))
+
+    return df_compact
+
+
+############
+# FORMATTING
+############
+
+
+def format_currency(values):
+    """
+    Formats a (small) sequence of numbers as whole dollar strings, e.g.
+    250000 -> '$250,000', missing values as 'N/A' (e.g. zips without census
+    income). Meant to be called on the rows being rendered only.
+    """
+
+    values = np.asarray(values, dtype=float)
+    return [f"${int(x):,}" if np.isfinite(x) else "N/A" for x in values]
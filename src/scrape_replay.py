@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""
+File:        scrape_replay.py
+Description: Record / replay harness for scraper runs. In record mode the
+                DOM snapshot of every scraped results page is saved along with
+                its pagination state and the listings extracted from it. In
+                replay mode those snapshots are served from a local HTTP
+                server, so scrape_listings and extract_data can run unchanged
+                against them without touching the live site.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       python main.py --record ../data/recordings/buffalo
+             python -m benchmarks.scraper_replay ../data/recordings/buffalo
+"""
+
+import os
+import re
+import json
+import threading
+import mimetypes
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from selenium.webdriver.common.by import By
+
+MANIFEST_NAME = "manifest.json"
+LISTINGS_NAME = "listings.json"
+ASSETS_DIR = "assets"
+
+# site scripts are dropped on replay so they can't navigate away or refetch
+SCRIPT_TAG = re.compile(r"<script\b[^>]*>.*?</script\s*>", re.IGNORECASE | re.DOTALL)
+
+# replaces the site's pagination: clicking next loads the following snapshot,
+# and on the last recorded page the next button is removed
+PAGINATION_JS = """
+<script>
+document.addEventListener("click", function (e) {{
+    if (e.target.closest(".PageArrow__direction--next")) {{
+        e.preventDefault();
+        window.location.href = "/page/{next_page}";
+    }}
+}}, true);
+if (!{has_next}) {{
+    document.addEventListener("DOMContentLoaded", function () {{
+        document.querySelectorAll(".PageArrow__direction--next")
+            .forEach(function (el) {{ el.remove(); }});
+    }});
+}}
+</script>
+"""
+
+#########
+# RECORD
+#########
+
+
+class PageRecorder:
+    """
+    Saves page snapshots during a live scrape (see scrape_listings).
+
+    Parameters
+    ----------
+    directory : str
+        recording folder, created if needed. An existing recording is
+        overwritten.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.pages = []
+        self.listings = []
+        os.makedirs(directory, exist_ok=True)
+
+    def save_page(self, driver, page_num, parsed_data, n_found):
+        """
+        Saves the current DOM of the driver and its pagination state.
+
+        Parameters
+        ----------
+        driver : ChromeDriver
+        page_num : int
+        parsed_data : list of dicts
+            listings extracted from this page, kept for regression checks
+        n_found : int
+            number of HomeCardContainer elements found on the page
+        """
+
+        file_name = f"page_{page_num:03d}.html"
+        with open(os.path.join(self.directory, file_name), "w", encoding="utf-8") as f:
+            f.write(driver.page_source)
+
+        has_next = bool(
+            driver.find_elements(By.CLASS_NAME, "PageArrow__direction--next")
+        )
+        self.pages.append(
+            {
+                "page": page_num,
+                "file": file_name,
+                "url": driver.current_url,
+                "title": driver.title,
+                "listings_found": n_found,
+                "listings_parsed": len(parsed_data),
+                "has_next": has_next,
+            }
+        )
+        self.listings.extend(parsed_data)
+
+        # written after every page, so a crashed run still leaves a usable
+        # recording of the pages scraped so far
+        self.write_manifest()
+
+    def write_manifest(self):
+        manifest = {
+            "recorded": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "pages": self.pages,
+        }
+        with open(os.path.join(self.directory, MANIFEST_NAME), "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        # nan descriptions are stored as null
+        listings = [
+            {k: (None if v != v else v) for k, v in listing.items()}
+            for listing in self.listings
+        ]
+        with open(os.path.join(self.directory, LISTINGS_NAME), "w") as f:
+            json.dump(listings, f, indent=2)
+
+
+#########
+# REPLAY
+#########
+
+
+def load_manifest(directory):
+    with open(os.path.join(directory, MANIFEST_NAME)) as f:
+        return json.load(f)
+
+
+def load_recorded_listings(directory):
+    """
+    Listings extracted during the recorded run, in scrape order.
+    """
+    with open(os.path.join(directory, LISTINGS_NAME)) as f:
+        return json.load(f)
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+
+        # static files saved next to the pages, e.g. images
+        if path.startswith("/assets/"):
+            asset = self.server.asset(path[len("/assets/") :])
+            if asset is None:
+                self.send_error(404)
+            else:
+                self._send(asset, mimetypes.guess_type(path)[0] or "")
+            return
+
+        # "/" is the first page, "/page/<n>" the following ones
+        match = re.fullmatch(r"/(?:page/(\d+))?/?", path)
+        page_num = int(match.group(1)) if match and match.group(1) else 1
+        if match is None or page_num not in self.server.pages:
+            self.send_error(404)
+            return
+
+        self._send(self.server.render(page_num).encode("utf-8"), "text/html")
+
+
+class ReplayServer:
+    """
+    Serves a recording on localhost, in page order, from a background thread.
+
+    Example
+    -------
+    with ReplayServer(directory) as server:
+        listing_data = scrape_listings(driver, server.url, MAX_LISTINGS)
+    """
+
+    def __init__(self, directory, port=0):
+        self.directory = directory
+        self.manifest = load_manifest(directory)
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), _ReplayHandler)
+        self.httpd.pages = {page["page"]: page for page in self.manifest["pages"]}
+        self.httpd.render = self.render
+        self.httpd.asset = self.asset
+        self._cache = {}
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def render(self, page_num):
+        """
+        Recorded DOM of a page, without site scripts and with the replay
+        pagination injected.
+        """
+
+        if page_num not in self._cache:
+            page = self.httpd.pages[page_num]
+            with open(
+                os.path.join(self.directory, page["file"]), encoding="utf-8"
+            ) as f:
+                html = SCRIPT_TAG.sub("", f.read())
+
+            has_next = page["has_next"] and page_num + 1 in self.httpd.pages
+            script = PAGINATION_JS.format(
+                next_page=page_num + 1, has_next=str(has_next).lower()
+            )
+            head_end = html.lower().find("</head>")
+            if head_end == -1:
+                html = script + html
+            else:
+                html = html[:head_end] + script + html[head_end:]
+            self._cache[page_num] = html
+
+        return self._cache[page_num]
+
+    def asset(self, name):
+        """
+        Contents of a file in the recording's assets folder, None if missing.
+        """
+
+        assets_dir = os.path.abspath(os.path.join(self.directory, ASSETS_DIR))
+        path = os.path.abspath(os.path.join(assets_dir, name))
+        if not path.startswith(assets_dir + os.sep) or not os.path.isfile(path):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def compare_to_recording(listing_data, directory):
+    """
+    Compares listings extracted on replay against the ones extracted during
+    the recorded run.
+
+    Returns
+    -------
+    dict
+        recorded, replayed and mismatched listing counts
+    """
+
+    recorded = load_recorded_listings(directory)
+    replayed = [
+        {k: (None if v != v else v) for k, v in listing.items()}
+        for listing in listing_data
+    ]
+    mismatched = sum(a != b for a, b in zip(recorded, replayed))
+    mismatched += abs(len(recorded) - len(replayed))
+
+    return {
+        "recorded": len(recorded),
+        "replayed": len(replayed),
+        "mismatched": mismatched,
+    }
@@ -4,7 +4,7 @@ File:        scraper.py
 Description: Scrapes redfin for property listings in Buffalo, NY
 Author:      Yuseof
 Created:     2025-07-24
-Modified:    2025-08-22
+Modified:    2026-10-19
 """
 
 import time
@@ -12,6 +12,10 @@ import random
 import numpy as np
 import pandas as pd
 from util import parse_address
+from pacing import Pacer
+from instrumentation import count, timer
+from resource_blocking import enable_resource_blocking, page_stats
+from config import BLOCKED_URL_PATTERNS
 from selenium.webdriver.common.by import By
 from selenium import webdriver
 import undetected_chromedriver as uc
@@ -24,15 +28,18 @@ from selenium.webdriver.support import expected_conditions as EC
 ###############
 
 
-def human_scroll(driver, step=200, delay=0.5, up_chance=0.15, timeout=30):
+def human_scroll(driver, pacer=None, up_chance=0.15):
     """
     Scrolls down smoothly with jitter, occasionally scrolling up.
 
-    step: average px per scroll
-    delay: average delay between steps
+    pacer: Pacer giving the scroll step (px), delay between steps and the
+        max time (seconds) to keep scrolling, stealth profile by default
     up_chance: probability to scroll up instead of down
-    timeout: max time (seconds) to keep scrolling
     """
+    pacer = pacer or Pacer()
+    step = pacer.settings["scroll_px"]
+    timeout = pacer.settings["scroll_timeout"]
+
     total_height = driver.execute_script("return document.body.scrollHeight") or 3000
     current = 0
     start_time = time.time()
@@ -55,10 +62,12 @@ def human_scroll(driver, step=200, delay=0.5, up_chance=0.15, timeout=30):
             current += jitter_step
 
         # Randomized delay for more natural behavior
-        time.sleep(random.uniform(delay * 0.5, delay * 1.5))
+        pacer.pause("scroll_step")
 
 
-def instantiate_driver(headless=True):
+def instantiate_driver(
+    headless=True, user_data_dir=None, blocked_urls=BLOCKED_URL_PATTERNS
+):
     """
     Handles creation of webdriver
 
@@ -66,6 +75,12 @@ def instantiate_driver(headless=True):
     ----------
     headless : TYPE, optional
         whether or not to run chrome driver in headless mode
+    user_data_dir : str, optional
+        persistent chrome profile folder (HTTP cache, cookies), kept between
+        runs. A throwaway profile is used if not given.
+    blocked_urls : list of str, optional
+        url patterns the browser never requests (images, fonts, trackers),
+        empty to load everything
 
     Returns
     -------
@@ -105,7 +120,7 @@ def instantiate_driver(headless=True):
     ############
     # TODO: Does this work no matter what?
     ############
-    driver = uc.Chrome(options=options)
+    driver = uc.Chrome(options=options, user_data_dir=user_data_dir)
 
     # apply stealth to driver
     stealth(
@@ -118,10 +133,24 @@ def instantiate_driver(headless=True):
         fix_hairline=True,
     )
 
+    # skip resources that extract_data doesn't need
+    if blocked_urls:
+        enable_resource_blocking(driver, blocked_urls)
+
     return driver
 
 
-def scrape_listings(driver, housing_listings_url, max_listings, timeout=20):
+def scrape_listings(
+    driver,
+    housing_listings_url,
+    max_listings,
+    timeout=20,
+    recorder=None,
+    pacer=None,
+    driver_manager=None,
+    quit_driver=True,
+    checkpoint=None,
+):
     """
     Scrape property listings in a human-like way to avoid bot detection
 
@@ -130,13 +159,45 @@ def scrape_listings(driver, housing_listings_url, max_listings, timeout=20):
     driver : ChromeDriver
     housing_listings_url : str
     max_listings : int
+    recorder : scrape_replay.PageRecorder, optional
+        if given, every page's DOM snapshot and pagination state is saved
+    pacer : pacing.Pacer, optional
+        pacing profile and wait budget, stealth profile by default
+    driver_manager : driver_manager.DriverManager, optional
+        long lived session the driver belongs to, it is told about every
+        scraped page and may swap in a fresh browser between pages
+    quit_driver : bool
+        close the browser when done (False to keep a session warm)
+    checkpoint : checkpoint.Checkpoint, optional
+        every finished page (listings and next page url) is saved to it, and
+        a scrape with saved pages resumes after the last one
 
     Returns
     -------
     listing_data : dict
     """
 
+    # initiate loop tools
+    master_listing_data = []
+    page_num = 0
+    block_retries = 0
+
+    # pick up after the last checkpointed page
+    if checkpoint is not None:
+        master_listing_data, page_num, next_url = checkpoint.load_pages()
+        if page_num > 0:
+            print(
+                f"Resuming after page {page_num} "
+                f"({len(master_listing_data)} listings already scraped)"
+            )
+            if next_url is None or len(master_listing_data) >= max_listings:
+                if quit_driver:
+                    driver.quit()
+                return master_listing_data
+            housing_listings_url = next_url
+
     # open property listings url
+    pacer = pacer or Pacer()
     driver.get(housing_listings_url)
 
     # check whether the web page was properly loaded
@@ -144,11 +205,7 @@ def scrape_listings(driver, housing_listings_url, max_listings, timeout=20):
     print("Current URL:", driver.current_url)
 
     # human wait before interacting with page
-    time.sleep(random.uniform(1.5, 3.0))
-
-    # initiate loop tools
-    master_listing_data = []
-    page_num = 0
+    pacer.pause("page_load")
 
     # pull and parse up to <MAX_LISTINGS> number of homes
     while len(master_listing_data) < max_listings:
@@ -160,18 +217,39 @@ def scrape_listings(driver, housing_listings_url, max_listings, timeout=20):
 
         try:
             # find listings on webpage
-            WebDriverWait(driver, timeout).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "HomeCardContainer"))
-            )
+            with timer("page_wait"):
+                WebDriverWait(driver, timeout).until(
+                    EC.presence_of_element_located((By.CLASS_NAME, "HomeCardContainer"))
+                )
             scraped_listings = driver.find_elements(By.CLASS_NAME, "HomeCardContainer")
 
         except Exception as e:
+            # a page without listings may be a bot wall, back off and retry it
+            if (
+                pacer.check_page(driver, 0)
+                and block_retries < pacer.settings["block_retries"]
+            ):
+                block_retries += 1
+                page_num -= 1
+                driver.refresh()
+                continue
+
             print("Error when locating HomeCardContainer")
             print(f"Error message: {e}")
             break
 
+        block_retries = 0
+        pacer.check_page(driver, len(scraped_listings))
+
         # scrape data from listings
-        parsed_data = extract_data(scraped_listings)
+        with timer("extract"):
+            parsed_data = extract_data(scraped_listings, pacer=pacer)
+        count("pages_scraped")
+        page_stats(driver)
+        if driver_manager is not None:
+            driver_manager.page_done()
+        if recorder is not None:
+            recorder.save_page(driver, page_num, parsed_data, len(scraped_listings))
         print(
             f"Scraped {len(parsed_data)} / {len(scraped_listings)} listings from page {page_num}"
         )
@@ -181,7 +259,8 @@ def scrape_listings(driver, housing_listings_url, max_listings, timeout=20):
 
         # gentle scroll to simulate reading
         print("Performing human-like scroll")
-        human_scroll(driver)
+        with timer("human_scroll"):
+            human_scroll(driver, pacer)
 
         # simulate human-like next button click
         try:
@@ -192,29 +271,48 @@ def scrape_listings(driver, housing_listings_url, max_listings, timeout=20):
                 next_btn,
             )
             # wait after scrolling
-            time.sleep(random.uniform(0.5, 1.5))
+            pacer.pause("before_click")
 
             # click button with human-like behavior
             actions.move_to_element(next_btn).pause(
-                random.uniform(0.1, 0.5)
+                pacer.pause_seconds("click_hold")
             ).click().perform()
 
         except Exception as e:
             print(f"No more pages, or error locating next button: {e}")
+            if checkpoint is not None:
+                checkpoint.save_page(page_num, parsed_data, next_url=None)
             break
 
+        # url of the next page, read once while the browser still responds:
+        # a browser found dead below can't be asked for it anymore
+        try:
+            next_url = driver.current_url
+        except Exception as e:
+            print(f"Error reading the next page url, falling back to the start: {e}")
+            next_url = housing_listings_url
+
         # random wait before next scrape
-        time.sleep(random.uniform(1.5, 3.5))
+        pacer.pause("between_pages")
+        if checkpoint is not None:
+            checkpoint.save_page(page_num, parsed_data, next_url=next_url)
+
+        # a long lived browser is recycled between pages when it's unhealthy,
+        # has served too many pages or grew too much, resuming on the next page
+        if driver_manager is not None and driver_manager.needs_recycle():
+            driver = driver_manager.recycle(resume_url=next_url)
 
     print(f"Scraped and extracted {len(master_listing_data)} total listings")
+    pacer.print_report()
 
     # close browser
-    driver.quit()
+    if quit_driver:
+        driver.quit()
 
     return master_listing_data
 
 
-def extract_data(scraped_listings, verbose=False):
+def extract_data(scraped_listings, verbose=False, pacer=None):
     """
     Given all home listings in a HomeCardContainer, parses each listing one
     by one to get all necessary fields
@@ -222,6 +320,8 @@ def extract_data(scraped_listings, verbose=False):
     Parameters
     ----------
     scraped_listings : list of WebElements
+    pacer : pacing.Pacer, optional
+        gives the delay between cards, stealth profile by default
 
     Returns
     -------
@@ -229,6 +329,7 @@ def extract_data(scraped_listings, verbose=False):
     """
 
     # extract desired fields from each listing
+    pacer = pacer or Pacer()
     parsed_listing_data = []
     for listing in scraped_listings:
 
@@ -267,13 +368,14 @@ def extract_data(scraped_listings, verbose=False):
             )
 
         except Exception as e:
+            count("listings_dropped")
             if verbose:
                 print("Skipping this listing due to the following error: ", e)
             else:
                 continue
 
         # small random delay to mimic human behavior
-        time.sleep(random.uniform(0.05, 0.15))
+        pacer.pause("per_card")
 
     return parsed_listing_data
 
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+File:        shared_dataset.py
+Description: The dashboard's house and zip level frames, loaded once per
+                server process and shared by every session. With
+                st.cache_data each cache hit unpickles a private copy of the
+                frames, so memory grew with the number of viewers; the
+                dataset is held with st.cache_resource instead and every
+                session reads the same frames (sessions only keep their
+                filter selections).
+                The compacted frames are written to Arrow IPC files and
+                memory mapped back: fixed width columns (prices, measures,
+                coordinates, categorical codes) and Arrow strings are then
+                zero-copy, read-only views of the OS page cache, shared even
+                between server processes, and an accidental in-place write
+                from one session raises instead of changing the data of the
+                others.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       dataset = SharedDataset.from_records(house_rows, zip_rows)
+             dataset = dataset.persist(PATH_TO_DASHBOARD_DATASET)
+"""
+
+import os
+import pandas as pd
+import pyarrow as pa
+from columnar import write_stage, read_stage
+from dashboard_data import houses_from_records, zips_from_records
+from schema import ARROW_STRING
+
+DATASET_FILES = {"house": "houses.arrow", "zip": "zips.arrow"}
+
+# arrow strings stay arrow backed (string[pyarrow]) instead of python objects
+STRING_TYPES = dict.fromkeys(
+    [pa.string(), pa.large_string()], pd.StringDtype("pyarrow")
+)
+
+
+def read_shared_frame(path):
+    """
+    Memory mapped Arrow file as a pandas frame without copying: one block per
+    column (no consolidation) and Arrow backed strings. Columns with nulls,
+    and bools, are still copied by Arrow.
+    """
+
+    return read_stage(path).to_pandas(split_blocks=True, types_mapper=STRING_TYPES.get)
+
+
+def shared_columns(df):
+    """
+    Columns of a frame whose values are read-only views (e.g. of a memory
+    map): numpy columns and categorical codes that aren't writeable, and
+    Arrow backed strings.
+    """
+
+    columns = []
+    for col in df.columns:
+        series = df[col]
+        if series.dtype == ARROW_STRING:
+            columns.append(col)
+            continue
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.cat.codes
+        if not series.to_numpy().flags.writeable:
+            columns.append(col)
+    return columns
+
+
+class SharedDataset:
+    """
+    House and zip level frames of the dashboard, treated as read-only.
+
+    Parameters
+    ----------
+    df_house, df_zip : pd.DataFrame
+        compacted frames (see dashboard_data.py)
+    mapped : bool, optional
+        True when the frames are memory mapped from disk
+    """
+
+    def __init__(self, df_house, df_zip, mapped=False):
+        self.df_house = df_house
+        self.df_zip = df_zip
+        self.mapped = mapped
+
+    @property
+    def data_version(self):
+        # latest airtable record timestamp identifies the pipeline run
+        return self.df_house["Created"].max()
+
+    @classmethod
+    def from_records(cls, house_rows, zip_rows, verbose=True):
+        """
+        From the Airtable records of the house and zip tables.
+        """
+
+        return cls(
+            houses_from_records(house_rows, verbose),
+            zips_from_records(zip_rows, verbose),
+        )
+
+    def save(self, directory):
+        for name, filename in DATASET_FILES.items():
+            write_stage(getattr(self, f"df_{name}"), os.path.join(directory, filename))
+
+    @classmethod
+    def open(cls, directory):
+        """
+        Memory maps a saved dataset.
+        """
+
+        frames = {
+            f"df_{name}": read_shared_frame(os.path.join(directory, filename))
+            for name, filename in DATASET_FILES.items()
+        }
+        return cls(**frames, mapped=True)
+
+    def persist(self, directory):
+        """
+        Saves the dataset and returns it memory mapped, or the in-memory
+        dataset if the directory can't be written.
+        """
+
+        try:
+            self.save(directory)
+        except OSError as e:
+            print(f"Dataset not memory mapped, can't write {directory}: {e}")
+            return self
+        return self.open(directory)
+
+    def memory_report(self):
+        """
+        Heap memory of each frame in MB (columns that are views of the
+        memory map don't count) and its shared columns.
+        """
+
+        report = {}
+        for name in DATASET_FILES:
+            df = getattr(self, f"df_{name}")
+            shared = shared_columns(df) if self.mapped else []
+            usage = df.memory_usage(deep=True, index=False) / 1024**2
+            report[name] = {
+                "total_mb": round(float(usage.sum()), 2),
+                "heap_mb": round(float(usage.drop(shared).sum()), 2),
+                "shared_columns": len(shared),
+                "columns": df.shape[1],
+            }
+        return report
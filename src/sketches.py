@@ -0,0 +1,367 @@
+# -*- coding: utf-8 -*-
+"""
+File:        sketches.py
+Description: Mergeable per zip summaries of listing prices, so zip level
+                aggregates can be kept up to date one listing at a time and
+                combined across scrape shards or metros, instead of recomputing
+                zipcode_aggregates (whose exact median isn't mergeable) over
+                the whole frame. Every zip keeps an exact count, min and max,
+                and KLL quantile sketches of price and price per sqft.
+                Summaries are saved as json between runs.
+
+                Error bounds: a KLL sketch with parameter k holds up to k
+                values exactly, so zips with at most SKETCH_K listings get
+                exact quantiles. Above that, the rank of a returned quantile
+                is off by about 1.65% of the count at k=200 (99% confidence,
+                shrinking roughly as 1/k); benchmarks/sketches.py measures it
+                against the exact pandas results.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       sketches = ZipSketches()
+             sketches.update_frame(df_house_level_analysis)
+             sketches.merge(ZipSketches.load(path)).to_frame()
+
+             python sketches.py --partitions ../data/metros
+             python sketches.py --add ../data/stages
+"""
+
+import os
+import glob
+import json
+import math
+import random
+import argparse
+import numpy as np
+import pandas as pd
+from columnar import read_stage_frame, stage_path
+from config import (
+    SKETCH_K,
+    ZIP_SKETCHES_FILE,
+    PATH_TO_ZIP_SKETCHES,
+    PATH_TO_METRO_PARTITIONS,
+)
+
+# capacity shrinks by this factor per level below the top one
+CAPACITY_DECAY = 2 / 3
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch (Karnin, Lang, Liberty 2016). Values enter level 0;
+    when the sketch is full, the lowest full level is sorted and every other
+    value (random offset) moves up a level with twice the weight.
+
+    Parameters
+    ----------
+    k : int
+        size of the top level, accuracy grows with k
+    seed : int
+        seed of the compaction offsets
+    """
+
+    def __init__(self, k=SKETCH_K, seed=0):
+        self.k = k
+        self.n = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.levels = [[]]
+        self.size = 0
+        self._rng = random.Random(seed)
+        self._max_size = self._capacity_total()
+
+    def __len__(self):
+        return self.n
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(math.ceil(self.k * CAPACITY_DECAY**depth), 2)
+
+    def _capacity_total(self):
+        return sum(self._capacity(level) for level in range(len(self.levels)))
+
+    def update(self, value):
+        """
+        Adds one value (nan is ignored).
+        """
+
+        value = float(value)
+        if value != value:
+            return
+        self.levels[0].append(value)
+        self.n += 1
+        self.size += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if self.size > self._max_size:
+            self._compress()
+
+    def _compress(self):
+        while self.size > self._max_size:
+            for level, items in enumerate(self.levels):
+                if len(items) >= self._capacity(level):
+                    break
+
+            if level + 1 == len(self.levels):
+                self.levels.append([])
+                self._max_size = self._capacity_total()
+
+            # an odd value out stays on this level, keeping weights exact
+            items.sort()
+            kept = [items.pop()] if len(items) % 2 else []
+            promoted = items[self._rng.random() < 0.5 :: 2]
+            self.levels[level + 1].extend(promoted)
+            self.levels[level] = kept
+            self.size -= len(items) - len(promoted)
+
+    def merge(self, other):
+        """
+        Adds another sketch's values to this one.
+        """
+
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for level, items in enumerate(other.levels):
+            self.levels[level].extend(items)
+        self.n += other.n
+        self.size += other.size
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._max_size = self._capacity_total()
+        self._compress()
+        return self
+
+    def _weighted(self):
+        values = np.concatenate([np.asarray(items) for items in self.levels])
+        weights = np.concatenate(
+            [np.full(len(items), 2**level) for level, items in enumerate(self.levels)]
+        )
+        order = np.argsort(values, kind="stable")
+        return values[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs):
+        """
+        Approximate quantiles, nan if the sketch is empty.
+        """
+
+        qs = np.atleast_1d(np.asarray(qs, dtype=float))
+        if not self.n:
+            return np.full(len(qs), np.nan)
+        values, cumulative = self._weighted()
+        index = np.searchsorted(cumulative, qs * cumulative[-1], side="left")
+        result = values[np.minimum(index, len(values) - 1)]
+        # the exact extremes are known
+        result[qs <= 0] = self.min
+        result[qs >= 1] = self.max
+        return result
+
+    def quantile(self, q):
+        return float(self.quantiles([q])[0])
+
+    def rank(self, value):
+        """
+        Approximate share of values <= value.
+        """
+
+        if not self.n:
+            return math.nan
+        values, cumulative = self._weighted()
+        index = np.searchsorted(values, value, side="right")
+        return float(cumulative[index - 1] / cumulative[-1]) if index else 0.0
+
+    def to_dict(self):
+        return {
+            "k": self.k,
+            "n": self.n,
+            "min": self.min if self.n else None,
+            "max": self.max if self.n else None,
+            "levels": self.levels,
+        }
+
+    @classmethod
+    def from_dict(cls, state, seed=0):
+        sketch = cls(state["k"], seed)
+        sketch.n = state["n"]
+        if sketch.n:
+            sketch.min, sketch.max = state["min"], state["max"]
+        sketch.levels = [list(items) for items in state["levels"]]
+        sketch.size = sum(len(items) for items in sketch.levels)
+        sketch._max_size = sketch._capacity_total()
+        return sketch
+
+
+class ZipSketches:
+    """
+    Price and price per sqft sketches of every zip.
+
+    Parameters
+    ----------
+    k : int, optional
+        KLL parameter of every sketch
+    """
+
+    def __init__(self, k=SKETCH_K):
+        self.k = k
+        self.zips = {}
+
+    def __len__(self):
+        return len(self.zips)
+
+    def _sketches(self, zipcode):
+        zipcode = str(zipcode)
+        if zipcode not in self.zips:
+            self.zips[zipcode] = {
+                "price": KLLSketch(self.k),
+                "price_per_sqft": KLLSketch(self.k),
+            }
+        return self.zips[zipcode]
+
+    def update(self, zipcode, price, price_per_sqft=math.nan):
+        """
+        Adds one listing.
+        """
+
+        sketches = self._sketches(zipcode)
+        sketches["price"].update(price)
+        sketches["price_per_sqft"].update(price_per_sqft)
+
+    def update_frame(self, df_houses):
+        """
+        Adds every listing of a house level frame (Zipcode, Price and
+        optionally Price_Per_SqFt).
+        """
+
+        price_per_sqft = (
+            df_houses["Price_Per_SqFt"]
+            if "Price_Per_SqFt" in df_houses
+            else [math.nan] * len(df_houses)
+        )
+        for zipcode, price, ppsf in zip(
+            df_houses["Zipcode"], df_houses["Price"], price_per_sqft
+        ):
+            self.update(zipcode, price, ppsf)
+        return self
+
+    def merge(self, other):
+        """
+        Adds another set of zip sketches (e.g. another shard or metro).
+        """
+
+        for zipcode, other_sketches in other.zips.items():
+            sketches = self._sketches(zipcode)
+            for name, sketch in other_sketches.items():
+                sketches[name].merge(sketch)
+        return self
+
+    def to_frame(self, quantiles=(0.25, 0.75)):
+        """
+        Zip level aggregates, with the columns of zipcode_aggregates where
+        they exist.
+        """
+
+        columns = [
+            "Zipcode",
+            "Listings",
+            "Min_Price",
+            "Max_Price",
+            "Median_Price",
+            "Median_Price_Per_SqFt",
+        ] + [f"Price_Q{round(q * 100)}" for q in quantiles]
+        rows = []
+        for zipcode, sketches in self.zips.items():
+            price, ppsf = sketches["price"], sketches["price_per_sqft"]
+            values = price.quantiles([0.5, *quantiles])
+            rows.append(
+                [
+                    int(zipcode),
+                    price.n,
+                    price.min if price.n else np.nan,
+                    price.max if price.n else np.nan,
+                    values[0],
+                    ppsf.quantile(0.5),
+                    *values[1:],
+                ]
+            )
+        return pd.DataFrame(rows, columns=columns)
+
+    def to_dict(self):
+        return {
+            "k": self.k,
+            "zips": {
+                zipcode: {name: sketch.to_dict() for name, sketch in sketches.items()}
+                for zipcode, sketches in self.zips.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        zip_sketches = cls(state["k"])
+        zip_sketches.zips = {
+            zipcode: {
+                name: KLLSketch.from_dict(sketch) for name, sketch in sketches.items()
+            }
+            for zipcode, sketches in state["zips"].items()
+        }
+        return zip_sketches
+
+    def save(self, path):
+        """
+        Writes the sketches as json, atomically.
+        """
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def merge_partitions(directory=PATH_TO_METRO_PARTITIONS):
+    """
+    Zip sketches of every metro partition of a batch_runner.py run, merged.
+    A zip shared by two metros gets the listings of both.
+    """
+
+    paths = sorted(glob.glob(os.path.join(directory, "*=*", ZIP_SKETCHES_FILE)))
+    if not paths:
+        raise FileNotFoundError(f"No {ZIP_SKETCHES_FILE} partitions in {directory}")
+    merged = ZipSketches.load(paths[0])
+    for path in paths[1:]:
+        merged.merge(ZipSketches.load(path))
+    return merged
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--partitions",
+        default=None,
+        help="batch partition folder, whose metro sketches replace the saved ones",
+    )
+    parser.add_argument(
+        "--add",
+        default=None,
+        help="stage output folder, whose house metrics are added to the saved sketches",
+    )
+    parser.add_argument("--path", default=PATH_TO_ZIP_SKETCHES)
+    args = parser.parse_args()
+
+    if args.partitions:
+        sketches = merge_partitions(args.partitions)
+    elif os.path.exists(args.path):
+        sketches = ZipSketches.load(args.path)
+    else:
+        sketches = ZipSketches()
+    if args.add:
+        sketches.update_frame(read_stage_frame(stage_path("house_metrics", args.add)))
+    if args.partitions or args.add:
+        sketches.save(args.path)
+
+    print(sketches.to_frame().sort_values("Zipcode").to_string(index=False))
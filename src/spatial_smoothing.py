@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""
+File:        spatial_smoothing.py
+Description: Empirical Bayes smoothing of noisy zip metrics (zips with one or
+                two listings) towards their neighbouring zips. Zip adjacency
+                (polygons that touch) is built once from the zip shapefile
+                as a sparse matrix and cached next to it. Each zip metric is
+                then shrunk towards the precision weighted mean of its
+                neighbours, more so the noisier the zip's own estimate:
+
+                    smoothed = prior + B * (estimate - prior),
+                    B = tau2 / (tau2 + sampling variance)
+
+                where tau2, the spread of zips around their neighbours, is
+                estimated from the data (method of moments). Every zip is
+                smoothed at once with sparse matrix-vector products, so the
+                pass scales to all US ZCTAs.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       adjacency = load_adjacency(PATH_TO_ZIP_SHAPEFILE)
+             df_smoothed = smooth_zip_metrics(df_house, df_zip, adjacency)
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from config import PROJECT_ROOT
+
+# census margins of error are 90% intervals
+MOE_Z = 1.645
+
+# sampling variance of a median is ~ pi / 2 that of a mean
+MEDIAN_VARIANCE_FACTOR = np.pi / 2
+
+
+class ZipAdjacency:
+    """
+    Sparse (zips x zips) adjacency matrix of touching zip polygons.
+
+    Parameters
+    ----------
+    zipcodes : array-like of int
+        zip of every row / column
+    matrix : scipy.sparse matrix
+        1 where two zips touch, 0 on the diagonal
+    """
+
+    def __init__(self, zipcodes, matrix):
+        self.zipcodes = np.asarray(zipcodes, dtype=np.int64)
+        self.matrix = sparse.csr_matrix(matrix)
+
+    def __len__(self):
+        return len(self.zipcodes)
+
+    @classmethod
+    def from_shapes(cls, gdf, zip_column="GEOID20"):
+        """
+        From zip geometries, using the spatial index to find every pair of
+        intersecting polygons in one bulk query.
+        """
+
+        zipcodes = gdf[zip_column].astype(int).to_numpy()
+        left, right = gdf.sindex.query(gdf.geometry, predicate="intersects")
+        keep = left != right
+        n = len(gdf)
+        matrix = sparse.coo_matrix(
+            (np.ones(keep.sum()), (left[keep], right[keep])), shape=(n, n)
+        ).tocsr()
+        # a zip split over several rows of the shapefile is one zip
+        matrix = ((matrix + matrix.T) > 0).astype(float)
+        return cls(zipcodes, matrix)
+
+    def save(self, path):
+        """
+        Writes the matrix as npz, atomically (batch workers share the cache).
+        """
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                zipcodes=self.zipcodes,
+                data=self.matrix.data,
+                indices=self.matrix.indices,
+                indptr=self.matrix.indptr,
+                shape=self.matrix.shape,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            matrix = sparse.csr_matrix(
+                (f["data"], f["indices"], f["indptr"]), shape=tuple(f["shape"])
+            )
+            return cls(f["zipcodes"], matrix)
+
+    def align(self, zipcodes):
+        """
+        Adjacency between the given zips (in their order), zips missing from
+        the shapefile have no neighbours.
+        """
+
+        zipcodes = np.asarray(zipcodes, dtype=np.int64)
+        if not len(self):
+            return sparse.csr_matrix((len(zipcodes), len(zipcodes)))
+        order = np.argsort(self.zipcodes, kind="stable")
+        rows = np.searchsorted(self.zipcodes[order], zipcodes)
+        rows = np.minimum(rows, len(order) - 1)
+        found = self.zipcodes[order][rows] == zipcodes
+        rows = order[rows]
+
+        # selection matrix from the shapefile's zips to the given ones
+        select = sparse.csr_matrix(
+            (np.ones(found.sum()), (np.flatnonzero(found), rows[found])),
+            shape=(len(zipcodes), len(self)),
+        )
+        return (select @ self.matrix @ select.T).tocsr()
+
+
+def adjacency_cache_path(shapefile_path):
+    return os.path.splitext(shapefile_path)[0] + "_adjacency.npz"
+
+
+def load_adjacency(shapefile_path):
+    """
+    Zip adjacency of a shapefile, from its cache when the cache is newer than
+    the shapefile, otherwise built (geopandas is only imported then) and
+    cached.
+    """
+
+    shapefile_path = os.path.join(PROJECT_ROOT, shapefile_path)
+    cache_path = adjacency_cache_path(shapefile_path)
+    fresh = os.path.exists(cache_path) and (
+        os.path.getmtime(cache_path) >= os.path.getmtime(shapefile_path)
+    )
+    if fresh:
+        return ZipAdjacency.load(cache_path)
+
+    import geopandas as gpd
+
+    gdf = gpd.read_file(shapefile_path)
+    gdf = gdf[gdf["geometry"].notnull()].reset_index(drop=True)
+    adjacency = ZipAdjacency.from_shapes(gdf)
+    adjacency.save(cache_path)
+    return adjacency
+
+
+def empirical_bayes(estimates, variances, neighbors):
+    """
+    Shrinks each estimate towards the precision weighted mean of its
+    neighbours' estimates (the overall mean for zips without any).
+
+    Parameters
+    ----------
+    estimates, variances : np.ndarray
+        per zip estimate and its sampling variance, nan where unknown
+    neighbors : scipy.sparse matrix
+        (zips x zips) adjacency, aligned with estimates
+
+    Returns
+    -------
+    np.ndarray
+        smoothed estimates, left as is where the variance is unknown
+    """
+
+    known = ~np.isnan(estimates) & ~np.isnan(variances)
+    precision = np.where(known, 1 / np.maximum(variances, 1e-12), 0.0)
+    weighted = np.where(known, estimates, 0.0) * precision
+
+    neighbor_precision = neighbors @ precision
+    with np.errstate(invalid="ignore", divide="ignore"):
+        prior = (neighbors @ weighted) / neighbor_precision
+    overall = weighted.sum() / max(precision.sum(), 1e-12)
+    prior = np.where(neighbor_precision > 0, prior, overall)
+
+    if not known.any():
+        return estimates
+
+    # spread of zips around their prior beyond sampling noise
+    residual = (estimates - prior)[known]
+    tau2 = max(np.mean(residual**2) - np.mean(variances[known]), 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        shrink = np.where(variances > 0, tau2 / (tau2 + variances), 1.0)
+    return np.where(known, prior + shrink * (estimates - prior), estimates)
+
+
+def smooth_zip_metrics(df_house, df_zip, adjacency):
+    """
+    Smoothed median price, median income and PIR of every zip.
+
+    The median price is smoothed on the log scale, with a sampling variance
+    from the zip's listing count and the pooled spread of log prices within
+    zips. The median income uses the variance of its census margin of error.
+
+    Parameters
+    ----------
+    df_house : pd.DataFrame
+        house level results (Zipcode, Price)
+    df_zip : pd.DataFrame
+        zip level results (Zipcode, Median_Price, Household_Median_Income,
+        Household_Median_Income_MOE)
+    adjacency : ZipAdjacency
+
+    Returns
+    -------
+    pd.DataFrame
+        Zipcode, Median_Price_Smoothed, Household_Median_Income_Smoothed
+        and PIR_Smoothed
+    """
+
+    zipcodes = df_zip["Zipcode"].to_numpy()
+    neighbors = adjacency.align(zipcodes)
+
+    # pooled within zip variance of log prices
+    log_price = np.log(df_house["Price"].astype(float).where(lambda p: p > 0))
+    grouped = log_price.groupby(df_house["Zipcode"])
+    counts = grouped.count().reindex(zipcodes).fillna(0).to_numpy()
+    deviations = log_price - grouped.transform("mean")
+    dof = max(log_price.notna().sum() - (counts > 0).sum(), 1)
+    within = np.nansum(deviations**2) / dof
+
+    with np.errstate(divide="ignore"):
+        log_median = np.log(df_zip["Median_Price"].to_numpy(dtype=float))
+        price_variance = MEDIAN_VARIANCE_FACTOR * within / counts
+    price_variance[counts == 0] = np.nan
+    median_price = np.exp(empirical_bayes(log_median, price_variance, neighbors))
+
+    income = df_zip["Household_Median_Income"].to_numpy(dtype=float)
+    income_se = df_zip["Household_Median_Income_MOE"].to_numpy(dtype=float) / MOE_Z
+    income = empirical_bayes(income, income_se**2, neighbors)
+
+    return pd.DataFrame(
+        {
+            "Zipcode": zipcodes,
+            "Median_Price_Smoothed": np.round(median_price),
+            "Household_Median_Income_Smoothed": np.round(income),
+            "PIR_Smoothed": np.round(median_price / income, 1),
+        }
+    )
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+File:        static_export.py
+Description: Pre-renders the dashboard into a static bundle at the end of the
+                pipeline, since the data only changes once a week while the
+                streamlit app re-runs python and re-renders the folium map for
+                every visitor. The bundle holds:
+                  - index.html   page with the KPIs, zip cards and charts
+                                 (static_dashboard.html), filtering in the
+                                 browser
+                  - data.json    compact columnar listings (price, gap, zip)
+                                 for the KPIs, the precomputed chart bins of
+                                 chart_data.py and the ranked zips
+                  - map.html     the folium map, rendered once
+                  - listings.parquet  every listing, for download
+                It can be served by any static file server (or object
+                storage) at no per-visitor compute.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       python static_export.py [--output data/output/static]
+"""
+
+import os
+import json
+import shutil
+import argparse
+import numpy as np
+from dashboard_data import houses_from_records, zips_from_records
+from dashboard_summary import build_summary
+from chart_data import build_chart_data
+from data_table import write_parquet
+from config import (
+    PROJECT_ROOT,
+    PATH_TO_STATIC_EXPORT,
+    PATH_TO_ZIP_SHAPEFILE,
+    CHART_PRICE_BIN_WIDTH,
+    DATA_TABLE_COLUMNS,
+)
+
+TEMPLATE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "static_dashboard.html"
+)
+
+
+def dashboard_frames(df_house_level_analysis, df_zip_level_analysis):
+    """
+    Pipeline results as the dashboard sees them once loaded from Airtable
+    (same derived columns and dtypes, see dashboard_data.py).
+    """
+
+    def records(df):
+        return [{"fields": row} for row in df.to_dict(orient="records")]
+
+    return (
+        houses_from_records(records(df_house_level_analysis), verbose=False),
+        zips_from_records(records(df_zip_level_analysis), verbose=False),
+    )
+
+
+def _int_or_none(values):
+    values = np.asarray(values, dtype=float)
+    return [None if np.isnan(v) else int(round(v)) for v in values]
+
+
+def build_static_data(df_houses, df_zips):
+    """
+    Everything index.html needs, as a json serializable dict.
+
+    Zips are sent once, listings and scatter points refer to them by their
+    index in the sorted zip list (the zip axis of the chart bins).
+    """
+
+    summary = build_summary(df_houses, df_zips)
+    chart_data = build_chart_data(df_houses, df_zips)
+    zips = chart_data["zips"]
+
+    df_scatter = chart_data["scatter"]
+    price = df_houses["Price"]
+
+    return {
+        "created": summary["created"],
+        "kpis": summary["kpis"],
+        "most_affordable": summary["most_affordable"],
+        "least_affordable": summary["least_affordable"],
+        "price_range": [int(price.min()), int(price.max())],
+        "zips": zips.tolist(),
+        "listings": {
+            "price": _int_or_none(price),
+            "gap": _int_or_none(df_houses["Affordability_Gap"]),
+            "zip": np.searchsorted(
+                zips, df_houses["Zipcode"].astype(str).to_numpy()
+            ).tolist(),
+        },
+        "charts": {
+            "bin_width": CHART_PRICE_BIN_WIDTH,
+            "bin_edges": chart_data["bin_edges"].tolist(),
+            "shape": list(chart_data["counts"].shape),
+            "counts": chart_data["counts"].ravel().tolist(),
+            "ppsf_sum": np.round(chart_data["ppsf_sum"].ravel(), 2).tolist(),
+            "ppsf_count": chart_data["ppsf_count"].ravel().tolist(),
+            "scatter": {
+                "zip": np.searchsorted(zips, df_scatter["Zipcode"]).tolist(),
+                "sqft": _int_or_none(df_scatter["SqFt"]),
+                "price": _int_or_none(df_scatter["Price"]),
+                "affordable": df_scatter["Is_Affordable"].astype(int).tolist(),
+            },
+            "pir_ranking": json.loads(
+                chart_data["pir_ranking"].to_json(orient="records")
+            ),
+        },
+    }
+
+
+def export_static_dashboard(
+    df_house_level_analysis,
+    df_zip_level_analysis,
+    directory=PATH_TO_STATIC_EXPORT,
+    shapefile_path=PATH_TO_ZIP_SHAPEFILE,
+    df_cells=None,
+):
+    """
+    Writes the static bundle. The map is left out when the zip shapefile is
+    missing.
+
+    Parameters
+    ----------
+    df_house_level_analysis, df_zip_level_analysis : pd.DataFrame
+        pipeline results, as uploaded to Airtable
+    directory : str, optional
+        bundle folder, replaced as a whole
+    shapefile_path : str, optional
+        zip shapefile of the choropleth
+    df_cells : pd.DataFrame, optional
+        price grid cells (see grid_aggregates.py)
+
+    Returns
+    -------
+    dict
+        size in bytes of every file of the bundle
+    """
+
+    df_houses, df_zips = dashboard_frames(
+        df_house_level_analysis, df_zip_level_analysis
+    )
+
+    # written next to the live bundle, then swapped in
+    tmp_dir = f"{directory}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    with open(os.path.join(tmp_dir, "data.json"), "w") as f:
+        json.dump(
+            build_static_data(df_houses, df_zips),
+            f,
+            separators=(",", ":"),
+            allow_nan=False,
+        )
+
+    shapefile_path = os.path.join(PROJECT_ROOT, shapefile_path)
+    if os.path.exists(shapefile_path):
+        from dashboard_map import load_zip_shapes, build_geojson_map, build_map
+
+        geojson_map = build_geojson_map(df_zips, load_zip_shapes(shapefile_path))
+        build_map(geojson_map, df_zips, df_houses, df_cells).save(
+            os.path.join(tmp_dir, "map.html")
+        )
+    else:
+        print(f"No zip shapefile at {shapefile_path}, exporting without the map")
+
+    columns = [col for col in DATA_TABLE_COLUMNS if col in df_houses]
+    write_parquet(
+        os.path.join(tmp_dir, "listings.parquet"),
+        df_houses,
+        np.arange(len(df_houses)),
+        columns,
+    )
+    shutil.copyfile(TEMPLATE_PATH, os.path.join(tmp_dir, "index.html"))
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(tmp_dir, directory)
+
+    return {
+        name: os.path.getsize(os.path.join(directory, name))
+        for name in sorted(os.listdir(directory))
+    }
+
+
+if __name__ == "__main__":
+    from columnar import read_stage_frame, stage_path
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", default=PATH_TO_STATIC_EXPORT)
+    args = parser.parse_args()
+
+    # from the last run's stage outputs
+    sizes = export_static_dashboard(
+        read_stage_frame(stage_path("house_metrics")),
+        read_stage_frame(stage_path("zip_metrics")),
+        args.output,
+    )
+    for name, size in sizes.items():
+        print(f"{name:<20}{size / 1024:>10,.1f} KB")
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+File:        test_dashboard_map.py
+Description: The map and static export with zips the real data has: one
+                without census income (no PIR, affordable price or gap) and
+                one missing from the zip shapefile.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       python -m pytest tests (from src)
+"""
+
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from shapely.geometry import box
+from static_export import dashboard_frames, export_static_dashboard
+from dashboard_map import build_geojson_map, build_map
+
+# 14001 is complete, 14027 has no census income, 14999 has no shape
+ZIPS = [14001, 14027, 14999]
+
+
+@pytest.fixture
+def pipeline_frames():
+    """
+    House and zip level pipeline results, as uploaded to Airtable.
+    """
+
+    df_zip = pd.DataFrame(
+        {
+            "Zipcode": ZIPS,
+            "Min_Price": [150000, 180000, 90000],
+            "Max_Price": [250000, 320000, 110000],
+            "Median_Price": [200000, 250000, 100000],
+            "Household_Median_Income": [60000, np.nan, 50000],
+            "PIR": [3.3, np.nan, 2.0],
+        }
+    )
+    df_house = pd.DataFrame(
+        {
+            "Address": [f"{i} Main St" for i in range(len(ZIPS))],
+            "Zipcode": ZIPS,
+            "Price": [200000, 250000, 100000],
+            "SqFt": [1500, 1800, 1000],
+            "Price_Per_SqFt": [133.3, 138.9, 100.0],
+            "Household_Median_Income": [60000, np.nan, 50000],
+            "Affordable_Price": [180000, np.nan, 150000],
+            "Affordability_Gap": [-20000, np.nan, 50000],
+            "Lat": [42.90, 42.95, 43.00],
+            "Lng": [-78.80, -78.75, -78.70],
+        }
+    )
+    return df_house, df_zip
+
+
+@pytest.fixture
+def zip_shapes():
+    import geopandas as gpd
+
+    return gpd.GeoDataFrame(
+        {"Zipcode": ["14001", "14027"]},
+        geometry=[box(-78.9, 42.8, -78.8, 42.9), box(-78.8, 42.9, -78.7, 43.0)],
+        crs="EPSG:4326",
+    )
+
+
+def test_geojson_skips_zips_without_shape(pipeline_frames, zip_shapes):
+    _, df_zips = dashboard_frames(*pipeline_frames)
+    geojson_map = build_geojson_map(df_zips, zip_shapes)
+
+    properties = {
+        f["properties"]["Zipcode"]: f["properties"] for f in geojson_map["features"]
+    }
+    assert sorted(properties) == ["14001", "14027"]
+    assert properties["14001"]["PIR"] == 3.3
+    assert properties["14027"]["PIR"] is None
+    assert properties["14027"]["PIR_Formatted"] == "N/A"
+    assert properties["14027"]["Household_Median_Income_Formatted"] == "N/A"
+
+
+def test_map_shows_missing_income_as_na(pipeline_frames, zip_shapes):
+    df_houses, df_zips = dashboard_frames(*pipeline_frames)
+    html = (
+        build_map(build_geojson_map(df_zips, zip_shapes), df_zips, df_houses)
+        .get_root()
+        .render()
+    )
+
+    assert "<b><i>Affordable Price:</i></b> N/A" in html
+    assert "<b><i>Affordability Gap:</i></b> N/A" in html
+    assert "<b><i>Affordable Price:</i></b> $180,000" in html
+
+
+def test_static_export(pipeline_frames, zip_shapes, tmp_path):
+    shapefile_path = str(tmp_path / "zips.shp")
+    zip_shapes.rename(columns={"Zipcode": "GEOID20"}).to_file(shapefile_path)
+
+    directory = tmp_path / "static"
+    sizes = export_static_dashboard(
+        *pipeline_frames, str(directory), shapefile_path=shapefile_path
+    )
+
+    assert sorted(sizes) == ["data.json", "index.html", "listings.parquet", "map.html"]
+    # strict json (no NaN), zips without a PIR aren't ranked
+    data = json.loads((directory / "data.json").read_text(), parse_constant=pytest.fail)
+    ranked = data["most_affordable"] + data["least_affordable"]
+    assert {row["Zipcode"] for row in ranked} == {"14001", "14999"}
+    assert data["listings"]["gap"] == [-20000, None, 50000]
+
+
+def test_map_without_any_zip_shape(pipeline_frames, zip_shapes, tmp_path):
+    # none of the scraped zips in the shapefile (e.g. another metro)
+    other_shapes = zip_shapes.assign(Zipcode=["90210", "90211"])
+    df_houses, df_zips = dashboard_frames(*pipeline_frames)
+    geojson_map = build_geojson_map(df_zips, other_shapes)
+    assert geojson_map["features"] == []
+
+    html = build_map(geojson_map, df_zips, df_houses).get_root().render()
+    assert "<b><i>Affordable Price:</i></b> $180,000" in html
+
+    shapefile_path = str(tmp_path / "zips.shp")
+    other_shapes.rename(columns={"Zipcode": "GEOID20"}).to_file(shapefile_path)
+    sizes = export_static_dashboard(
+        *pipeline_frames, str(tmp_path / "static"), shapefile_path=shapefile_path
+    )
+    assert "map.html" in sizes
+
+
+def test_map_without_any_pir(pipeline_frames, zip_shapes):
+    # no zip with census income, or every PIR above the color scale
+    for pir in [np.nan, 9.5]:
+        df_house, df_zip = pipeline_frames
+        df_houses, df_zips = dashboard_frames(df_house, df_zip.assign(PIR=pir))
+        geojson_map = build_geojson_map(df_zips, zip_shapes)
+        build_map(geojson_map, df_zips, df_houses).get_root().render()
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+File:        test_data_table.py
+Description: Streamed CSV exports of the data table, for filters that keep
+                rows over several chunks and for filters that keep none.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       python -m pytest tests (from src)
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from data_table import build_sort_index, filter_sort_index, write_csv
+
+COLUMNS = ["Address", "Price"]
+
+
+@pytest.fixture
+def df_houses():
+    return pd.DataFrame(
+        {
+            "Address": [f"{i} Main St, Buffalo, NY 14201" for i in range(7)],
+            "Price": [250_000, 120_000, np.nan, 180_000, 95_000, 310_000, 140_000],
+            "Zipcode": 14201,
+        }
+    )
+
+
+def test_csv_export_in_chunks(df_houses, tmp_path):
+    order = build_sort_index(df_houses, "Price")
+    path = write_csv(str(tmp_path / "export.csv"), df_houses, order, COLUMNS, 3)
+
+    df_export = pd.read_csv(path)
+    assert list(df_export.columns) == COLUMNS
+    assert df_export["Price"].tolist()[:-1] == sorted(df_houses["Price"].dropna())
+    assert np.isnan(df_export["Price"].iloc[-1])
+
+
+def test_csv_export_of_empty_filter(df_houses, tmp_path):
+    order = filter_sort_index(
+        build_sort_index(df_houses, "Price"), np.zeros(len(df_houses), dtype=bool)
+    )
+    path = write_csv(str(tmp_path / "export.csv"), df_houses, order, COLUMNS)
+
+    with open(path) as f:
+        assert f.read() == "Address,Price\n"
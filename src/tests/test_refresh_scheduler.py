@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+File:        test_refresh_scheduler.py
+Description: Zips planned by the RefreshScheduler: configured zips that were
+                never scraped, and churn measured on the de-duplicated
+                listings rather than the geocoded house level results.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       python -m pytest tests (from src)
+"""
+
+import pandas as pd
+from refresh_scheduler import RefreshScheduler, SimulatedClock
+from config import REFRESH_MAX_INTERVAL_DAYS
+
+
+def run_frames(prices, geocoded):
+    # one zip's listings stage, and its house / zip level results, which
+    # lack the listings that couldn't be geocoded
+    df_listings = pd.DataFrame(
+        {
+            "Zipcode": "14201",
+            "Address": [f"{i} Main St, Buffalo, NY 14201" for i in range(len(prices))],
+            "Price": [f"${price:,}" for price in prices],
+        }
+    )
+    df_houses = pd.DataFrame(
+        {
+            "Zipcode": 14201,
+            "Address": df_listings["Address"],
+            "Price": [float(price) for price in prices],
+            "Affordable_Price": 180_000.0,
+        }
+    )[geocoded]
+    df_zips = pd.DataFrame({"Zipcode": [14201], "PIR": [3.4]})
+    return df_listings, df_houses, df_zips
+
+
+def test_plans_configured_zips_never_scraped():
+    clock = SimulatedClock()
+    scheduler = RefreshScheduler(
+        state_path=None, clock=clock, zipcodes=[14201, 14202, 14203]
+    )
+    df_listings, df_houses, df_zips = run_frames([150_000] * 50, [True] * 50)
+    scheduler.record_run(df_houses, df_zips, df_listings=df_listings)
+    clock.advance(days=3)
+
+    planned = {item["zipcode"]: item for item in scheduler.plan()}
+    assert list(planned) == ["14202", "14203", "14201"]
+    assert planned["14202"]["reason"] == "overdue"
+    assert scheduler.age_days("14202") == REFRESH_MAX_INTERVAL_DAYS
+    # sized like the zips already scraped
+    assert planned["14202"]["pages"] == scheduler.pages("14201") == 2
+
+
+def test_churn_counts_listings_that_failed_geocoding():
+    clock = SimulatedClock()
+    scheduler = RefreshScheduler(state_path=None, clock=clock)
+    prices = [120_000, 150_000, 175_000, 210_000]
+
+    # the same listings twice, a different one not geocoded each time
+    for geocoded in [[True, True, True, False], [False, True, True, True]]:
+        df_listings, df_houses, df_zips = run_frames(prices, geocoded)
+        scheduler.record_run(df_houses, df_zips, df_listings=df_listings)
+        clock.advance(days=7)
+
+    assert scheduler.zips["14201"]["listings"] == 4
+    assert scheduler.zips["14201"]["churn_rate"] == 0
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+File:        test_scraper.py
+Description: Recovery of scrape_listings from a browser that dies between
+                pages: the DriverManager recycles it and the scrape resumes
+                on the next page. Browsers are stubs, no chrome needed.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       python -m pytest tests (from src)
+"""
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+import scraper
+import driver_manager
+from driver_manager import DriverManager
+
+START_URL = "https://www.redfin.com/city/2832/NY/Buffalo"
+N_PAGES = 3
+LISTINGS_PER_PAGE = 2
+
+
+def page_url(page_num):
+    return START_URL if page_num == 1 else f"{START_URL}/page-{page_num}"
+
+
+class StubDriver:
+    """
+    Browser serving N_PAGES result pages, which can be killed: every command
+    then raises, as with a crashed chrome.
+    """
+
+    def __init__(self):
+        self.page_num = None
+        self.visited = []
+        self.dead = False
+
+    def _check(self):
+        if self.dead:
+            raise WebDriverException("chrome not reachable")
+
+    def get(self, url):
+        self._check()
+        self.visited.append(url)
+        self.page_num = 1 if url == START_URL else int(url.rsplit("-", 1)[1])
+
+    @property
+    def title(self):
+        self._check()
+        return f"Buffalo homes, page {self.page_num}"
+
+    @property
+    def current_url(self):
+        self._check()
+        return page_url(self.page_num)
+
+    def find_elements(self, by, value):
+        self._check()
+        return [f"card {self.page_num}.{i}" for i in range(LISTINGS_PER_PAGE)]
+
+    def find_element(self, by, value):
+        self._check()
+        if value == "PageArrow__direction--next" and self.page_num == N_PAGES:
+            raise WebDriverException("no next button")
+        return value
+
+    def execute_script(self, script, *args):
+        self._check()
+        return 1
+
+    def execute_cdp_cmd(self, cmd, params):
+        raise WebDriverException("no cdp")
+
+    def quit(self):
+        pass
+
+
+class StubActions:
+    """
+    ActionChains whose click on the next button goes to the next page.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def move_to_element(self, element):
+        return self
+
+    def pause(self, seconds):
+        return self
+
+    def click(self):
+        return self
+
+    def perform(self):
+        self.driver.page_num += 1
+
+
+class StubWait:
+    """
+    WebDriverWait on a page whose cards are always there.
+    """
+
+    def __init__(self, driver, timeout):
+        pass
+
+    def until(self, condition):
+        return True
+
+
+class StubPacer:
+    """
+    No waits. The browser dies during the wait after page die_after_page.
+    """
+
+    settings = {"block_retries": 0}
+
+    def __init__(self, manager, die_after_page):
+        self.manager = manager
+        self.die_after_page = die_after_page
+        self.pages = 0
+
+    def pause(self, kind):
+        if kind == "between_pages":
+            self.pages += 1
+            if self.pages == self.die_after_page:
+                self.manager.driver.dead = True
+
+    def pause_seconds(self, kind):
+        return 0
+
+    def check_page(self, driver, n_found):
+        return False
+
+    def print_report(self):
+        pass
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    drivers = []
+
+    def new_driver(headless, profile_dir):
+        drivers.append(StubDriver())
+        return drivers[-1]
+
+    monkeypatch.setattr(driver_manager, "instantiate_driver", new_driver)
+    monkeypatch.setattr(scraper.webdriver, "ActionChains", StubActions)
+    monkeypatch.setattr(scraper, "WebDriverWait", StubWait)
+    monkeypatch.setattr(scraper, "human_scroll", lambda driver, pacer: None)
+    monkeypatch.setattr(scraper, "page_stats", lambda driver: None)
+    monkeypatch.setattr(
+        scraper,
+        "extract_data",
+        lambda listings, pacer=None: [{"Card": card} for card in listings],
+    )
+
+    manager = DriverManager(profile_dir=None, max_pages=None, max_heap_growth_mb=None)
+    manager.drivers = drivers
+    return manager
+
+
+def test_resumes_on_next_page_after_browser_dies(manager):
+    listing_data = manager.scrape(
+        START_URL, 100, pacer=StubPacer(manager, die_after_page=1)
+    )
+
+    # every page scraped once, the fresh browser reopened page 2
+    assert [row["Card"] for row in listing_data] == [
+        f"card {page}.{i}"
+        for page in range(1, N_PAGES + 1)
+        for i in range(LISTINGS_PER_PAGE)
+    ]
+    first, second = manager.drivers
+    assert first.dead
+    assert second.visited == [page_url(2)]
+    assert manager.stats["recycles"] == 1
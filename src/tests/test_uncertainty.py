@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+File:        test_uncertainty.py
+Description: Bootstrapped medians of uncertainty.py against a brute force
+                bootstrap of a small zip: every resample of its listings
+                enumerated, so the distribution of the median is exact.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       python -m pytest tests (from src)
+"""
+
+import itertools
+import numpy as np
+import pytest
+from uncertainty import sorted_price_matrix, draw_median
+
+DRAWS = 200_000
+
+
+def bootstrap_median_distribution(prices):
+    # probability of every median over the n ** n equally likely resamples
+    n = len(prices)
+    distribution = {}
+    for resample in itertools.product(prices, repeat=n):
+        median = np.median(resample)
+        distribution[median] = distribution.get(median, 0) + 1 / n**n
+    return distribution
+
+
+@pytest.mark.parametrize(
+    "prices",
+    [
+        [150_000, 210_000],
+        [95_000, 120_000, 260_000],
+        [80_000, 135_000, 190_000, 410_000],
+        # even count with a tie between the middle prices
+        [70_000, 110_000, 175_000, 175_000, 230_000, 390_000],
+    ],
+)
+def test_median_matches_brute_force_bootstrap(prices):
+    matrix, counts = sorted_price_matrix(np.zeros(len(prices), dtype=int), prices, [0])
+    u, u_upper = np.random.default_rng(0).random((2, 1, DRAWS))
+    draws = draw_median(matrix, counts, u, u_upper)[0]
+
+    expected = bootstrap_median_distribution(prices)
+    values, n_draws = np.unique(draws, return_counts=True)
+    assert set(values) <= set(expected)
+    observed = dict(zip(values, n_draws / DRAWS))
+    for median, probability in expected.items():
+        assert observed.get(median, 0) == pytest.approx(probability, abs=0.005)
+
+
+def test_median_of_zip_without_listings():
+    matrix, counts = sorted_price_matrix(np.array([1, 1]), [100_000, 200_000], [0, 1])
+    draws = draw_median(matrix, counts, np.full((2, 3), 0.5), np.full((2, 3), 0.5))
+    assert np.isnan(draws[0]).all()
+    assert not np.isnan(draws[1]).any()
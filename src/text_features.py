@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+File:        text_features.py
+Description: Features of the listing descriptions scraped from the home cards
+                (bp-Homecard__ContentExtension): keyword flags (price reduced,
+                new construction, multi-family, as-is, open house), a
+                condition score from positive / negative condition terms, and
+                a hashed bag of words (the text columns of the hedonic price
+                model, see hedonic.py). The whole column is processed at once
+                with arrow compute kernels: the patterns of each flag or
+                lexicon are compiled into one RE2 alternation, matched as a
+                single automaton over every description, and tokens are hashed
+                in bulk into a sparse matrix. No per row python, no pretrained
+                models.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       df = df.join(description_features(df["Description"]))
+             X = hash_vectorize(df["Description"])
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from scipy import sparse
+from config import TEXT_HASH_FEATURES
+
+# flag column -> patterns (lowercase RE2)
+KEYWORDS = {
+    "Price_Reduced": [
+        r"price reduc\w*",
+        r"reduced price",
+        r"price drop",
+        r"price improvement",
+        r"new price",
+    ],
+    "New_Construction": [
+        r"new construction",
+        r"newly built",
+        r"new build",
+        r"to be built",
+    ],
+    "Multi_Family": [
+        r"multi[- ]?family",
+        r"(?:two|three|2|3)[- ]family",
+        r"duplex",
+        r"triplex",
+        r"both units",
+        r"\bup ?/ ?down\b",
+    ],
+    "As_Is": [r"\bas[- ]is\b"],
+    "Open_House": [r"open house"],
+}
+
+# condition lexicons, longer phrases first (matches don't overlap)
+CONDITION_POSITIVE = [
+    r"move[- ]in ready",
+    r"turn[- ]?key",
+    r"fully (?:updated|renovated|remodeled)",
+    r"new (?:roof|kitchen|furnace|windows|siding|baths?)",
+    r"updated",
+    r"renovated",
+    r"remodeled",
+    r"hardwood",
+    r"immaculate",
+    r"pristine",
+    r"well[- ]maintained",
+    r"spacious",
+    r"charming",
+]
+CONDITION_NEGATIVE = [
+    r"needs (?:some )?(?:tlc|work|updating|repairs?)",
+    r"\btlc\b",
+    r"\bas[- ]is\b",
+    r"fixer",
+    r"handyman",
+    r"investor special",
+    r"cash only",
+    r"estate sale",
+    r"water damage",
+    r"foundation issues?",
+    r"bring your (?:tools|ideas|imagination)",
+]
+
+TOKEN_SEPARATOR = r"[^a-z0-9]+"
+
+
+def _alternation(patterns):
+    return "|".join(f"(?:{pattern})" for pattern in patterns)
+
+
+def _lower_text(descriptions):
+    # lowercase arrow strings, missing descriptions as ""
+    text = pa.array(pd.Series(descriptions, dtype=object), type=pa.large_string())
+    return pc.utf8_lower(pc.fill_null(text, ""))
+
+
+def description_features(descriptions):
+    """
+    Keyword flags and condition score of every description.
+
+    Parameters
+    ----------
+    descriptions : pd.Series of str
+        nulls are treated as empty descriptions
+
+    Returns
+    -------
+    pd.DataFrame
+        indexed like descriptions: one bool column per KEYWORDS entry, and
+        Condition_Score, (positive - negative terms) / (positive + negative
+        + 1), in (-1, 1), 0 when there are none
+    """
+
+    text = _lower_text(descriptions)
+    features = {
+        name: pc.match_substring_regex(text, _alternation(patterns)).to_numpy(
+            zero_copy_only=False
+        )
+        for name, patterns in KEYWORDS.items()
+    }
+
+    positive = pc.count_substring_regex(text, _alternation(CONDITION_POSITIVE))
+    negative = pc.count_substring_regex(text, _alternation(CONDITION_NEGATIVE))
+    positive = positive.to_numpy(zero_copy_only=False).astype(float)
+    negative = negative.to_numpy(zero_copy_only=False).astype(float)
+    features["Condition_Score"] = np.round(
+        (positive - negative) / (positive + negative + 1), 2
+    )
+
+    index = descriptions.index if isinstance(descriptions, pd.Series) else None
+    return pd.DataFrame(features, index=index)
+
+
+def hash_vectorize(descriptions, n_features=TEXT_HASH_FEATURES, bigrams=True):
+    """
+    Hashed bag of words (and word pairs) of every description, like
+    sklearn's HashingVectorizer: each token is hashed to a column, with a
+    sign from the hash to keep collisions unbiased.
+
+    Parameters
+    ----------
+    descriptions : pd.Series of str
+    n_features : int
+        columns of the matrix
+    bigrams : bool
+        also hash pairs of consecutive words
+
+    Returns
+    -------
+    scipy.sparse.csr_matrix, shape (len(descriptions), n_features)
+        token counts (signed)
+    """
+
+    tokens = pc.split_pattern_regex(_lower_text(descriptions), TOKEN_SEPARATOR)
+    words = pc.list_flatten(tokens).to_numpy(zero_copy_only=False)
+    rows = pc.list_parent_indices(tokens).to_numpy()
+
+    # a description starting or ending with a separator splits into ""
+    keep = words != ""
+    words, rows = words[keep], rows[keep]
+    if bigrams and len(words):
+        same_row = rows[1:] == rows[:-1]
+        pairs = pc.binary_join_element_wise(
+            pa.array(words[:-1][same_row]), pa.array(words[1:][same_row]), " "
+        ).to_numpy(zero_copy_only=False)
+        words = np.concatenate([words, pairs])
+        rows = np.concatenate([rows, rows[:-1][same_row]])
+
+    hashes = pd.util.hash_array(words.astype(object))
+    columns = (hashes % np.uint64(n_features)).astype(np.int64)
+    signs = np.where(hashes >> np.uint64(63), -1.0, 1.0)
+    return sparse.csr_matrix(
+        (signs, (rows, columns)), shape=(len(descriptions), n_features)
+    )
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+File:        uncertainty.py
+Description: Monte Carlo uncertainty of the zip level PIR, the Unaffordable
+                flag and the zips' affordability ranks. Every draw takes a
+                zip's median income from its census 90% margin of error and
+                bootstraps its listing prices, and all zips and draws are
+                simulated at once as (zips x draws) arrays with a fixed seed.
+                Bootstrapped medians / minimums are drawn directly from the
+                order statistics of each zip's sorted prices, so no resampled
+                listings are materialized.
+Author:      Yuseof
+Created:     2026-10-19
+Modified:    2026-10-19
+Usage:       df_zip = df_zip.merge(pir_uncertainty(df_house, df_zip), on="Zipcode")
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.special import betainc
+from scipy.stats import binom
+from config import (
+    AFFORDABLE_INCOME_MULTIPLE,
+    UNCERTAINTY_DRAWS,
+    UNCERTAINTY_INTERVAL,
+    UNCERTAINTY_SEED,
+    DASHBOARD_RANKED_ZIPS,
+)
+
+# census margins of error are 90% intervals
+MOE_Z = 1.645
+
+
+def sorted_price_matrix(zipcodes, prices, zip_order):
+    """
+    Prices of every zip, sorted, as a (zips x max listings) matrix padded
+    with nan, and the number of listings per zip.
+
+    Parameters
+    ----------
+    zipcodes, prices : array-like
+        one entry per listing
+    zip_order : array-like
+        zips in the row order wanted
+    """
+
+    codes = pd.Categorical(zipcodes, categories=zip_order).codes
+    prices = np.asarray(prices, dtype=float)
+    keep = (codes >= 0) & ~np.isnan(prices)
+    codes, prices = codes[keep], prices[keep]
+
+    order = np.lexsort((prices, codes))
+    codes, prices = codes[order], prices[order]
+    counts = np.bincount(codes, minlength=len(zip_order))
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    position = np.arange(len(codes)) - starts[codes]
+
+    matrix = np.full((len(zip_order), max(counts.max(initial=0), 1)), np.nan)
+    matrix[codes, position] = prices
+    return matrix, counts
+
+
+def _order_statistic_cdf(counts, m, width):
+    # P(m-th smallest of a resample <= k-th smallest price), k = 1..width
+    n = np.maximum(counts, 1)[:, None]
+    k = np.arange(1, width + 1)[None, :]
+    with np.errstate(invalid="ignore"):
+        cdf = betainc(m[:, None], n - m[:, None] + 1, np.minimum(k / n, 1))
+    cdf[k >= n] = 1.0
+    return cdf
+
+
+def _draw_ranks(cdf, counts, u):
+    # 0 based rank drawn from every zip's CDF (row) for every uniform
+    n_zips, width = cdf.shape
+
+    # one searchsorted for every zip: offsetting each row by 2 x its index
+    # keeps the flattened CDFs sorted
+    offset = 2.0 * np.arange(n_zips)[:, None]
+    rank = np.searchsorted((cdf + offset).ravel(), (u + offset).ravel())
+    rank = rank.reshape(u.shape) - np.arange(n_zips)[:, None] * width
+    return np.minimum(rank, counts[:, None] - 1).clip(0)
+
+
+def _take_prices(matrix, counts, rank):
+    draws = np.take_along_axis(matrix, rank, axis=1)
+    draws[counts == 0] = np.nan
+    return draws
+
+
+def draw_order_statistic(matrix, counts, m, u):
+    """
+    Bootstrap draws of the m-th smallest price of each zip. For a resample
+    of n prices, the m-th smallest is at most the k-th smallest original
+    price with probability P(Binomial(n, k / n) >= m), so a uniform draw is
+    mapped through that CDF instead of resampling listings.
+
+    Parameters
+    ----------
+    matrix, counts : output of sorted_price_matrix
+    m : np.ndarray
+        order statistic (1 based) per zip
+    u : np.ndarray, shape (zips, draws)
+        uniform draws
+
+    Returns
+    -------
+    np.ndarray, shape (zips, draws)
+        nan for zips without listings
+    """
+
+    cdf = _order_statistic_cdf(counts, m, matrix.shape[1])
+    return _take_prices(matrix, counts, _draw_ranks(cdf, counts, u))
+
+
+def draw_median(matrix, counts, u, u_upper):
+    """
+    Bootstrap draws of the median price of each zip. The lower middle price
+    (k-th smallest) is drawn as in draw_order_statistic. For an even count
+    the upper middle one is drawn given it: with S resampled prices at or
+    below the lower one (the i-th smallest original price), it's the same
+    price if S > k, which has probability 1 - P(S = k, lower at i) /
+    P(lower at i), otherwise S = k and it's the smallest of the other n - k
+    resampled prices, all uniform over the n - i prices above. The pair then
+    has the joint distribution of the two middle prices of a resample.
+
+    Parameters
+    ----------
+    matrix, counts : output of sorted_price_matrix
+    u, u_upper : np.ndarray, shape (zips, draws)
+        uniform draws, for the lower and the upper middle price
+
+    Returns
+    -------
+    np.ndarray, shape (zips, draws)
+        nan for zips without listings
+    """
+
+    width = matrix.shape[1]
+    n = np.maximum(counts, 1)[:, None]
+    k = ((counts + 1) // 2)[:, None]
+    cdf = _order_statistic_cdf(counts, k[:, 0], width)
+    lower = _draw_ranks(cdf, counts, u)
+
+    # P(upper middle = lower middle | lower middle is the i-th price), as a
+    # (zips x i) table: S ~ Binomial(n, i / n), and given S = k the k prices
+    # all fall below the i-th with probability ((i - 1) / i) ** k
+    i = np.arange(1, width + 1)[None, :]
+    p_lower = np.diff(cdf, axis=1, prepend=0)
+    p_split = binom.pmf(k, n, np.minimum(i / n, 1)) * (1 - ((i - 1) / i) ** k)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p_same = np.where(p_lower > 0, 1 - p_split / p_lower, 1.0)
+    p_same = np.take_along_axis(p_same, lower, axis=1)
+
+    # otherwise the minimum of n - k uniform picks among the n - i prices
+    # above, from the rest of u_upper rescaled to (0, 1]
+    split = ((counts % 2 == 0)[:, None]) & (u_upper >= p_same)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rest = (1 - u_upper) / (1 - p_same)
+        step = np.ceil((n - 1 - lower) * (1 - rest ** (1 / np.maximum(n - k, 1))))
+    upper = np.where(split, lower + np.clip(step, 1, None), lower)
+    upper = np.minimum(upper, counts[:, None] - 1).clip(0).astype(int)
+
+    return 0.5 * (
+        _take_prices(matrix, counts, lower) + _take_prices(matrix, counts, upper)
+    )
+
+
+def _ranks(values):
+    # 0 based ascending rank of every zip in every draw (column), nan last
+    filled = np.where(np.isnan(values), np.inf, values)
+    return np.argsort(np.argsort(filled, axis=0, kind="stable"), axis=0)
+
+
+def _card_group(ranks, n_valid, n):
+    # -1 most affordable cards, 1 least affordable cards, 0 neither
+    return np.where(ranks < n, -1, np.where(ranks >= n_valid - n, 1, 0))
+
+
+def pir_uncertainty(
+    df_house,
+    df_zip,
+    draws=UNCERTAINTY_DRAWS,
+    interval=UNCERTAINTY_INTERVAL,
+    seed=UNCERTAINTY_SEED,
+    n_ranked=DASHBOARD_RANKED_ZIPS,
+):
+    """
+    Confidence intervals and rank stability for every zip, in one batched
+    simulation.
+
+    Parameters
+    ----------
+    df_house : pd.DataFrame
+        house level results (Zipcode, Price)
+    df_zip : pd.DataFrame
+        zip level results (Zipcode, PIR, Household_Median_Income and
+        Household_Median_Income_MOE)
+    draws : int
+    interval : float
+        width of the confidence intervals, e.g. 0.9
+    seed : int
+    n_ranked : int
+        zips shown in each of the dashboard's most / least affordable cards
+
+    Returns
+    -------
+    pd.DataFrame
+        Zipcode, PIR_Low, PIR_High, Unaffordable_Prob, PIR_Rank_Low,
+        PIR_Rank_High and Rank_Stability (share of draws in which the zip
+        lands in the same card, or no card, as its point estimate)
+    """
+
+    rng = np.random.default_rng(seed)
+    zipcodes = df_zip["Zipcode"].to_numpy()
+    n_zips = len(zipcodes)
+
+    # income: normal around the estimate, with the standard error of the moe
+    income = df_zip["Household_Median_Income"].to_numpy(dtype=float)
+    se = np.nan_to_num(
+        df_zip["Household_Median_Income_MOE"].to_numpy(dtype=float) / MOE_Z
+    )
+    income_draws = income[:, None] + se[:, None] * rng.standard_normal((n_zips, draws))
+    income_draws = np.maximum(income_draws, 1.0)
+
+    # prices: bootstrapped median and minimum
+    matrix, counts = sorted_price_matrix(
+        df_house["Zipcode"].to_numpy(), df_house["Price"].to_numpy(), zipcodes
+    )
+    u = rng.random((n_zips, draws))
+    median_draws = draw_median(matrix, counts, u, rng.random(u.shape))
+    min_draws = draw_order_statistic(
+        matrix, counts, np.ones(n_zips), rng.random(u.shape)
+    )
+
+    pir_draws = median_draws / income_draws
+    unaffordable = min_draws > income_draws * AFFORDABLE_INCOME_MULTIPLE
+
+    # ranks as in the dashboard cards (ascending PIR)
+    ranks = _ranks(pir_draws)
+    n_valid = (~np.isnan(pir_draws)).sum(axis=0)
+    point_pir = df_zip["PIR"].to_numpy(dtype=float)
+    point_ranks = _ranks(point_pir[:, None])
+    point_group = _card_group(point_ranks, (~np.isnan(point_pir)).sum(), n_ranked)
+    stability = (_card_group(ranks, n_valid, n_ranked) == point_group).mean(axis=1)
+
+    tail = (1 - interval) / 2 * 100
+    with np.errstate(invalid="ignore"):
+        pir_low, pir_high = np.percentile(pir_draws, [tail, 100 - tail], axis=1)
+        rank_low, rank_high = np.percentile(ranks, [tail, 100 - tail], axis=1)
+    valid = ~np.isnan(point_pir) & (counts > 0)
+
+    return pd.DataFrame(
+        {
+            "Zipcode": zipcodes,
+            "PIR_Low": np.round(pir_low, 1),
+            "PIR_High": np.round(pir_high, 1),
+            "Unaffordable_Prob": np.where(valid, unaffordable.mean(axis=1), np.nan),
+            "PIR_Rank_Low": np.where(valid, rank_low + 1, np.nan),
+            "PIR_Rank_High": np.where(valid, rank_high + 1, np.nan),
+            "Rank_Stability": np.where(valid, stability.round(3), np.nan),
+        }
+    )
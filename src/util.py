@@ -5,7 +5,7 @@ Description: Provides utility functions to the real estate scraping / housing
                 affordability project.    
 Author:      Yuseof
 Created:     2025-07-24
-Modified:    2025-08-22
+Modified:    2026-10-19
 Usage:       --
 """
 
@@ -15,7 +15,8 @@ import requests
 import numpy as np
 import pandas as pd
 from pyairtable import Api
-from config import OPEN_MAPS_API_URL
+from instrumentation import count, timer
+from config import OPEN_MAPS_API_URL, AIRTABLE_API_URL
 
 
 def format_price(price_string):
@@ -95,25 +96,49 @@ def address_to_lat_lng(parsed_address):
     headers = {"User-Agent": "MyRealEstateApp/1.0 (your_email@example.com)"}
 
     try:
-        response = requests.get(
-            OPEN_MAPS_API_URL, params=params, headers=headers, timeout=10
-        )
+        with timer("geocode_request"):
+            response = requests.get(
+                OPEN_MAPS_API_URL, params=params, headers=headers, timeout=10
+            )
         response.raise_for_status()
         data = response.json()
-        time.sleep(1)  # wait 1 sec bw api calls as per openstreemaps policy
+        with timer("geocode_sleep"):
+            time.sleep(1)  # wait 1 sec bw api calls as per openstreemaps policy
         if data:
+            count("geocode_hits")
             return [data[0]["lat"], data[0]["lon"]]
         else:
+            count("geocode_misses")
             print(f"No results for address: {params}")
             return None
     except Exception:
+        count("geocode_errors")
         print(f"Error retrieving coordinates for adress: {parsed_address}")
         print(traceback.format_exc())
-        time.sleep(1)  # wait 1 sec bw api calls as per openstreemaps policy
+        with timer("geocode_sleep"):
+            time.sleep(1)  # wait 1 sec bw api calls as per openstreemaps policy
         return None
 
 
-def upload_to_airtable(access_token, base_id, table_name, df):
+def _is_transient(error):
+    """
+    True for Airtable errors worth retrying: rate limits (429), server errors
+    (5xx) and dropped connections. Client errors (e.g. 422 for an unknown
+    field) fail the same way on every attempt.
+    """
+
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(
+        error,
+        (requests.ConnectionError, requests.Timeout, requests.exceptions.RetryError),
+    )
+
+
+def upload_to_airtable(
+    access_token, base_id, table_name, df, retries=3, endpoint_url=AIRTABLE_API_URL
+):
     """
     Helper function to upload rows to Airtable. Keeps main.py clean
     """
@@ -128,7 +153,7 @@ def upload_to_airtable(access_token, base_id, table_name, df):
     if not access_token or not base_id:
         raise Exception("Airtable secrets not set")
 
-    api = Api(access_token)
+    api = Api(access_token, endpoint_url=endpoint_url)
     table = api.table(base_id, table_name)
 
     # get df in format expected by airtable
@@ -138,5 +163,15 @@ def upload_to_airtable(access_token, base_id, table_name, df):
     df.replace([np.nan], None, inplace=True)
     records = [{"fields": row} for row in df.to_dict(orient="records")]
 
-    # upload to airtable
-    _ = table.batch_upsert(records, key_fields=[df.columns[0], df.columns[1]])
+    # upload to airtable, retrying transient failures (that pyairtable doesn't
+    # retry itself) with backoff
+    for attempt in range(retries + 1):
+        try:
+            _ = table.batch_upsert(records, key_fields=[df.columns[0], df.columns[1]])
+            break
+        except Exception as e:
+            if attempt == retries or not _is_transient(e):
+                raise
+            count("upload_retries")
+            print(f"Airtable upload failed ({e}), retrying...")
+            time.sleep(2**attempt)